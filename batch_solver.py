@@ -0,0 +1,270 @@
+"""
+Run many independent det/rref/solve/inverse jobs across processes.
+
+    from batch_solver import solve_batch, iter_batch
+    out = solve_batch([("det", [[1, 2], [3, 4]]), ("solve", [[2, 0], [0, 4]], [2, 8])],
+                      workers=8, chunksize=500)
+    out.results     # [-2, [1.0, 2.0]]
+    out.timings     # one ChunkTiming per chunk
+    for index, result in iter_batch(jobs, workers=8):
+        ...             # streamed as each chunk completes
+
+Jobs are packed into compact chunks (one flat int64/float64 buffer per
+matrix instead of nested lists) before they are pickled to the workers.
+From the command line, one JSON job per line:
+
+    python batch_solver.py jobs.jsonl --workers 32 --chunksize 1000 --timings
+    {"op": "solve", "matrix": [[2, 0], [0, 4]], "b": [2, 8]}
+
+Without arguments it runs its self-test.
+"""
+import os
+import sys
+import time
+from array import array
+from collections import namedtuple
+
+if sys.platform == 'win32':
+    sys.path.extend(['../lib/', './lib/', '../', '.'])
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib'))
+
+from batch import batch_det, batch_inverse, batch_solve, rref_small
+from elimination import is_int_matrix, rref_exact
+from flat_matrix import FlatMatrix
+
+OPS = ('det', 'rref', 'solve', 'inverse')
+
+ChunkTiming = namedtuple('ChunkTiming', ['chunk', 'jobs', 'seconds', 'pid'])
+BatchResult = namedtuple('BatchResult', ['results', 'timings'])
+
+
+# region Serialization
+
+def _normalize(job):
+    """(op, rows, b) from a tuple (op, matrix[, b]) or a dict."""
+    if isinstance(job, dict):
+        op, matrix, b = job['op'], job['matrix'], job.get('b')
+    else:
+        op, matrix = job[0], job[1]
+        b = job[2] if len(job) > 2 else None
+    if op not in OPS:
+        raise ValueError("Unknown op {!r}, expected one of {}".format(op, OPS))
+    if hasattr(matrix, 'data'):
+        matrix = matrix.data
+    return op, matrix, b
+
+
+def pack(job) -> tuple:
+    """
+    (op, rows, cols, typecode, payload, b). The payload is the raw bytes
+    of a FlatMatrix buffer, or a flat tuple for entries that do not fit
+    a machine int or float (big ints, Frac).
+    """
+    op, rows, b = _normalize(job)
+    try:
+        flat = FlatMatrix.from_rows(rows)
+        payload, typecode = flat.buffer.tobytes(), flat.typecode
+    except ValueError:
+        payload, typecode = tuple(x for row in rows for x in row), None
+    return (op, len(rows), len(rows[0]), typecode, payload, b)
+
+
+def unpack(packed):
+    """(op, list of rows, b) back from pack()."""
+    op, rows, cols, typecode, payload, b = packed
+    if typecode is not None:
+        flat = FlatMatrix(rows, cols, array(typecode, payload), typecode)
+        return op, flat.to_rows(), b
+    return op, [list(payload[i * cols:(i + 1) * cols]) for i in range(rows)], b
+
+# endregion Serialization
+
+
+def run_job(op, rows, b=None, tol=1e-10):
+    """
+    One job in the current process, through the closed-form kernels of
+    lib/batch.py for n <= 4. Singular solves and inverses give None.
+    """
+    if op == 'det':
+        return batch_det([rows])[0]
+    if op == 'inverse':
+        return batch_inverse([rows])[0]
+    if op == 'solve':
+        return batch_solve([rows], [b])[0]
+    if is_int_matrix(rows):
+        return rref_exact(rows)
+    a = [row[:] for row in rows]
+    return a, rref_small(a, tol)
+
+
+def _run_chunk(index, chunk):
+    start = time.perf_counter()
+    results = [run_job(*unpack(packed)) for packed in chunk]
+    return index, results, time.perf_counter() - start, os.getpid()
+
+
+def _chunks(jobs, chunksize):
+    chunk = []
+    for job in jobs:
+        chunk.append(pack(job))
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _completed(jobs, workers, chunksize):
+    """(chunk index, results, seconds, pid) for each chunk as it finishes."""
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    chunks = list(_chunks(jobs, chunksize))
+
+    if workers == 1 or len(chunks) <= 1:
+        for i, chunk in enumerate(chunks):
+            yield _run_chunk(i, chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_chunk, i, chunk) for i, chunk in enumerate(chunks)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def iter_batch(jobs, workers=None, chunksize=256, timings=None):
+    """
+    Yield (job index, result) pairs as soon as their chunk completes,
+    in completion order. Pass a list as timings to collect a
+    ChunkTiming per chunk along the way.
+    """
+    for index, results, seconds, pid in _completed(jobs, workers, chunksize):
+        if timings is not None:
+            timings.append(ChunkTiming(index, len(results), seconds, pid))
+        offset = index * chunksize
+        for k, result in enumerate(results):
+            yield offset + k, result
+
+
+def solve_batch(jobs, workers=None, chunksize=256, ordered=True) -> BatchResult:
+    """
+    Run every job and return BatchResult(results, timings).
+
+    Args:
+        jobs: iterable of (op, matrix[, b]) tuples or {"op", "matrix", "b"}
+            dicts, op being one of 'det', 'rref', 'solve', 'inverse'.
+        workers: process count, None for os.cpu_count(), 1 runs inline.
+        chunksize: jobs shipped to a worker at a time.
+        ordered: results in input order, otherwise (job index, result)
+            pairs in the order the chunks complete. Use iter_batch to
+            consume them while later chunks are still running.
+    """
+    timings = []
+    if not ordered:
+        completed = list(iter_batch(jobs, workers, chunksize, timings))
+    else:
+        by_chunk = {}
+        for index, results, seconds, pid in _completed(jobs, workers, chunksize):
+            timings.append(ChunkTiming(index, len(results), seconds, pid))
+            by_chunk[index] = results
+        completed = [r for index in sorted(by_chunk) for r in by_chunk[index]]
+    timings.sort(key=lambda t: t.chunk)
+    return BatchResult(completed, timings)
+
+
+def _to_json(value):
+    """Frac entries (exact RREF) become "p/q" strings, tuples become lists."""
+    if isinstance(value, (list, tuple)):
+        return [_to_json(x) for x in value]
+    if isinstance(value, (int, float)) or value is None:
+        return value
+    return str(value)
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument('jobs', help="JSON lines file, one job per line, - for stdin")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=256)
+    parser.add_argument('--unordered', action='store_true',
+                        help="write results as chunks complete, with their job index")
+    parser.add_argument('--timings', action='store_true',
+                        help="print per chunk timing to stderr")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.jobs == '-' else open(args.jobs)
+    with stream:
+        jobs = [json.loads(line) for line in stream if line.strip()]
+
+    if args.unordered:
+        timings = []
+        # stream each chunk's results while the others are still running
+        for index, result in iter_batch(jobs, args.workers, args.chunksize, timings):
+            print(json.dumps({"job": index, "result": _to_json(result)}), flush=True)
+        timings.sort(key=lambda t: t.chunk)
+    else:
+        out = solve_batch(jobs, args.workers, args.chunksize)
+        for item in out.results:
+            print(json.dumps(_to_json(item)))
+        timings = out.timings
+    if args.timings:
+        for t in timings:
+            sys.stderr.write("chunk {:>5} jobs {:>6} {:>10.4f}s pid {}\n".format(*t))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main()
+        sys.exit()
+
+    # without arguments: self-test
+    import pickle
+    from flat_matrix import FLOAT_CODE, INT_CODE
+    from frac import Frac
+
+    # pack/unpack keep values and types, big ints and Frac skip the buffer
+    for rows, typecode in (([[1, 2], [3, 4]], INT_CODE), ([[0.5, 2], [3, 4]], FLOAT_CODE),
+                           ([[2 ** 70, 1], [1, 1]], None), ([[Frac(1, 2), 1], [1, 2]], None)):
+        packed = pickle.loads(pickle.dumps(pack(("solve", rows, [1, 2]))))
+        assert packed[3] == typecode
+        op, back, b = unpack(packed)
+        assert (op, back, b) == ("solve", rows, [1, 2])
+        # a float64 buffer holds the ints of a mixed matrix as floats
+        kinds = [float if typecode == FLOAT_CODE else type(x) for row in rows for x in row]
+        assert [type(x) for row in back for x in row] == kinds
+    assert unpack(pack({"op": "det", "matrix": [[1.5]]})) == ("det", [[1.5]], None)
+    try:
+        pack(("trace", [[1]]))
+        assert False
+    except ValueError:
+        pass
+
+    jobs = []
+    for k in range(23):
+        jobs.append(("det", [[k, 1], [2, 3]]))
+        jobs.append(("solve", [[2.0, 0.0], [0.0, 4.0 + k]], [2.0, 8.0]))
+        jobs.append({"op": "inverse", "matrix": [[Frac(1, 2), k], [0, 1]]})
+        jobs.append(("rref", [[1, 2, k], [2, 4, 1]]))
+    jobs.append(("det", [[2 ** 70, 1], [1, 1]]))
+    expected = [run_job(*_normalize(job)) for job in jobs]
+    assert expected[-1] == 2 ** 70 - 1 and expected[2] == [[2, 0], [0, 1]]
+
+    for workers in (1, 2):
+        out = solve_batch(jobs, workers=workers, chunksize=10)
+        assert out.results == expected
+        assert [t.chunk for t in out.timings] == list(range(10))
+        assert sum(t.jobs for t in out.timings) == len(jobs)
+        pairs = solve_batch(jobs, workers=workers, chunksize=10, ordered=False).results
+        assert sorted(pairs, key=lambda pair: pair[0]) == list(enumerate(expected))
+        timings = []
+        streamed = dict(iter_batch(jobs, workers=workers, chunksize=7, timings=timings))
+        assert streamed == dict(enumerate(expected)) and len(timings) == 14
+    try:
+        solve_batch(jobs, chunksize=0)
+        assert False
+    except ValueError:
+        pass
@@ -0,0 +1,180 @@
+"""
+Optional vectorized storage backends for PyMatrix.
+
+The TI-Nspire has no NumPy, so the pure python code in PyMatrix is
+always the reference implementation. On desktop, when NumPy imports,
+PyMatrix keeps a contiguous float64 ndarray next to its rows and routes
+REF/RREF/det/inverse/multiply of float matrices through the NumpyBackend
+below. Int, big int and Frac matrices always take the exact python path,
+so a result never depends on whether NumPy is installed.
+
+    get_backend()           - the default backend, NumPy when importable
+    get_backend('python')   - None, i.e. the pure python path
+    set_default_backend(name)
+"""
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+
+class NumpyBackend:
+    """Vectorized kernels over float64 ndarrays, results as lists of rows."""
+    name = 'numpy'
+
+    @staticmethod
+    def asarray(rows):
+        buffer = getattr(rows, 'buffer', None)
+        if buffer is not None:
+            # a FlatMatrix, one copy of its row-major buffer
+            return _np.array(buffer, dtype=float).reshape(rows.dims)
+        return _np.array(rows, dtype=float)
+
+    def multiply(self, a, b) -> list:
+        return (_np.asarray(a, dtype=float) @ _np.asarray(b, dtype=float)).tolist()
+
+    def determinant(self, a, tol=0) -> float:
+        det = float(_np.linalg.det(_np.asarray(a, dtype=float)))
+        return 0.0 if abs(det) <= tol else det
+
+    def inverse(self, a) -> list:
+        try:
+            return _np.linalg.inv(_np.asarray(a, dtype=float)).tolist()
+        except _np.linalg.LinAlgError:
+            raise ValueError("The matrix is singular and does not have an inverse.")
+
+    def _eliminate(self, a, tol, reduce):
+        """Partial pivoting elimination, the same pivot order as PyMatrix."""
+        a = _np.array(a, dtype=float)
+        rows, cols = a.shape
+        pivots = []
+        r = 0
+        for c in range(cols):
+            if r >= rows:
+                break
+            p = r + int(_np.argmax(_np.abs(a[r:, c])))
+            # swap before the zero check, exactly like PyMatrix does
+            if p != r:
+                a[[r, p]] = a[[p, r]]
+            if abs(a[r, c]) < tol:
+                continue
+            a[r] /= a[r, c]
+            if reduce:
+                factors = a[:, c].copy()
+                factors[r] = 0.0
+                a -= _np.outer(factors, a[r])
+            else:
+                a[r + 1:] -= _np.outer(a[r + 1:, c], a[r])
+            pivots.append((r, c))
+            r += 1
+        a[_np.abs(a) < tol] = 0.0
+        return a.tolist(), pivots
+
+    def ref(self, a, tol=1e-10):
+        return self._eliminate(a, tol, reduce=False)
+
+    def rref(self, a, tol=1e-10):
+        return self._eliminate(a, tol, reduce=True)
+
+
+# largest int magnitude float64 holds exactly
+_EXACT_INT = 2 ** 53
+
+
+def is_float_matrix(rows) -> bool:
+    """
+    True when float64 computes the same thing the python path would: at
+    least one float entry, the rest floats or ints below 2**53.
+    """
+    has_float = False
+    for row in rows:
+        for x in row:
+            if type(x) is float:
+                has_float = True
+            elif type(x) is not int or not -_EXACT_INT <= x <= _EXACT_INT:
+                return False
+    return has_float
+
+
+_BACKENDS = {'python': None}
+if _np is not None:
+    _BACKENDS['numpy'] = NumpyBackend()
+
+_default = 'numpy' if _np is not None else 'python'
+
+
+def available_backends() -> list:
+    return list(_BACKENDS)
+
+
+def get_backend(name: str = None):
+    """Backend instance for `name`, None stands for the pure python path."""
+    name = name or _default
+    if name not in _BACKENDS:
+        raise ValueError("Unknown or unavailable backend: {}".format(name))
+    return _BACKENDS[name]
+
+
+def set_default_backend(name: str) -> None:
+    global _default
+    get_backend(name)
+    _default = name
+
+
+if __name__ == '__main__':
+    # parity between the pure python PyMatrix and the NumPy backend
+    if _np is None:
+        print("NumPy is not installed, only the python backend is available")
+    else:
+        import random
+        from frac import Frac
+        from pymatrix import PyMatrix
+
+        def close(a, b, tol=1e-8):
+            if isinstance(a, list):
+                return len(a) == len(b) and all(close(x, y, tol) for x, y in zip(a, b))
+            return abs(float(a) - float(b)) < tol
+
+        random.seed(2)
+        for _ in range(100):
+            n = random.randint(1, 6)
+            m = random.randint(1, 6)
+            rows = [[random.uniform(-5, 5) for _ in range(m)] for _ in range(n)]
+            if n > 1 and random.random() < 0.3:
+                rows[-1] = [2 * x for x in rows[0]]
+            py = PyMatrix([r[:] for r in rows], backend='python')
+            vec = PyMatrix([r[:] for r in rows], backend='numpy')
+
+            py_rref, py_piv = py.RREF()
+            np_rref, np_piv = vec.RREF()
+            assert py_piv == np_piv and close(py_rref.data, np_rref.data)
+
+            py_ref, py_piv = PyMatrix([r[:] for r in rows], backend='python').REF()
+            np_ref, np_piv = PyMatrix([r[:] for r in rows], backend='numpy').REF()
+            assert [tuple(p) for p in py_piv] == [tuple(p) for p in np_piv]
+            assert close(py_ref.data, np_ref.data)
+
+            other = [[random.uniform(-5, 5) for _ in range(n)] for _ in range(m)]
+            assert close((py * PyMatrix(other)).data, (vec * PyMatrix(other)).data)
+
+            if n == m:
+                assert close(py.determinant(), vec.determinant(), 1e-6)
+                if abs(float(py.determinant())) > 1e-3:
+                    assert close(py.inverse(), vec.inverse(), 1e-4)
+
+        # exact entries never reach float64, whichever backend is asked for
+        big = 2 ** 60 + 1
+        for rows in ([[1, 2], [3, 4]], [[big, 0], [0, big]],
+                     [[Frac(1, 3), 2], [Frac(1, 2), Frac(5, 7)]]):
+            py = PyMatrix([r[:] for r in rows], convert=False, backend='python')
+            vec = PyMatrix([r[:] for r in rows], convert=False, backend='numpy')
+            assert vec._vectorized() is None
+            assert (py * py).data == (vec * vec).data
+            assert py.determinant() == vec.determinant()
+            assert py.inverse(pretty=False) == vec.inverse(pretty=False)
+            assert py.RREF()[0].data == vec.RREF()[0].data
+        square = PyMatrix([[1, 2], [3, 4]], backend='numpy')
+        assert (square * square).data == [[7, 10], [15, 22]]
+        assert all(type(x) is int for row in (square * square).data for x in row)
+        assert (PyMatrix([[big]], backend='numpy') * PyMatrix([[big]])).data == [[big ** 2]]
+        print("backend parity: all tests passed")
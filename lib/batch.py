@@ -0,0 +1,277 @@
+"""
+Batched kernels for many small, same-shaped matrices.
+
+Grading work is millions of 2x2..4x4 systems, where building a PyMatrix
+per problem (per cell conversion, numeric scans, decorated row ops)
+costs far more than the arithmetic. These functions take a list of
+matrices (lists of rows) or one flat sequence of entries plus a shape,
+and run closed-form kernels for n <= 4 without creating any objects.
+Larger matrices fall back to the elimination kernels.
+
+    batch_det([[[1, 2], [3, 4]], [[2, 0], [0, 2]]])    # [-2, 4]
+    batch_det(flat, shape=(2, 2))                      # flat a11 a12 a21 a22 ...
+
+Singular problems give None in batch_inverse and batch_solve instead of
+raising, so one bad submission does not abort the batch.
+"""
+from elimination import determinant, gauss_jordan_inverse
+from factorizations import LUFactorization
+
+
+def _flat_items(matrices, shape=None):
+    """(rows, cols, [flat entries of each matrix])."""
+    if shape is not None:
+        rows, cols = shape
+        size = rows * cols
+        if len(matrices) % size:
+            raise ValueError("flat data is not a multiple of {}x{}".format(rows, cols))
+        return rows, cols, [matrices[k:k + size] for k in range(0, len(matrices), size)]
+    if not matrices:
+        return 0, 0, []
+    rows, cols = len(matrices[0]), len(matrices[0][0])
+    items = []
+    for matrix in matrices:
+        if len(matrix) != rows or any(len(row) != cols for row in matrix):
+            raise ValueError("All matrices in a batch must have the same shape")
+        items.append([x for row in matrix for x in row])
+    return rows, cols, items
+
+
+def _square(rows, cols):
+    if rows != cols:
+        raise ValueError("The matrices must be square.")
+    return rows
+
+
+# region Closed-form kernels, m is row-major flat
+
+def det2(m):
+    a, b, c, d = m
+    return a * d - b * c
+
+
+def det3(m):
+    a, b, c, d, e, f, g, h, i = m
+    return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+
+def _minors4(m):
+    """2x2 minors of the top and the bottom row pairs of a 4x4."""
+    a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = m
+    s = (a0 * b1 - b0 * a1, a0 * b2 - b0 * a2, a0 * b3 - b0 * a3,
+         a1 * b2 - b1 * a2, a1 * b3 - b1 * a3, a2 * b3 - b2 * a3)
+    t = (c0 * d1 - d0 * c1, c0 * d2 - d0 * c2, c0 * d3 - d0 * c3,
+         c1 * d2 - d1 * c2, c1 * d3 - d1 * c3, c2 * d3 - d2 * c3)
+    return s, t
+
+
+def det4(m):
+    s, t = _minors4(m)
+    return (s[0] * t[5] - s[1] * t[4] + s[2] * t[3]
+            + s[3] * t[2] - s[4] * t[1] + s[5] * t[0])
+
+
+def inv2(m, tol=0):
+    a, b, c, d = m
+    det = a * d - b * c
+    if abs(det) <= tol:
+        return None
+    r = 1 / det
+    return [[d * r, -b * r], [-c * r, a * r]]
+
+
+def inv3(m, tol=0):
+    a, b, c, d, e, f, g, h, i = m
+    A, B, C = e * i - f * h, f * g - d * i, d * h - e * g
+    det = a * A + b * B + c * C
+    if abs(det) <= tol:
+        return None
+    r = 1 / det
+    return [[A * r, (c * h - b * i) * r, (b * f - c * e) * r],
+            [B * r, (a * i - c * g) * r, (c * d - a * f) * r],
+            [C * r, (b * g - a * h) * r, (a * e - b * d) * r]]
+
+
+def inv4(m, tol=0):
+    a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = m
+    (s0, s1, s2, s3, s4, s5), (t0, t1, t2, t3, t4, t5) = _minors4(m)
+    det = s0 * t5 - s1 * t4 + s2 * t3 + s3 * t2 - s4 * t1 + s5 * t0
+    if abs(det) <= tol:
+        return None
+    r = 1 / det
+    return [
+        [(b1 * t5 - b2 * t4 + b3 * t3) * r, (-a1 * t5 + a2 * t4 - a3 * t3) * r,
+         (d1 * s5 - d2 * s4 + d3 * s3) * r, (-c1 * s5 + c2 * s4 - c3 * s3) * r],
+        [(-b0 * t5 + b2 * t2 - b3 * t1) * r, (a0 * t5 - a2 * t2 + a3 * t1) * r,
+         (-d0 * s5 + d2 * s2 - d3 * s1) * r, (c0 * s5 - c2 * s2 + c3 * s1) * r],
+        [(b0 * t4 - b1 * t2 + b3 * t0) * r, (-a0 * t4 + a1 * t2 - a3 * t0) * r,
+         (d0 * s4 - d1 * s2 + d3 * s0) * r, (-c0 * s4 + c1 * s2 - c3 * s0) * r],
+        [(-b0 * t3 + b1 * t1 - b2 * t0) * r, (a0 * t3 - a1 * t1 + a2 * t0) * r,
+         (-d0 * s3 + d1 * s1 - d2 * s0) * r, (c0 * s3 - c1 * s1 + c2 * s0) * r]]
+
+
+def solve2(m, v, tol=0):
+    a, b, c, d = m
+    det = a * d - b * c
+    if abs(det) <= tol:
+        return None
+    x, y = v
+    return [(x * d - b * y) / det, (a * y - c * x) / det]
+
+
+def solve3(m, v, tol=0):
+    a, b, c, d, e, f, g, h, i = m
+    A, B, C = e * i - f * h, f * g - d * i, d * h - e * g
+    det = a * A + b * B + c * C
+    if abs(det) <= tol:
+        return None
+    x, y, z = v
+    # Cramer's rule, each column replaced by v in turn
+    return [(x * A + b * (f * z - y * i) + c * (y * h - e * z)) / det,
+            (a * (y * i - f * z) + x * B + c * (d * z - y * g)) / det,
+            (a * (e * z - y * h) + b * (y * g - d * z) + x * C) / det]
+
+
+def solve4(m, v, tol=0):
+    inv = inv4(m, tol)
+    if inv is None:
+        return None
+    x, y, z, w = v
+    return [r0 * x + r1 * y + r2 * z + r3 * w for r0, r1, r2, r3 in inv]
+
+# endregion Closed-form kernels
+
+
+_DET = {1: lambda m: m[0], 2: det2, 3: det3, 4: det4}
+_INV = {1: lambda m, tol: None if abs(m[0]) <= tol else [[1 / m[0]]],
+        2: inv2, 3: inv3, 4: inv4}
+_SOLVE = {1: lambda m, v, tol: None if abs(m[0]) <= tol else [v[0] / m[0]],
+          2: solve2, 3: solve3, 4: solve4}
+
+
+def _rows_of(m, rows, cols):
+    return [list(m[i * cols:(i + 1) * cols]) for i in range(rows)]
+
+
+def batch_det(matrices, shape=None) -> list:
+    """Determinant of every matrix, exact for integer entries."""
+    rows, cols, items = _flat_items(matrices, shape)
+    n = _square(rows, cols)
+    kernel = _DET.get(n)
+    if kernel is not None:
+        return [kernel(m) for m in items]
+    return [determinant(_rows_of(m, n, n)) for m in items]
+
+
+def batch_inverse(matrices, shape=None, tol=0) -> list:
+    """Inverse (list of rows) of every matrix, None where singular."""
+    rows, cols, items = _flat_items(matrices, shape)
+    n = _square(rows, cols)
+    kernel = _INV.get(n)
+    if kernel is not None:
+        return [kernel(m, tol) for m in items]
+    results = []
+    for m in items:
+        try:
+            results.append(gauss_jordan_inverse(_rows_of(m, n, n), tol))
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def batch_solve(matrices, vectors, shape=None, tol=0) -> list:
+    """x with A·x = b for each (A, b) pair, None where A is singular."""
+    rows, cols, items = _flat_items(matrices, shape)
+    n = _square(rows, cols)
+    if len(vectors) != len(items):
+        raise ValueError("Expected one right-hand side per matrix")
+    kernel = _SOLVE.get(n)
+    if kernel is not None:
+        return [kernel(m, v, tol) for m, v in zip(items, vectors)]
+    results = []
+    for m, v in zip(items, vectors):
+        lu = LUFactorization(_rows_of(m, n, n), tol)
+        results.append(None if lu.singular else lu.solve(v))
+    return results
+
+
+def rref_small(a, tol=1e-10):
+    """
+    Gauss-Jordan with the same partial pivoting as PyMatrix.RREF on a
+    list of rows (modified in place). Returns the (row, col) pivots.
+    """
+    rows, cols = len(a), len(a[0])
+    pivots = []
+    r = 0
+    for c in range(cols):
+        p = r
+        best = abs(a[r][c])
+        for i in range(r + 1, rows):
+            value = abs(a[i][c])
+            if value > best:
+                p, best = i, value
+        if p != r:
+            a[r], a[p] = a[p], a[r]
+        if best < tol:
+            continue
+        pivot_row = a[r]
+        pivot = pivot_row[c]
+        if pivot != 1:
+            pivot_row = a[r] = [x / pivot for x in pivot_row]
+        for i in range(rows):
+            if i != r:
+                row = a[i]
+                factor = row[c]
+                if factor:
+                    a[i] = [x - factor * y for x, y in zip(row, pivot_row)]
+        pivots.append((r, c))
+        r += 1
+        if r >= rows:
+            break
+    for row in a:
+        for j in range(cols):
+            if abs(row[j]) < tol:
+                row[j] = 0.0
+    return pivots
+
+
+def batch_rref(matrices, shape=None, tol=1e-10) -> list:
+    """(rref rows, pivots) for every matrix, any shape."""
+    rows, cols, items = _flat_items(matrices, shape)
+    results = []
+    for m in items:
+        a = _rows_of(m, rows, cols)
+        pivots = rref_small(a, tol)
+        results.append((a, pivots))
+    return results
+
+
+if __name__ == '__main__':
+    import random
+
+    def close(a, b, tol=1e-8):
+        if isinstance(a, list):
+            return len(a) == len(b) and all(close(x, y, tol) for x, y in zip(a, b))
+        return abs(a - b) < tol
+
+    random.seed(4)
+    for n in (1, 2, 3, 4, 5):
+        batch = [[[random.randint(-5, 5) for _ in range(n)] for _ in range(n)]
+                 for _ in range(200)]
+        flat = [x for m in batch for row in m for x in row]
+        dets = batch_det(batch)
+        assert dets == batch_det(flat, shape=(n, n))
+        assert dets == [determinant(m) for m in batch]
+
+        inverses = batch_inverse(batch)
+        vectors = [[random.randint(-5, 5) for _ in range(n)] for _ in batch]
+        solutions = batch_solve(batch, vectors)
+        for m, det, inv, v, x in zip(batch, dets, inverses, vectors, solutions):
+            if det == 0:
+                assert inv is None and x is None
+                continue
+            assert close(inv, gauss_jordan_inverse(m))
+            assert close([sum(a * b for a, b in zip(row, x)) for row in m], v)
+
+    assert batch_rref([[[0, 2, 4], [1, 1, 1]]]) == [([[1, 0, -1], [0, 1, 2]], [(0, 0), (1, 1)])]
+    assert batch_inverse([[[1, 2], [2, 4]]]) == [None]
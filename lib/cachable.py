@@ -1,61 +1,219 @@
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ucollections import OrderedDict
+try:
+    from time import monotonic as _clock
+except ImportError:
+    from time import time as _clock
+try:
+    from sys import getsizeof as _getsizeof
+except ImportError:
+    _getsizeof = None
+
+LRU = 'lru'
+LFU = 'lfu'
+
+if hasattr(OrderedDict, 'move_to_end'):
+    def _move_to_end(entries, key):
+        entries.move_to_end(key)
+else:
+    def _move_to_end(entries, key):
+        entries[key] = entries.pop(key)
+
+
 class Cache:
-    def __init__(self, max_size):
+    """
+    Bounded key -> value store, get/add/evict are all O(1).
+
+    policy: LRU evicts the least recently used entry, LFU the least
+        frequently used one (the least recently used among equals).
+    ttl: seconds an entry stays valid, None keeps it until evicted.
+        Expired entries are dropped when they are looked up.
+    max_bytes: budget for the summed sizeof(value), sizeof defaults to
+        sys.getsizeof. A value larger than the whole budget is not kept.
+    """
+
+    def __init__(self, max_size=None, policy=LRU, ttl=None, max_bytes=None,
+                 sizeof=None, clock=_clock):
+        if policy not in (LRU, LFU):
+            raise ValueError("policy must be 'lru' or 'lfu', got {!r}".format(policy))
+        if max_bytes is not None and sizeof is None and _getsizeof is None:
+            raise ValueError("max_bytes needs a sizeof function on this platform")
         self._max_size = max_size
+        self.policy = policy
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or _getsizeof
+        self._clock = clock
         self._miss = 0
         self._hit = 0
-        self.cache = {}
-        self.order = []
-        
+        self._evicted = 0
+        self._expired = 0
+        self.clear()
+
     @property
     def max(self) -> int:
         return self._max_size
-    
+
+    @max.setter
+    def max(self, value) -> None:
+        self._max_size = value
+        self._make_room(0, 0)
+
     @property
     def miss(self) -> int:
         return self._miss
-    
+
     @property
     def hit(self) -> int:
         return self._hit
-    
+
+    @property
+    def evictions(self) -> int:
+        return self._evicted
+
+    @property
+    def expired(self) -> int:
+        return self._expired
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
     @property
     def ratio(self) -> float:
-        return self._hit / self._miss
-    
-    @max.setter
-    def max(self, value) -> None:
-        self._max_size = value
-        if len(self.cache) > value:
-        # Remove the oldest elements until the cache is the correct size
-            for _ in range(len(self.cache) - value):
-                oldest = self.order.pop(0)
-                del self.cache[oldest]
-
-    def add(self, key, value) -> None:
-        self._miss += 1
-        if key in self.cache:
+        """Hits per lookup, 0.0 before the first lookup."""
+        lookups = self._hit + self._miss
+        return self._hit / lookups if lookups else 0.0
+
+    def add(self, key, value, ttl=None) -> None:
+        """Insert or replace, ttl overrides the cache default."""
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else self._clock() + ttl
+        nbytes = self._sizeof(value) if self.max_bytes is not None else 0
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._bytes -= entry[2]
+            self._touch(key, entry)
+            entry[0], entry[1], entry[2] = value, expires, nbytes
+            self._bytes += nbytes
+            self._make_room(0, 0)
+            return
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+        self._make_room(1, nbytes)
+        if self._max_size is not None and self._max_size < 1:
             return
-        if len(self.cache) >= self.max:
-            oldest = self.order.pop(0)
-            del self.cache[oldest]
-        self.cache[key] = value
-        self.order.append(key)
-
-    def get(self, key) -> object:
-        obj =  self.cache.get(key)
-        if obj is not None:
-            self._hit += 1
-        return obj
+        # [value, expiry time, size in bytes, use count]
+        self._entries[key] = [value, expires, nbytes, 1]
+        self._bytes += nbytes
+        if self.policy == LFU:
+            bucket = self._buckets.get(1)
+            if bucket is None:
+                bucket = self._buckets[1] = OrderedDict()
+            bucket[key] = None
+            self._min_freq = 1
+
+    def get(self, key, default=None) -> object:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._miss += 1
+            return default
+        if entry[1] is not None and entry[1] <= self._clock():
+            self._remove(key)
+            self._expired += 1
+            self._miss += 1
+            return default
+        self._hit += 1
+        if self.policy == LRU:
+            _move_to_end(self._entries, key)
+        else:
+            self._touch(key, entry)
+        return entry[0]
+
+    def pop(self, key, default=None) -> object:
+        """Remove an entry without touching the counters."""
+        if key not in self._entries:
+            return default
+        return self._remove(key)[0]
+
+    def __contains__(self, key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (entry[1] is None or self._clock() < entry[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
     def clear(self) -> None:
-        self.cache = {}
-        self.order = []
+        self._entries = OrderedDict()
+        # LFU only: use count -> keys in recency order
+        self._buckets = {}
+        self._min_freq = 0
+        self._bytes = 0
 
     def size(self) -> int:
-        return len(self.cache)
+        return len(self._entries)
+
+    def _touch(self, key, entry) -> None:
+        if self.policy == LRU:
+            _move_to_end(self._entries, key)
+            return
+        freq = entry[3]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        entry[3] = freq = freq + 1
+        bucket = self._buckets.get(freq)
+        if bucket is None:
+            bucket = self._buckets[freq] = OrderedDict()
+        bucket[key] = None
+
+    def _remove(self, key) -> list:
+        entry = self._entries.pop(key)
+        self._bytes -= entry[2]
+        if self.policy == LFU:
+            bucket = self._buckets[entry[3]]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[entry[3]]
+        return entry
+
+    def _victim(self):
+        if self.policy == LRU:
+            return next(iter(self._entries))
+        if self._min_freq not in self._buckets:
+            # the least used bucket was emptied by a pop or an expiry
+            self._min_freq = min(self._buckets)
+        return next(iter(self._buckets[self._min_freq]))
+
+    def _make_room(self, count: int, nbytes: int) -> None:
+        """Evict until count more entries and nbytes more bytes fit."""
+        max_size, max_bytes = self._max_size, self.max_bytes
+        while self._entries and (
+                (max_size is not None and len(self._entries) + count > max_size) or
+                (max_bytes is not None and self._bytes + nbytes > max_bytes)):
+            self._remove(self._victim())
+            self._evicted += 1
 
     def __repr__(self):
-        return str(self.cache)
+        return str({key: entry[0] for key, entry in self._entries.items()})
+
+def _freeze(value):
+    """Hashable stand-in for lists, dicts and sets, tagged with their type."""
+    if isinstance(value, tuple):
+        return tuple(_freeze(x) for x in value)
+    if isinstance(value, list):
+        return (list, tuple(_freeze(x) for x in value))
+    if isinstance(value, dict):
+        return (dict, frozenset((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return (set, frozenset(value))
+    return value
+
 
 class Cachable:
     _caches = {}
@@ -63,7 +221,15 @@ class Cachable:
     def __new__(cls, *args, **kwargs):
         cache = cls.cache()
         cache_key = (args, tuple(sorted(kwargs.items())))
-        cache_obj = cache.get(cache_key)
+        try:
+            cache_obj = cache.get(cache_key)
+        except TypeError:
+            # a list (of lists) argument, key on its frozen content
+            try:
+                cache_key = _freeze(cache_key)
+                cache_obj = cache.get(cache_key)
+            except TypeError:
+                return super().__new__(cls)
         # we have a cache hit
         if cache_obj is not None:
             return cache_obj
@@ -80,8 +246,8 @@ class Cachable:
             max_size = 50
             Cachable._caches[cls] = Cache(max_size)
         return Cachable._caches[cls]
-    
-    
+
+
     @classmethod
     def cache_max(cls, size = None):
         cache = cls.cache()
@@ -102,7 +268,7 @@ class Cachable:
         return cls.cache().size()
 
 if __name__ == "__main__":
-    
+
     class Person(Cachable):
         def __init__(self, name, age):
             self.name = name
@@ -111,21 +277,86 @@ if __name__ == "__main__":
 
         def __repr__(self):
             return "Person(name={}, age={})".format(self.name, self.age)
-    
+
     class Person2(Person):
         def __init__(self, name, age):
             self.name = name
             self.age = age
-    
+
     count = 60
-    
+
     for i in range(count):
         Person("John", i) # Cache miss
-    Person("John", 2) # Cache hit
-    
+    Person("John", 2) # Cache miss, evicted
+    Person("John", 59) # Cache hit
+
     assert Person.cache_size() == 50
+    cache = Person.cache()
+    assert (cache.hit, cache.miss, cache.evictions) == (1, 61, 11)
     Person.cache_clear()
     assert Person.cache_size() == 0
     assert Person.cache_max() == 50
     Person.cache_max(2)
-    assert Person.cache_max() == 2
\ No newline at end of file
+    assert Person.cache_max() == 2
+
+    # unhashable constructor arguments are keyed on their content
+    class Table(Cachable):
+        def __init__(self, rows, options=None):
+            self.rows = rows
+
+    assert Table([[1, 2], [3, 4]]) is Table([[1, 2], [3, 4]])
+    assert Table([[1, 2]]) is not Table(((1, 2),))
+    assert Table([[1]], options={'a': [1]}) is Table([[1]], options={'a': [1]})
+    assert Table([[1]], options={'a': bytearray(1)}) is not Table([[1]], options={'a': bytearray(1)})
+
+    # counters: duplicates are no miss, no lookups is a 0 ratio
+    cache = Cache(3)
+    assert cache.ratio == 0.0
+    cache.add('a', 1)
+    cache.add('a', 2)
+    assert cache.miss == 0 and cache.get('a') == 2 and cache.ratio == 1.0
+
+    # LRU: a lookup protects 'a', so 'b' goes first
+    cache.add('b', 2)
+    cache.add('c', 3)
+    cache.get('a')
+    cache.add('d', 4)
+    assert 'b' not in cache and cache.evictions == 1
+    cache.max = 1
+    assert list(cache._entries) == ['d'] and cache.evictions == 3
+
+    # LFU: 'a' and 'c' are used twice, 'b' is the least used
+    cache = Cache(3, policy=LFU)
+    for key in 'abc':
+        cache.add(key, key)
+    cache.get('a'), cache.get('c'), cache.get('a')
+    cache.add('d', 'd')
+    assert 'b' not in cache
+    cache.add('e', 'e')
+    assert 'd' not in cache and 'a' in cache and 'c' in cache
+    cache.pop('e')
+    cache.add('f', 'f')
+    cache.add('g', 'g')
+    assert 'f' not in cache and len(cache) == 3
+
+    # TTL on a fake clock, per entry override
+    now = [0.0]
+    cache = Cache(10, ttl=5, clock=lambda: now[0])
+    cache.add('short', 1, ttl=1)
+    cache.add('long', 2)
+    now[0] = 2.0
+    assert cache.get('short') is None and cache.get('long') == 2
+    now[0] = 5.0
+    assert cache.get('long', 'gone') == 'gone'
+    assert (cache.expired, cache.miss, cache.hit, len(cache)) == (2, 2, 1, 0)
+
+    # byte budget, an oversized value is not kept
+    cache = Cache(max_bytes=10, sizeof=len)
+    cache.add('a', 'xxxx')
+    cache.add('b', 'yyyy')
+    cache.add('c', 'zzzz')
+    assert 'a' not in cache and cache.bytes == 8 and cache.evictions == 1
+    cache.add('big', 'x' * 11)
+    assert 'big' not in cache and cache.bytes == 8
+    cache.add('b', 'y' * 9)
+    assert list(cache._entries) == ['b'] and cache.bytes == 9
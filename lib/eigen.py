@@ -0,0 +1,338 @@
+"""
+Eigenvalues and eigenvectors of numeric matrices in pure python.
+
+General matrices are reduced to upper Hessenberg form with Householder
+reflections and then iterated with the implicitly (Francis double)
+shifted QR algorithm, which finds complex conjugate pairs with real
+arithmetic only. Eigenvectors come from inverse iteration. Symmetric
+matrices take the cyclic Jacobi path, which returns an orthonormal set
+of eigenvectors directly, repeated eigenvalues included.
+
+    values = eigenvalues([[2, 1], [1, 2]])        # [3.0, 1.0]
+    values, vectors = eig([[2, 1], [1, 2]])       # vectors are columns
+
+Eigenvalues are sorted by decreasing magnitude and eigenvectors are
+normalized to unit length, like eigVl/eigVc on the calculator.
+"""
+from math import sqrt
+from factorizations import LUFactorization
+
+EPS = 2.220446049250313e-16
+
+
+def is_symmetric(a, tol=1e-12) -> bool:
+    n = len(a)
+    return all(abs(a[i][j] - a[j][i]) <= tol * (1 + abs(a[i][j]))
+               for i in range(n) for j in range(i + 1, n))
+
+
+def _square_floats(a) -> list:
+    n = len(a)
+    if any(len(row) != n for row in a):
+        raise ValueError("The matrix must be square.")
+    return [[float(x) for x in row] for row in a]
+
+
+def jacobi(a, tol=1e-12, max_sweeps=100):
+    """
+    Cyclic Jacobi rotations for a symmetric matrix.
+
+    Returns:
+        tuple: (eigenvalues, eigenvectors as a list of columns)
+    """
+    a = _square_floats(a)
+    n = len(a)
+    v = [[1.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
+    scale = sum(x * x for row in a for x in row) or 1.0
+
+    for _ in range(max_sweeps):
+        off = sum(a[i][j] * a[i][j] for i in range(n) for j in range(i + 1, n))
+        if off <= tol * tol * scale:
+            break
+        for p in range(n - 1):
+            for q in range(p + 1, n):
+                apq = a[p][q]
+                if abs(apq) <= EPS * EPS * scale:
+                    continue
+                theta = (a[q][q] - a[p][p]) / (2 * apq)
+                t = 1 / (abs(theta) + sqrt(theta * theta + 1))
+                if theta < 0:
+                    t = -t
+                c = 1 / sqrt(t * t + 1)
+                s = t * c
+                for row in a:
+                    akp, akq = row[p], row[q]
+                    row[p] = c * akp - s * akq
+                    row[q] = s * akp + c * akq
+                ap, aq = a[p], a[q]
+                for k in range(n):
+                    apk, aqk = ap[k], aq[k]
+                    ap[k] = c * apk - s * aqk
+                    aq[k] = s * apk + c * aqk
+                for row in v:
+                    vkp, vkq = row[p], row[q]
+                    row[p] = c * vkp - s * vkq
+                    row[q] = s * vkp + c * vkq
+    else:
+        raise ArithmeticError("Jacobi iteration did not converge")
+
+    values = [a[i][i] for i in range(n)]
+    vectors = [[v[k][i] for k in range(n)] for i in range(n)]
+    return values, vectors
+
+
+def hessenberg(a) -> list:
+    """Upper Hessenberg matrix similar to `a`, by Householder reflections."""
+    h = _square_floats(a)
+    n = len(h)
+    for k in range(n - 2):
+        x = [h[i][k] for i in range(k + 1, n)]
+        norm = sqrt(sum(xi * xi for xi in x))
+        if norm == 0:
+            continue
+        alpha = -norm if x[0] >= 0 else norm
+        x[0] -= alpha
+        vnorm = sqrt(sum(xi * xi for xi in x))
+        if vnorm == 0:
+            continue
+        v = [xi / vnorm for xi in x]
+        # H = (I - 2vv^T) H (I - 2vv^T), v acting on rows/cols k+1..n-1
+        for j in range(n):
+            dot = 2 * sum(v[i] * h[k + 1 + i][j] for i in range(len(v)))
+            if dot:
+                for i in range(len(v)):
+                    h[k + 1 + i][j] -= dot * v[i]
+        for row in h:
+            dot = 2 * sum(v[i] * row[k + 1 + i] for i in range(len(v)))
+            if dot:
+                for i in range(len(v)):
+                    row[k + 1 + i] -= dot * v[i]
+        for i in range(k + 2, n):
+            h[i][k] = 0.0
+    return h
+
+
+def hessenberg_qr(h, max_its=60) -> list:
+    """
+    Eigenvalues of an upper Hessenberg matrix by Francis double shift QR
+    with deflation (after hqr in Numerical Recipes). Real arithmetic
+    throughout, complex pairs come out as python complex numbers.
+    """
+    n = len(h)
+    # 1-based working copy keeps the classic index arithmetic readable
+    a = [[0.0] * (n + 1)] + [[0.0] + list(row) for row in h]
+    wr = [0.0] * (n + 1)
+    wi = [0.0] * (n + 1)
+    anorm = sum(abs(a[i][j]) for i in range(1, n + 1) for j in range(max(i - 1, 1), n + 1))
+
+    nn = n
+    t = 0.0
+    x = y = z = p = q = r = w = 0.0
+    while nn >= 1:
+        its = 0
+        while True:
+            l = nn
+            while l >= 2:
+                s = abs(a[l - 1][l - 1]) + abs(a[l][l])
+                if s == 0.0:
+                    s = anorm
+                if abs(a[l][l - 1]) <= EPS * s:
+                    a[l][l - 1] = 0.0
+                    break
+                l -= 1
+            if l < 1:
+                l = 1
+            x = a[nn][nn]
+            if l == nn:
+                # one root found
+                wr[nn] = x + t
+                wi[nn] = 0.0
+                nn -= 1
+            else:
+                y = a[nn - 1][nn - 1]
+                w = a[nn][nn - 1] * a[nn - 1][nn]
+                if l == nn - 1:
+                    # two roots found
+                    p = 0.5 * (y - x)
+                    q = p * p + w
+                    z = sqrt(abs(q))
+                    x += t
+                    if q >= 0.0:
+                        z = p + (z if p >= 0 else -z)
+                        wr[nn - 1] = wr[nn] = x + z
+                        if z:
+                            wr[nn] = x - w / z
+                        wi[nn - 1] = wi[nn] = 0.0
+                    else:
+                        wr[nn - 1] = wr[nn] = x + p
+                        wi[nn - 1] = -z
+                        wi[nn] = z
+                    nn -= 2
+                else:
+                    if its == max_its:
+                        raise ArithmeticError("QR iteration did not converge")
+                    if its and its % 10 == 0:
+                        # exceptional shift
+                        t += x
+                        for i in range(1, nn + 1):
+                            a[i][i] -= x
+                        s = abs(a[nn][nn - 1]) + abs(a[nn - 1][nn - 2])
+                        y = x = 0.75 * s
+                        w = -0.4375 * s * s
+                    its += 1
+                    m = nn - 2
+                    while m >= l:
+                        z = a[m][m]
+                        r = x - z
+                        s = y - z
+                        p = (r * s - w) / a[m + 1][m] + a[m][m + 1]
+                        q = a[m + 1][m + 1] - z - r - s
+                        r = a[m + 2][m + 1]
+                        s = abs(p) + abs(q) + abs(r)
+                        p /= s
+                        q /= s
+                        r /= s
+                        if m == l:
+                            break
+                        u = abs(a[m][m - 1]) * (abs(q) + abs(r))
+                        v = abs(p) * (abs(a[m - 1][m - 1]) + abs(z) + abs(a[m + 1][m + 1]))
+                        if u <= EPS * v:
+                            break
+                        m -= 1
+                    for i in range(m + 2, nn + 1):
+                        a[i][i - 2] = 0.0
+                        if i != m + 2:
+                            a[i][i - 3] = 0.0
+                    k = m
+                    while k <= nn - 1:
+                        if k != m:
+                            p = a[k][k - 1]
+                            q = a[k + 1][k - 1]
+                            r = a[k + 2][k - 1] if k != nn - 1 else 0.0
+                            x = abs(p) + abs(q) + abs(r)
+                            if x != 0.0:
+                                p /= x
+                                q /= x
+                                r /= x
+                        s = sqrt(p * p + q * q + r * r)
+                        if p < 0:
+                            s = -s
+                        if s != 0.0:
+                            if k == m:
+                                if l != m:
+                                    a[k][k - 1] = -a[k][k - 1]
+                            else:
+                                a[k][k - 1] = -s * x
+                            p += s
+                            x = p / s
+                            y = q / s
+                            z = r / s
+                            q /= p
+                            r /= p
+                            for j in range(k, nn + 1):
+                                p = a[k][j] + q * a[k + 1][j]
+                                if k != nn - 1:
+                                    p += r * a[k + 2][j]
+                                    a[k + 2][j] -= p * z
+                                a[k + 1][j] -= p * y
+                                a[k][j] -= p * x
+                            for i in range(l, min(nn, k + 3) + 1):
+                                p = x * a[i][k] + y * a[i][k + 1]
+                                if k != nn - 1:
+                                    p += z * a[i][k + 2]
+                                    a[i][k + 2] -= p * r
+                                a[i][k + 1] -= p * q
+                                a[i][k] -= p
+                        k += 1
+            if l >= nn - 1:
+                break
+
+    return [complex(wr[i], wi[i]) if wi[i] else wr[i] for i in range(1, n + 1)]
+
+
+def _sorted(values, vectors=None):
+    def key(i):
+        value = complex(values[i])
+        return (-abs(value), -value.real, -value.imag)
+    order = sorted(range(len(values)), key=key)
+    values = [values[i] for i in order]
+    if vectors is None:
+        return values
+    return values, [vectors[i] for i in order]
+
+
+def eigenvalues(a, tol=1e-12) -> list:
+    """Eigenvalues, complex where the matrix has complex conjugate pairs."""
+    a = _square_floats(a)
+    if is_symmetric(a):
+        return _sorted(jacobi(a, tol)[0])
+    return _sorted(hessenberg_qr(hessenberg(a)))
+
+
+def _unit(vector) -> list:
+    norm = sqrt(sum(abs(x) ** 2 for x in vector))
+    vector = [x / norm for x in vector]
+    # fix the sign (phase) so the largest component is positive real
+    big = max(vector, key=abs)
+    if isinstance(big, complex) or big < 0:
+        phase = abs(big) / big
+        vector = [x * phase for x in vector]
+    return [x.real if isinstance(x, complex) and abs(x.imag) <= 1e-12 else x for x in vector]
+
+
+def inverse_iteration(a, value, iterations=3) -> list:
+    """Unit eigenvector for an (approximate) eigenvalue."""
+    n = len(a)
+    shift = value + (abs(value) + 1) * 1e-10
+    shifted = [[a[i][j] - (shift if i == j else 0) for j in range(n)] for i in range(n)]
+    lu = LUFactorization(shifted)
+    x = [1.0 + 0.1 * i for i in range(n)]
+    for _ in range(iterations):
+        x = _unit(lu.solve(x))
+    return x
+
+
+def eig(a, tol=1e-12):
+    """
+    (eigenvalues, eigenvectors) with one unit eigenvector per value,
+    each given as a list (a column of eigVc).
+    """
+    a = _square_floats(a)
+    if is_symmetric(a):
+        values, vectors = jacobi(a, tol)
+        return _sorted(values, [_unit(v) for v in vectors])
+    values = _sorted(hessenberg_qr(hessenberg(a)))
+    return values, [inverse_iteration(a, value) for value in values]
+
+
+if __name__ == '__main__':
+    import random
+
+    def residual(a, value, vector):
+        n = len(a)
+        return max(abs(sum(a[i][j] * vector[j] for j in range(n)) - value * vector[i])
+                   for i in range(n))
+
+    assert [round(x, 9) for x in eigenvalues([[2, 1], [1, 2]])] == [3, 1]
+    rotation = eigenvalues([[0, -1], [1, 0]])
+    assert sorted((v.real, v.imag) for v in rotation) == [(0, -1), (0, 1)]
+
+    random.seed(5)
+    for n in range(1, 8):
+        for _ in range(20):
+            a = [[random.uniform(-3, 3) for _ in range(n)] for _ in range(n)]
+            values, vectors = eig(a)
+            assert abs(sum(values) - sum(a[i][i] for i in range(n))) < 1e-8
+            for value, vector in zip(values, vectors):
+                assert residual(a, value, vector) < 1e-6
+
+            sym = [[a[i][j] + a[j][i] for j in range(n)] for i in range(n)]
+            values, vectors = eig(sym)
+            assert all(isinstance(v, float) for v in values)
+            for value, vector in zip(values, vectors):
+                assert residual(sym, value, vector) < 1e-8
+
+    # repeated eigenvalue, the symmetric path still gives two vectors
+    values, vectors = eig([[2, 0, 0], [0, 2, 0], [0, 0, 5]])
+    assert [round(v, 12) for v in values] == [5, 2, 2]
+    assert abs(sum(x * y for x, y in zip(vectors[1], vectors[2]))) < 1e-12
@@ -0,0 +1,314 @@
+"""
+Elimination kernels shared by the matrix classes.
+
+Every routine here works on a plain list of rows, never prints and never
+mutates its input, so the step-by-step classes can lean on them for the
+arithmetic and keep their own logging.
+"""
+from frac import Frac, gcd
+
+
+def is_int_matrix(rows) -> bool:
+    """True when every entry is a python int, which enables the exact paths."""
+    return all(isinstance(x, int) for row in rows for x in row)
+
+
+def det_bareiss(rows) -> int:
+    """
+    Exact determinant of an integer matrix using fraction-free
+    (Bareiss) elimination. Every intermediate stays an int because
+    each update is exactly divisible by the previous pivot.
+    """
+    a = [row[:] for row in rows]
+    n = len(a)
+    if n == 0:
+        return 1
+
+    sign = 1
+    prev = 1
+    for k in range(n - 1):
+        if a[k][k] == 0:
+            for i in range(k + 1, n):
+                if a[i][k] != 0:
+                    a[k], a[i] = a[i], a[k]
+                    sign = -sign
+                    break
+            else:
+                return 0
+
+        pivot = a[k][k]
+        pivot_row = a[k]
+        for i in range(k + 1, n):
+            row = a[i]
+            factor = row[k]
+            for j in range(k + 1, n):
+                row[j] = (row[j] * pivot - factor * pivot_row[j]) // prev
+        prev = pivot
+
+    return sign * a[n - 1][n - 1]
+
+
+def det_pivoted(rows, tol=0):
+    """
+    Determinant by Gaussian elimination with partial pivoting.
+    Exact for Fractions, also mixed with ints (an int over an int pivot
+    divides to an int or Frac), and any pivot with ``abs(pivot) <= tol``
+    is treated as zero for floats.
+    """
+    a = [row[:] for row in rows]
+    n = len(a)
+
+    det = 1
+    for k in range(n):
+        p = max(range(k, n), key=lambda i: abs(a[i][k]))
+        pivot = a[p][k]
+        if abs(pivot) <= tol:
+            return 0
+        if p != k:
+            a[k], a[p] = a[p], a[k]
+            det = -det
+        det *= pivot
+
+        pivot_row = a[k]
+        for i in range(k + 1, n):
+            row = a[i]
+            value = row[k]
+            if type(value) is int and type(pivot) is int:
+                factor = exact_ratio(value, pivot)
+            else:
+                factor = value / pivot
+            if factor == 0:
+                continue
+            for j in range(k + 1, n):
+                row[j] -= factor * pivot_row[j]
+
+    return det
+
+
+def bareiss_eliminate(rows, reduce=False):
+    """
+    Fraction-free elimination of an integer matrix.
+
+    Each update ``(pivot * a[i][j] - a[i][c] * a[r][j]) // prev`` is an
+    exact integer division, so no fractions are ever formed. With
+    ``reduce=True`` rows above each pivot are cleared as well
+    (Jordan-Bareiss) and every pivot ends up equal to the last one.
+
+    Returns:
+        tuple: (rows, pivots, sign, last pivot) where pivots is a list of
+        (row, col) tuples and sign tracks the row swaps.
+    """
+    a = [row[:] for row in rows]
+    m = len(a)
+    n = len(a[0]) if m else 0
+
+    pivots = []
+    sign = 1
+    prev = 1
+    r = 0
+    for c in range(n):
+        if r == m:
+            break
+        for p in range(r, m):
+            if a[p][c] != 0:
+                break
+        else:
+            continue
+        if p != r:
+            a[r], a[p] = a[p], a[r]
+            sign = -sign
+
+        pivot = a[r][c]
+        pivot_row = a[r]
+        start = c if reduce else c + 1
+        for i in (range(m) if reduce else range(r + 1, m)):
+            if i == r:
+                continue
+            row = a[i]
+            factor = row[c]
+            if reduce:
+                # entries left of the pivot only need rescaling
+                for j in range(c):
+                    if row[j]:
+                        row[j] = row[j] * pivot // prev
+            for j in range(start, n):
+                row[j] = (row[j] * pivot - factor * pivot_row[j]) // prev
+            if not reduce:
+                row[c] = 0
+
+        pivots.append((r, c))
+        prev = pivot
+        r += 1
+
+    return a, pivots, sign, prev
+
+
+def exact_ratio(numerator: int, denominator: int):
+    """int when the division is exact, otherwise a reduced Frac."""
+    if numerator % denominator == 0:
+        return numerator // denominator
+    return Frac(numerator, denominator)
+
+
+def rref_exact(rows):
+    """
+    Exact RREF of an integer matrix. Entries are ints, or Frac where the
+    result is not integral, and never pass through a float.
+
+    Returns:
+        tuple: (rows, pivots)
+    """
+    a, pivots, _, last = bareiss_eliminate(rows, reduce=True)
+    if not pivots:
+        return a, pivots
+    rref = [[exact_ratio(x, last) for x in row] for row in a]
+    return rref, pivots
+
+
+def as_integer_rows(rows):
+    """
+    Scale every row of an int/Frac matrix by the lcm of its denominators.
+    Row scaling keeps the row space, rank and null space, so the exact
+    Bareiss routines apply. None when an entry is not an exact rational.
+    """
+    scaled = []
+    for row in rows:
+        lcm = 1
+        for x in row:
+            if isinstance(x, Frac):
+                d = x.denominator
+                if not isinstance(d, int) or not isinstance(x.numerator, int):
+                    return None
+                lcm = lcm * d // gcd(lcm, d)
+            elif not isinstance(x, int):
+                return None
+        scaled.append([x * lcm if isinstance(x, int)
+                       else x.numerator * (lcm // x.denominator) for x in row])
+    return scaled
+
+
+def rank_exact(rows) -> int:
+    """Exact rank of an integer matrix."""
+    return len(bareiss_eliminate(rows)[1])
+
+
+def gauss_jordan_inverse(rows, tol=1e-12) -> list:
+    """
+    Inverse by Gauss-Jordan elimination with partial pivoting on one
+    augmented [A | I] buffer. Left of column i every row except the
+    pivot row is already zero, so each update only touches columns >= i.
+    Raises ValueError when a pivot is within `tol` times the largest
+    entry of its column of A of zero, so the test does not depend on
+    how the matrix is scaled.
+    """
+    n = len(rows)
+    if any(len(row) != n for row in rows):
+        raise ValueError("The matrix must be square.")
+
+    a = [list(row) + [0] * n for row in rows]
+    for i in range(n):
+        a[i][n + i] = 1
+    limits = [tol * max(abs(row[j]) for row in rows) for j in range(n)]
+
+    for i in range(n):
+        p = max(range(i, n), key=lambda r: abs(a[r][i]))
+        pivot = a[p][i]
+        if abs(pivot) <= limits[i]:
+            raise ValueError("The matrix is singular and does not have an inverse.")
+        if p != i:
+            a[i], a[p] = a[p], a[i]
+
+        tail = [x / pivot for x in a[i][i:]]
+        a[i][i:] = tail
+        for j in range(n):
+            if j == i:
+                continue
+            row = a[j]
+            factor = row[i]
+            if factor:
+                row[i:] = [x - factor * y for x, y in zip(row[i:], tail)]
+
+    return [row[n:] for row in a]
+
+
+def determinant(rows, tol=0):
+    """
+    Determinant of a square list of rows in O(n^3).
+    Integer matrices take the exact Bareiss path, everything
+    else is eliminated with partial pivoting.
+    """
+    n = len(rows)
+    if any(len(row) != n for row in rows):
+        raise ValueError("The matrix must be square.")
+    if is_int_matrix(rows):
+        return det_bareiss(rows)
+    return det_pivoted(rows, tol)
+
+
+if __name__ == '__main__':
+    from fractions import Fraction
+
+    assert det_bareiss([[1, 2], [3, 4]]) == -2
+    assert det_bareiss([[0, 1], [1, 0]]) == -1
+    assert det_bareiss([[2, 0, 1], [1, 3, 2], [1, 1, 2]]) == 6
+    assert det_bareiss([[1, 2, 3], [4, 5, 6], [7, 8, 9]]) == 0
+    assert determinant([[Fraction(1, 2), 1], [1, 4]]) == 1
+    det = det_pivoted([[2, 1], [1, Fraction(3, 2)]])
+    assert det == 2 and not isinstance(det, float)
+    det = det_pivoted([[3, 1, Fraction(1, 3)], [1, 2, 1], [2, 1, Fraction(1, 2)]])
+    assert det == Fraction(1, 2) and not isinstance(det, float)
+    assert abs(determinant([[0.5, 1.0], [1.0, 4.0]]) - 1.0) < 1e-12
+    assert rank_exact([[1, 2, 3], [4, 5, 6], [7, 8, 9]]) == 2
+    assert as_integer_rows([[Frac(1, 2), 1], [Frac(2, 3), Frac(1, 6)]]) == [[1, 2], [4, 1]]
+    assert as_integer_rows([[0.5, 1]]) is None
+
+    # Jordan-Bareiss agrees with a plain Fraction Gauss-Jordan
+    import random
+
+    def fraction_rref(rows):
+        a = [[Fraction(x) for x in row] for row in rows]
+        m, n = len(a), len(a[0])
+        r = 0
+        for c in range(n):
+            p = next((i for i in range(r, m) if a[i][c] != 0), None)
+            if p is None:
+                continue
+            a[r], a[p] = a[p], a[r]
+            a[r] = [x / a[r][c] for x in a[r]]
+            for i in range(m):
+                if i != r and a[i][c] != 0:
+                    f = a[i][c]
+                    a[i] = [x - f * y for x, y in zip(a[i], a[r])]
+            r += 1
+            if r == m:
+                break
+        return a
+
+    random.seed(1)
+    for _ in range(200):
+        m, n = random.randint(1, 5), random.randint(1, 6)
+        rows = [[random.randint(-3, 3) for _ in range(n)] for _ in range(m)]
+        if random.random() < 0.3 and m > 1:
+            rows[-1] = [2 * x - y for x, y in zip(rows[0], rows[1 % m])]
+        exact, _ = rref_exact(rows)
+        expected = fraction_rref(rows)
+        assert all(float(x) == float(y) and Fraction(x.n, x.d) == y
+                   if isinstance(x, Frac) else x == y
+                   for rx, ry in zip(exact, expected) for x, y in zip(rx, ry))
+        if m == n:
+            assert det_bareiss(rows) == determinant(
+                [[Fraction(x) for x in row] for row in rows])
+
+    assert determinant([[1e-14, 0.0], [0.0, 1e-14]], tol=1e-12) == 0
+
+    assert gauss_jordan_inverse([[0, 1], [2, 0]]) == [[0, 0.5], [1, 0]]
+    assert gauss_jordan_inverse([[Fraction(1, 2), 0], [0, 4]]) == [[2, 0], [0, Fraction(1, 4)]]
+    # the singularity test is relative to the column scale
+    tiny = gauss_jordan_inverse([[2e-13, 1e-13], [1e-13, 3e-13]])
+    assert abs(tiny[0][0] - 6e12) < 1e-3 * 6e12 and abs(tiny[0][1] + 2e12) < 1e-3 * 2e12
+    for singular in ([[1, 2], [2, 4]], [[1e15, 3e15], [3e15, 9e15 + 2]]):
+        try:
+            gauss_jordan_inverse(singular)
+            assert False
+        except ValueError:
+            pass
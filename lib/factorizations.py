@@ -0,0 +1,372 @@
+"""
+Reusable matrix factorizations.
+
+A factorization is computed once from a plain list of rows and then
+answers any number of solves, so repeated right-hand sides cost O(n^2)
+each instead of a fresh O(n^3) elimination.
+"""
+from math import sqrt
+from operator import mul
+
+
+def _as_vector(b) -> list:
+    """Accept a flat list or a column vector ([[x], [y], ...])."""
+    if hasattr(b, 'data'):
+        b = b.data
+    if b and isinstance(b[0], list):
+        if len(b) == 1:
+            return list(b[0])
+        return [row[0] for row in b]
+    return list(b)
+
+
+class LUFactorization:
+    """
+    LU factorization with partial pivoting, P·A = L·U.
+
+    L (unit lower) and U are stored packed in a single list of rows and
+    the row permutation is kept as a vector, perm[i] being the row of A
+    that ended up in row i.
+
+    Usage:
+        lu = LUFactorization([[1, 3, -4], [1, 0, -3], [-1, -15, 11]])
+        x = lu.solve([3, 1, -8])
+        xs = lu.solve_many([[3, 1, -8], [1, 0, 0]])
+    """
+
+    def __init__(self, rows, tol=0):
+        n = len(rows)
+        if any(len(row) != n for row in rows):
+            raise ValueError("The matrix must be square.")
+
+        lu = [list(row) for row in rows]
+        perm = list(range(n))
+        sign = 1
+        singular = False
+
+        for k in range(n):
+            p = max(range(k, n), key=lambda i: abs(lu[i][k]))
+            if abs(lu[p][k]) <= tol:
+                singular = True
+                continue
+            if p != k:
+                lu[k], lu[p] = lu[p], lu[k]
+                perm[k], perm[p] = perm[p], perm[k]
+                sign = -sign
+
+            pivot_row = lu[k]
+            pivot = pivot_row[k]
+            for i in range(k + 1, n):
+                row = lu[i]
+                factor = row[k] / pivot
+                row[k] = factor
+                if factor == 0:
+                    continue
+                for j in range(k + 1, n):
+                    row[j] -= factor * pivot_row[j]
+
+        self.n = n
+        self.tol = tol
+        self.lu = lu
+        self.perm = perm
+        self.sign = sign
+        self.singular = singular
+
+    @property
+    def L(self) -> list:
+        return [[1 if i == j else (self.lu[i][j] if j < i else 0)
+                 for j in range(self.n)] for i in range(self.n)]
+
+    @property
+    def U(self) -> list:
+        return [[self.lu[i][j] if j >= i else 0
+                 for j in range(self.n)] for i in range(self.n)]
+
+    @property
+    def P(self) -> list:
+        return [[1 if self.perm[i] == j else 0
+                 for j in range(self.n)] for i in range(self.n)]
+
+    def det(self):
+        if self.singular:
+            return 0
+        det = self.sign
+        for i in range(self.n):
+            det *= self.lu[i][i]
+        return det
+
+    def forward(self, b) -> list:
+        """Solve L·y = P·b."""
+        lu = self.lu
+        b = _as_vector(b)
+        y = [b[p] for p in self.perm]
+        for i in range(1, self.n):
+            row = lu[i]
+            acc = y[i]
+            for j in range(i):
+                acc -= row[j] * y[j]
+            y[i] = acc
+        return y
+
+    def backward(self, y) -> list:
+        """Solve U·x = y."""
+        lu = self.lu
+        x = y[:]
+        for i in range(self.n - 1, -1, -1):
+            row = lu[i]
+            acc = x[i]
+            for j in range(i + 1, self.n):
+                acc -= row[j] * x[j]
+            x[i] = acc / row[i]
+        return x
+
+    def solve(self, b) -> list:
+        """Solve A·x = b in O(n^2) using the stored factors."""
+        if self.singular:
+            raise ValueError("The matrix is singular.")
+        b = _as_vector(b)
+        if len(b) != self.n:
+            raise ValueError("b must have length {}".format(self.n))
+        return self.backward(self.forward(b))
+
+    def solve_many(self, B) -> list:
+        """Solve A·x = b for every right-hand side b in B."""
+        return [self.solve(b) for b in B]
+
+    def inverse(self) -> list:
+        """A^-1, one O(n^2) solve per column of the identity."""
+        n = self.n
+        cols = self.solve_many(
+            [[1 if i == j else 0 for i in range(n)] for j in range(n)])
+        return [[cols[j][i] for j in range(n)] for i in range(n)]
+
+    def __repr__(self):
+        return "<LUFactorization n={} singular={}>".format(self.n, self.singular)
+
+
+class Cholesky:
+    """
+    A = L·L^T for a symmetric positive definite matrix, about half the
+    work of LU and no pivoting. Only the lower triangle of A is read.
+    Raises ValueError when A is not positive definite.
+
+    Usage:
+        chol = Cholesky([[4, 2], [2, 3]])
+        x = chol.solve([2, 1])
+    """
+
+    def __init__(self, rows):
+        n = len(rows)
+        if any(len(row) != n for row in rows):
+            raise ValueError("The matrix must be square.")
+
+        L = [[0.0] * n for _ in range(n)]
+        for i in range(n):
+            Li = L[i]
+            row = rows[i]
+            for j in range(i + 1):
+                Lj = L[j]
+                acc = row[j]
+                for k in range(j):
+                    acc -= Li[k] * Lj[k]
+                if i == j:
+                    if acc <= 0:
+                        raise ValueError("The matrix is not positive definite.")
+                    Li[i] = sqrt(acc)
+                else:
+                    Li[j] = acc / Lj[j]
+        self.n = n
+        self.L = L
+
+    def det(self):
+        det = 1.0
+        for i in range(self.n):
+            det *= self.L[i][i]
+        return det * det
+
+    def solve(self, b) -> list:
+        """Solve L·y = b, then L^T·x = y."""
+        L, n = self.L, self.n
+        b = _as_vector(b)
+        if len(b) != n:
+            raise ValueError("b must have length {}".format(n))
+        y = b[:]
+        for i in range(n):
+            row = L[i]
+            acc = y[i]
+            for k in range(i):
+                acc -= row[k] * y[k]
+            y[i] = acc / row[i]
+        for i in range(n - 1, -1, -1):
+            acc = y[i]
+            for k in range(i + 1, n):
+                acc -= L[k][i] * y[k]
+            y[i] = acc / L[i][i]
+        return y
+
+    def solve_many(self, B) -> list:
+        return [self.solve(b) for b in B]
+
+    def inverse(self) -> list:
+        n = self.n
+        cols = self.solve_many(
+            [[1 if i == j else 0 for i in range(n)] for j in range(n)])
+        return [[cols[j][i] for j in range(n)] for i in range(n)]
+
+    def __repr__(self):
+        return "<Cholesky n={}>".format(self.n)
+
+
+class QRFactorization:
+    """
+    Householder QR of an m x n matrix with m >= n, A = Q·R.
+
+    Columns are stored as lists so each reflection is a handful of
+    C-level dot products, and Q is never formed: only the Householder
+    vectors are kept and applied to right-hand sides. Least squares
+    through R·x = Q^T·b avoids the normal equations A^T·A·x = A^T·b,
+    which square the condition number and cost O(m·n^2) just to build.
+
+    Usage:
+        qr = QRFactorization([[1, 1], [1, 2], [1, 3]])
+        x = qr.solve([1, 2, 2])            # least squares fit
+        r = qr.residual_norm([1, 2, 2])    # ||A·x - b||
+    """
+
+    def __init__(self, rows, tol=1e-12):
+        m = len(rows)
+        n = len(rows[0]) if m else 0
+        if m < n:
+            raise ValueError("QR needs at least as many rows as columns.")
+        cols = [[float(row[j]) for row in rows] for j in range(n)]
+
+        vectors = []
+        betas = []
+        for k in range(n):
+            x = cols[k][k:]
+            norm = sqrt(sum(map(mul, x, x)))
+            alpha = -norm if x[0] >= 0 else norm
+            x[0] -= alpha
+            vnorm2 = sum(map(mul, x, x))
+            beta = 2 / vnorm2 if vnorm2 else 0.0
+            for j in range(k + 1, n):
+                col = cols[j]
+                s = beta * sum(map(mul, x, col[k:]))
+                if s:
+                    col[k:] = [c - s * v for c, v in zip(col[k:], x)]
+            cols[k][k] = alpha
+            vectors.append(x)
+            betas.append(beta)
+
+        self.m, self.n = m, n
+        self.tol = tol
+        self._cols = cols
+        self._vectors = vectors
+        self._betas = betas
+        scale = max([abs(cols[k][k]) for k in range(n)] + [0.0])
+        self.rank_deficient = any(abs(cols[k][k]) <= tol * scale for k in range(n)) or scale == 0
+
+    @property
+    def R(self) -> list:
+        """The n x n upper triangular factor."""
+        cols = self._cols
+        return [[cols[j][i] if j >= i else 0.0 for j in range(self.n)] for i in range(self.n)]
+
+    @property
+    def Q(self) -> list:
+        """The thin m x n orthonormal factor, built on demand."""
+        m, n = self.m, self.n
+        columns = [self._apply_q([1.0 if i == j else 0.0 for i in range(m)]) for j in range(n)]
+        return [[columns[j][i] for j in range(n)] for i in range(m)]
+
+    def apply_qt(self, b) -> list:
+        """Q^T·b, all m entries."""
+        y = [float(x) for x in _as_vector(b)]
+        if len(y) != self.m:
+            raise ValueError("b must have length {}".format(self.m))
+        for k, (v, beta) in enumerate(zip(self._vectors, self._betas)):
+            s = beta * sum(map(mul, v, y[k:]))
+            if s:
+                y[k:] = [c - s * w for c, w in zip(y[k:], v)]
+        return y
+
+    def _apply_q(self, y) -> list:
+        for k in range(self.n - 1, -1, -1):
+            v, beta = self._vectors[k], self._betas[k]
+            s = beta * sum(map(mul, v, y[k:]))
+            if s:
+                y[k:] = [c - s * w for c, w in zip(y[k:], v)]
+        return y
+
+    def _back_substitute(self, y) -> list:
+        if self.rank_deficient:
+            raise ValueError("The columns are linearly dependent.")
+        cols = self._cols
+        x = y[:self.n]
+        for i in range(self.n - 1, -1, -1):
+            acc = x[i]
+            for j in range(i + 1, self.n):
+                acc -= cols[j][i] * x[j]
+            x[i] = acc / cols[i][i]
+        return x
+
+    def solve(self, b) -> list:
+        """x minimizing ||A·x - b||, the exact solution when A is square."""
+        return self._back_substitute(self.apply_qt(b))
+
+    def solve_many(self, B) -> list:
+        return [self.solve(b) for b in B]
+
+    def residual_norm(self, b) -> float:
+        """||A·x - b|| at the least squares x, read off Q^T·b without forming x."""
+        y = self.apply_qt(b)[self.n:]
+        return sqrt(sum(map(mul, y, y)))
+
+    def lstsq(self, b) -> tuple:
+        """(x, residual norm) from a single application of Q^T."""
+        y = self.apply_qt(b)
+        rest = y[self.n:]
+        return self._back_substitute(y), sqrt(sum(map(mul, rest, rest)))
+
+    def __repr__(self):
+        return "<QRFactorization {}x{} rank_deficient={}>".format(self.m, self.n, self.rank_deficient)
+
+
+if __name__ == '__main__':
+    A = [[1, 3, -4], [1, 0, -3], [-1, -15, 11]]
+    lu = LUFactorization(A)
+    x = lu.solve([3, 1, -8])
+    assert all(abs(sum(a * b for a, b in zip(row, x)) - r) < 1e-9
+               for row, r in zip(A, [3, 1, -8]))
+    assert abs(lu.det() - (1 * (0 * 11 - 45) - 3 * (11 - 3) + -4 * (-15))) < 1e-9
+    inv = lu.inverse()
+    for i in range(3):
+        for j in range(3):
+            value = sum(A[i][k] * inv[k][j] for k in range(3))
+            assert abs(value - (1 if i == j else 0)) < 1e-9
+    assert LUFactorization([[1, 2], [2, 4]]).det() == 0
+    assert LUFactorization([[0, 1], [1, 0]]).solve([[2], [3]]) == [3, 2]
+
+    S = [[4, 2, 0], [2, 5, 3], [0, 3, 6]]
+    chol = Cholesky(S)
+    x = chol.solve([2, 1, 3])
+    assert all(abs(sum(a * b for a, b in zip(row, x)) - r) < 1e-9
+               for row, r in zip(S, [2, 1, 3]))
+    assert abs(chol.det() - LUFactorization(S).det()) < 1e-9
+    try:
+        Cholesky([[1, 2], [2, 1]])
+        assert False
+    except ValueError:
+        pass
+
+    # least squares line through (1, 1), (2, 2), (3, 2): y = 2/3 + x/2
+    qr = QRFactorization([[1, 1], [1, 2], [1, 3]])
+    x, residual = qr.lstsq([1, 2, 2])
+    assert abs(x[0] - 2 / 3) < 1e-12 and abs(x[1] - 0.5) < 1e-12
+    assert abs(residual - sqrt(1 / 6)) < 1e-12
+    Q, R = qr.Q, qr.R
+    assert all(abs(sum(Q[i][k] * R[k][j] for k in range(2)) - [[1, 1], [1, 2], [1, 3]][i][j]) < 1e-12
+               for i in range(3) for j in range(2))
+    x = QRFactorization(A).solve([3, 1, -8])
+    assert all(abs(a - b) < 1e-9 for a, b in zip(x, lu.solve([3, 1, -8])))
+    assert QRFactorization([[1, 2], [2, 4], [3, 6]]).rank_deficient
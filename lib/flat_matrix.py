@@ -0,0 +1,229 @@
+"""
+Compact, row-major dense storage for numeric matrices.
+
+ListLike2D keeps one list object per row and a boxed python number per
+cell. FlatMatrix keeps the whole matrix in a single array('q') (int64)
+or array('d') (float64) buffer with the dimensions stored once, so a
+500x500 float matrix is one 2MB buffer instead of 250k float objects.
+Row views are zero-copy memoryview slices and clone() is one buffer copy.
+
+It is also the flat storage mode of ListLike2D and PyMatrix: built from a
+FlatMatrix, or switched with compact(), a matrix keeps only the buffer.
+Cell access, clone(), +, - and scalar * then work on the buffer, and the
+row lists are only unpacked when a row-list kernel (RREF, LU, ...) reads
+.data.
+
+    flat = FlatMatrix.from_rows([[1, 2], [3, 4]])
+    flat.row(1)[0] = 5          # writes through to the buffer
+    PyMatrix(flat).clone()      # one buffer copy
+    PyMatrix(rows).compact()    # the same, in place
+"""
+from array import array
+from collections import namedtuple
+
+Dimensions = namedtuple('Dimensions', ['rows', 'cols'])
+
+# MicroPython and some 32 bit builds have no 'q', fall back to 'l'
+try:
+    array('q')
+    INT_CODE = 'q'
+except ValueError:
+    INT_CODE = 'l'
+FLOAT_CODE = 'd'
+# ints beyond this lose digits in a float64 buffer
+_EXACT_INT = 2 ** 53
+
+
+def _typecode(values) -> str:
+    """'q' when every value is a machine int, 'd' when any is a float."""
+    code = INT_CODE
+    for x in values:
+        if isinstance(x, bool) or not isinstance(x, (int, float)):
+            raise ValueError("FlatMatrix only stores ints and floats, got {!r}".format(x))
+        if isinstance(x, float):
+            code = FLOAT_CODE
+    return code
+
+
+class FlatMatrix:
+    """Row-major numeric matrix over a single array buffer."""
+
+    def __init__(self, rows: int, cols: int, buffer=None, typecode: str = FLOAT_CODE):
+        if buffer is None:
+            buffer = array(typecode, bytes(rows * cols * array(typecode).itemsize))
+        elif len(buffer) != rows * cols:
+            raise ValueError("buffer must hold {} values".format(rows * cols))
+        self.buffer = buffer
+        self.dims = Dimensions(rows, cols)
+
+    @classmethod
+    def from_rows(cls, rows: list, typecode: str = None) -> 'FlatMatrix':
+        """Pack a list of rows, ints stay int64 unless a float is present."""
+        if hasattr(rows, 'data'):
+            rows = rows.data
+        n, m = len(rows), len(rows[0]) if rows else 0
+        if any(len(row) != m for row in rows):
+            raise ValueError("All rows must be the same length")
+        values = [x for row in rows for x in row]
+        if typecode is None:
+            typecode = _typecode(values)
+        try:
+            buffer = array(typecode, values)
+        except OverflowError:
+            raise ValueError("integer entries do not fit in a machine int")
+        return cls(n, m, buffer, typecode)
+
+    @classmethod
+    def from_listlike(cls, matrix, typecode: str = None) -> 'FlatMatrix':
+        return cls.from_rows(matrix.data, typecode)
+
+    @property
+    def typecode(self) -> str:
+        return self.buffer.typecode
+
+    def can_store(self, value) -> bool:
+        """True when value fits the buffer without changing what it is."""
+        kind = type(value)
+        if self.buffer.typecode == FLOAT_CODE:
+            return kind is float or (kind is int and -_EXACT_INT <= value <= _EXACT_INT)
+        if kind is not int:
+            return False
+        try:
+            array(self.buffer.typecode, (value,))
+        except OverflowError:
+            return False
+        return True
+
+    def row(self, i: int) -> memoryview:
+        """Zero-copy, writable view of row i."""
+        cols = self.dims.cols
+        return memoryview(self.buffer)[i * cols:(i + 1) * cols]
+
+    def col(self, j: int) -> list:
+        return list(self.buffer[j::self.dims.cols])
+
+    def to_rows(self) -> list:
+        cols = self.dims.cols
+        if not cols:
+            return [[] for _ in range(self.dims.rows)]
+        buffer = self.buffer
+        return [buffer[i:i + cols].tolist() for i in range(0, len(buffer), cols)]
+
+    def to_listlike(self):
+        from listlike2d import ListLike2D
+        return ListLike2D(self.to_rows(), convert=False)
+
+    def clone(self) -> 'FlatMatrix':
+        """A single buffer copy, no per cell work."""
+        rows, cols = self.dims
+        return FlatMatrix(rows, cols, array(self.typecode, self.buffer), self.typecode)
+
+    def swap_rows(self, i: int, j: int) -> 'FlatMatrix':
+        if i != j:
+            cols = self.dims.cols
+            buffer = self.buffer
+            a, b = i * cols, j * cols
+            tmp = buffer[a:a + cols]
+            buffer[a:a + cols] = buffer[b:b + cols]
+            buffer[b:b + cols] = tmp
+        return self
+
+    def transpose(self) -> 'FlatMatrix':
+        rows, cols = self.dims
+        buffer = self.buffer
+        data = array(self.typecode)
+        for j in range(cols):
+            data.extend(buffer[j::cols])
+        return FlatMatrix(cols, rows, data, self.typecode)
+
+    def _combine(self, other, op) -> 'FlatMatrix':
+        if self.dims != other.dims:
+            raise ValueError("Matrices must have the same dimensions")
+        code = FLOAT_CODE if FLOAT_CODE in (self.typecode, other.typecode) else INT_CODE
+        data = array(code, map(op, self.buffer, other.buffer))
+        return FlatMatrix(self.dims.rows, self.dims.cols, data, code)
+
+    def __add__(self, other) -> 'FlatMatrix':
+        return self._combine(other, lambda a, b: a + b)
+
+    def __sub__(self, other) -> 'FlatMatrix':
+        return self._combine(other, lambda a, b: a - b)
+
+    def __mul__(self, other) -> 'FlatMatrix':
+        rows, cols = self.dims
+        if isinstance(other, (int, float)):
+            code = FLOAT_CODE if isinstance(other, float) else self.typecode
+            return FlatMatrix(rows, cols, array(code, [x * other for x in self.buffer]), code)
+        if cols != other.dims.rows:
+            raise ValueError("Matrices cannot be multiplied")
+        # walk the transpose so both operands are read row by row
+        other_t = other.transpose()
+        inner, out_cols = cols, other.dims.cols
+        a, b = self.buffer, other_t.buffer
+        code = FLOAT_CODE if FLOAT_CODE in (self.typecode, other.typecode) else INT_CODE
+        data = array(code)
+        for i in range(0, rows * inner, inner):
+            row = a[i:i + inner]
+            for j in range(0, out_cols * inner, inner):
+                data.append(sum(x * y for x, y in zip(row, b[j:j + inner])))
+        return FlatMatrix(rows, out_cols, data, code)
+
+    def __getitem__(self, indices):
+        if isinstance(indices, tuple):
+            return self.buffer[indices[0] * self.dims.cols + indices[1]]
+        return self.row(indices)
+
+    def __setitem__(self, indices, value) -> None:
+        if isinstance(indices, tuple):
+            self.buffer[indices[0] * self.dims.cols + indices[1]] = value
+        else:
+            self.row(indices)[:] = array(self.typecode, value)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FlatMatrix):
+            return self.dims == other.dims and list(self.buffer) == list(other.buffer)
+        if isinstance(other, list):
+            return self.to_rows() == other
+        return False
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def __repr__(self):
+        return "<FlatMatrix {}x{} '{}'>".format(self.dims.rows, self.dims.cols, self.typecode)
+
+
+if __name__ == '__main__':
+    empty = FlatMatrix.from_rows([])
+    assert empty.dims == (0, 0) and empty.to_rows() == [] and empty.clone().dims == (0, 0)
+    assert FlatMatrix.from_rows([[]]).to_rows() == [[]]
+
+    ints = FlatMatrix.from_rows([[1, 2, 3], [4, 5, 6]])
+    assert ints.typecode == INT_CODE and ints.dims == (2, 3)
+    assert ints.to_rows() == [[1, 2, 3], [4, 5, 6]]
+    assert ints[1, 2] == 6 and ints.col(1) == [2, 5]
+
+    view = ints.row(1)
+    view[0] = 40
+    assert ints[1, 0] == 40
+
+    copy = ints.clone()
+    copy[0, 0] = 99
+    assert ints[0, 0] == 1 and copy[0, 0] == 99
+
+    ints.swap_rows(0, 1)
+    assert ints.to_rows() == [[40, 5, 6], [1, 2, 3]]
+    assert ints.transpose().to_rows() == [[40, 1], [5, 2], [6, 3]]
+
+    floats = FlatMatrix.from_rows([[0.5, 1], [2, 3]])
+    assert floats.typecode == FLOAT_CODE
+    assert (floats + floats).to_rows() == [[1.0, 2.0], [4.0, 6.0]]
+    assert (floats * FlatMatrix.from_rows([[1, 0], [0, 1]])) == floats
+    assert (FlatMatrix.from_rows([[1, 2], [3, 4]]) * FlatMatrix.from_rows([[5], [6]])).to_rows() == [[17], [39]]
+    assert (floats * 2).to_rows() == [[1.0, 2.0], [4.0, 6.0]]
+
+    try:
+        FlatMatrix.from_rows([[2 ** 70]])
+        assert False
+    except ValueError:
+        pass
@@ -2,386 +2,344 @@ from collections import namedtuple
 import sys
 if sys.implementation.name != 'micropython':
     from fractions import Fraction
-    
+
+from math import frexp
+try:
+    from math import gcd
+except ImportError:
+    def gcd(a: int, b: int) -> int:
+        a, b = abs(a), abs(b)
+        while b:
+            a, b = b, a % b
+        return a
+
 FracTuple = namedtuple('FracTuple', ['numerator', 'denominator'])
 
 class Frac:...
 class Frac:
+    """
+    Immutable rational number stored as a reduced int numerator and a
+    positive int denominator. Arithmetic between Frac and int values is
+    exact integer arithmetic; only float inputs go through the
+    dec_to_frac approximation (within `error`). Comparisons with a float
+    use its exact value, so Frac hashes like the equal int, float or
+    Fraction, and small values are interned.
+
+        Frac(1, 3) + Frac(1, 6)     # 1/2
+        Frac(0.333333)              # 1/3
+        Frac("2/4")                 # 1/2
+    """
+    __slots__ = ('_n', '_d')
+
+    def __new__(cls,
+                number: int | float | FracTuple | Frac | str = 0,
+                denom: int | float = 1,
+                error=1e-6) -> Frac:
+
+        if isinstance(number, int) and isinstance(denom, int):
+            return _exact(number, denom)
+        if isinstance(number, Frac) and denom == 1:
+            return number
+        if isinstance(number, str):
+            number = FracTuple(*_parse_from_string(number, error))
+        top, bottom = _rational(number), _rational(denom)
+        if top is not None and bottom is not None:
+            return _exact(top[0] * bottom[1], top[1] * bottom[0])
+        if isinstance(number, (int, float, Frac)) and isinstance(denom, (int, float, Frac)):
+            if denom == 0:
+                raise ZeroDivisionError("The denominator cannot be 0!")
+            return _exact(*Frac.dec_to_frac(float(number) / float(denom), error=error))
+        if top is None:
+            raise TypeError("Invalid type for number: {}".format(type(number)))
+        raise TypeError("Invalid type for denom: {}".format(type(denom)))
+
+    def __setattr__(self, name, value):
+        # instances are shared (interned), so they can never change
+        raise AttributeError("Frac is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Frac is immutable")
 
-    def __init__(self,
-                 number: int | float | FracTuple | Frac | str = 0,
-                 denom: int = 1,
-                 error=1e-6) -> None:
-        
-        self._num = None
-        self._den = None
-        self._dec = None
-        self._error = error
-        self._refresh = True
-        
-        if isinstance(number, (int, float)):
-            self.n, self.d = (number, denom or 1)
-        elif isinstance(number, (Frac, FracTuple)):
-            self.n, self.d = (number.numerator, number.denominator)
-        elif isinstance(number, str):
-            self.n, self.d = self._parse_from_string(number)
+    def __reduce__(self):
+        # rebuilt through the constructor, never by setting slots on an
+        # interned instance
+        return (Frac, (self._n, self._d))
+
+    def __copy__(self) -> Frac:
+        return self
+
+    def __deepcopy__(self, memo) -> Frac:
+        return self
+
+    def __hash__(self) -> int:
+        """Same hash as an equal int, float or fractions.Fraction."""
+        n, d = self._n, self._d
+        if d == 1:
+            return hash(n)
+        if _HASH_MODULUS is None:
+            return hash((n, d))
+        try:
+            inverse = pow(d, _HASH_MODULUS - 2, _HASH_MODULUS)
+        except ValueError:
+            return hash((n, d))
+        if inverse == 0:
+            result = _HASH_INF
         else:
-            raise TypeError("Invalid type for number: {}".format(type(number)))
-            
-        if denom == 1:
-            self._n, self._d = self.dec_to_frac(self.approx, error=error)
+            result = hash(hash(abs(n)) * inverse)
+        result = result if n >= 0 else -result
+        return -2 if result == -1 else result
 
     def __repr__(self) -> str:
-        return "<Frac;{}/{}>".format(self.n, self.d) if self.approx != int(self) else str(int(self))
+        return "<Frac;{}/{}>".format(self._n, self._d) if self._d != 1 else str(self._n)
 
-    #region Properties  
+    #region Properties
 
     #region Getters
     @property
     def approx(self) -> float:
-        self._update()
-        return float(self._dec)
+        return self._n / self._d
 
     @property
-    def numerator(self) -> int | float:
-        self._update()
-        return self._num
+    def numerator(self) -> int:
+        return self._n
 
     @property
-    def denominator(self) -> int | float:
-        self._update()
-        return self._den
-    
+    def denominator(self) -> int:
+        return self._d
+
     @property
-    def n(self) -> int | float:
-        return self.numerator
+    def n(self) -> int:
+        return self._n
 
     @property
-    def d(self) -> int | float:
-        return self.denominator
+    def d(self) -> int:
+        return self._d
 
     #endregion Getters
 
-    #region Setters
-
-    @n.setter
-    def n(self, numerator) -> None:
-        self.numerator = numerator
-        
-    @d.setter
-    def d(self, denominator) -> None:
-        self.denominator =  denominator
-    
-    @denominator.setter
-    def denominator(self, denominator: int | float) -> None:
-        if denominator == 0:
-            raise ZeroDivisionError("The denominator cannot be 0!")
-        denominator = self._reduce_if_possible(denominator)
-        if self._den != denominator:
-            self._den = denominator
-            self._refresh = True
-        
-    @numerator.setter
-    def numerator(self, numerator: int) -> None:
-        numerator = self._reduce_if_possible(numerator)
-        if self._num != numerator:
-            self._num = numerator
-            self._refresh = True
-        
-    #endregion Setters
-        
     #endregion Properties
 
     #region Public Class Methods
     def proper(self) -> str:
         integer = int(self)
-        fraction = self % integer
-        
+        fraction = self - integer
+
         return "{}{}{}".format(integer, '' if fraction < 0 else '+', fraction)
-        
+
     @staticmethod
-    def dec_to_frac(x, error=1e-6) -> FracTuple:
+    def dec_to_frac(x, error=1e-6, max_denominator=None) -> FracTuple:
+        """
+        Simplest fraction within `error` of x (the one the Stern-Brocot
+        search would find), from the continued fraction of the interval
+        [x - error, x + error] in a few dozen steps at most. Results are
+        memoized per (x, error, max_denominator) in a bounded LRU, so
+        redisplaying the same floats costs a dict lookup.
+        """
         if isinstance(x, Frac):
             return x
-
-        n = int(x // 1)
-        x -= n
-
-        if x < error:
-            return (n, 1)
-        elif 1 - error < x:
-            return (n + 1, 1)
-
-        lower_n = 0
-        lower_d = 1
-        upper_n = 1
-        upper_d = 1
-
-        while True:
-            middle_n = lower_n + upper_n
-            middle_d = lower_d + upper_d
-            if middle_d * (x + error) < middle_n:
-                upper_n = middle_n
-                upper_d = middle_d
-            elif middle_n < (x - error) * middle_d:
-                lower_n = middle_n
-                lower_d = middle_d
-            else:
-                return FracTuple(int(n * middle_d + middle_n), (middle_d))
+        key = (x, error, max_denominator)
+        result = _memo.pop(key, None)
+        if result is None:
+            result = _dec_to_frac(x, error, max_denominator)
+            if len(_memo) >= MEMO_SIZE:
+                del _memo[next(iter(_memo))]
+        _memo[key] = result
+        return result
     #endregion Public Class Methods
 
-    #region Private Class Helper Methods   
-
-    def _reduce_if_possible(self, decimal: float) -> int | float:
-        integer = int(decimal)
-        return integer if integer == decimal else decimal
-
-    def _update(self) -> None:
-        if not self._refresh:
-            return
-        
-        self._dec = self._num / self._den
-        self._num, self._den = self.dec_to_frac(self._dec, error=self._error)
-        self._num = abs(self._num)
-        self._den = abs(self._den)
-        if self._dec < 0:
-            self._num *= -1
-        self._refresh = False
-    
-    def _is_frac_tuple(self, other) -> bool:
-        if not isinstance(other, tuple):
-            return False
-        if not len(other) == 2:
-            return False
-        return all(isinstance(t, int) for t in other) and other[1] != 0
-
-    def _to_fraction(self, other) -> Frac:
+    #region Private Class Helper Methods
+
+    def _pair(self, other):
+        """(numerator, denominator) of an operand, None when unsupported."""
         if isinstance(other, Frac):
-            return other
-        elif isinstance(other, (int, float, tuple)):
-            return Frac(other)
-        elif 'fractions' in sys.modules:
-            if isinstance(other, Fraction):
-                return Frac(other.numerator, other.denominator)
+            return other._n, other._d
+        if isinstance(other, int):
+            return other, 1
+        if isinstance(other, float):
+            other = Frac(other)
+            return other._n, other._d
+        if _is_fraction(other):
+            return other.numerator, other.denominator
+        return None
+
+    def _order(self, other):
+        """-1, 0 or 1 as self is below, equal to or above other, None when
+        they don't compare (nan or an unsupported type)."""
+        if isinstance(other, float):
+            if other != other:
+                return None
+            if other in _INFINITIES:
+                return -1 if other > 0 else 1
+            # the exact value of the float, as hash(float) uses it
+            pair = _float_ratio(other)
+        else:
+            pair = self._pair(other)
+        if pair is None:
             return None
+        left, right = self._n * pair[1], self._d * pair[0]
+        return (left > right) - (left < right)
 
-    def _parse_from_string(self, string: str):
-        string = string.strip().replace(' ', '')
-
-        if string.count('/') == 1:
-            try:
-                num, den = string.split('/')
-                num = eval(num)
-                den = eval(den)
-                num = self._reduce_if_possible(float(num))
-                den = self._reduce_if_possible(float(den))
-                return num, den
-            except:
-                pass
-        else:
-            try:
-                num = eval(string)
-                num = self._reduce_if_possible(float(num))
-                return num, 1
-            except:
-                pass
-        raise ValueError("Invalid string for Frac: {}".format(string))
-  
-    #endregion Private Class Helper Methods              
+    #endregion Private Class Helper Methods
 
     #region Misc. Dunder methods
-        
-    def __setattr__(self, name, value):
-        super().__setattr__(name, value)
-
-    def __getattribute__(self, name):
-        return super().__getattribute__(name)
 
     def __getitem__(self, key: int) -> int:
         if key not in (0, 1): raise IndexError("Frac only has two elements.")
-        if   key == 0: return self.n
-        elif key == 1: return self.d
-     
-    def __setitem__(self, key: int, value: int) -> None:
-        if key not in (0, 1): raise IndexError("Frac only has two elements.")
-        if    key == 0: self.n = value
-        elif  key == 1: self.d = value
+        if   key == 0: return self._n
+        elif key == 1: return self._d
 
     #endregion Misc. Dunder methods
 
     #region Type conversion
     def __float__(self) -> float:
-        try:
-            return float(self.n/self.d)
-        except Exception as e:
-            print("There was an error casting to float {}".format(e))
-            print("attempting to return {}".format(self.approx))
-            return self.approx
-        finally:
-            return self.approx
+        return self._n / self._d
 
     def __int__(self) -> int:
-        return int(self.approx)
+        # truncate toward zero like int(float)
+        if self._n < 0:
+            return -(-self._n // self._d)
+        return self._n // self._d
+
+    def __bool__(self) -> bool:
+        return self._n != 0
 
     def __tuple__(self) -> tuple:
-        return FracTuple(self.n, self.d)
+        return FracTuple(self._n, self._d)
 
     def __set__(self) -> set:
-        return {self.n, self.d}
+        return {self._n, self._d}
 
     def __list__(self) -> list:
-        return [self.n, self.d]
-    
+        return [self._n, self._d]
+
     def __str__(self) -> str:
-        
-        def get_shortest(value):
-            vanity = str(Frac(value, error=self._error))
-            floats = str(value)
-            if len(vanity) < len(floats):
-                return "({})".format(vanity)
-            else:
-                return "{}".format(floats)
-        
-        
-        if self.approx == int(self):
-            return str(int(self))
-        
-        
-        numerator = self.n
-        denominator = self.d
-        
-        if isinstance(self.n, float) and self.n % 1 > self._error:
-            numerator = get_shortest(numerator)
-            
-        if isinstance(self.d, float) and self.d % 1 > self._error:
-            denominator = get_shortest(abs(denominator))
-            
-        return "{}/{}".format(numerator, denominator)
-    
+        if self._d == 1:
+            return str(self._n)
+        return "{}/{}".format(self._n, self._d)
+
     def __Fraction__(self) -> 'Fraction':
-        return Fraction(self.n, self.d)
-    
+        return Fraction(self._n, self._d)
+
     #endregion Type conversion
 
     #region Arithmetic operators
 
     def __add__(self, other) -> Frac:
-        if isinstance(other, (int, float)):
-            other = Frac(other)
-        new_n = self.n * other.d + other.n * self.d
-        new_d = self.d * other.d
-        return Frac(new_n / new_d)
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        n, d = pair
+        if d == self._d:
+            return _reduced(self._n + n, d)
+        return _reduced(self._n * d + n * self._d, self._d * d)
 
     def __radd__(self, other) -> Frac:
         return self.__add__(other)
 
-    def __iadd__(self, other) -> Frac:
-        result = self + other
-        self.n, self.d = result.n, result.d
-        return self
-
     def __sub__(self, other) -> Frac:
-        if isinstance(other, (int, float)):
-            other = Frac(other)
-        new_n = self.n * other.d - other.n * self.d
-        new_d = self.d * other.d
-        return Frac(new_n / new_d)
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        n, d = pair
+        if d == self._d:
+            return _reduced(self._n - n, d)
+        return _reduced(self._n * d - n * self._d, self._d * d)
 
     def __rsub__(self, other) -> Frac:
-        return self.__sub__(other)
-
-    def __isub__(self, other) -> Frac:
-        result = self - other
-        self.n, self.d = result.n, result.d
-        return self
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        return _new(*pair) - self
 
     def __mul__(self, other) -> Frac:
-        if isinstance(other, (int, float)):
-            other = Frac(other)
-        new_n = self.n * other.n
-        new_d = self.d * other.d
-        return Frac(new_n / new_d)
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        n, d = pair
+        # cross reduce first so the products stay small
+        g1 = gcd(self._n, d)
+        g2 = gcd(n, self._d)
+        return _reduced_sign(
+            (self._n // g1) * (n // g2), (self._d // g2) * (d // g1))
 
     def __rmul__(self, other) -> Frac:
         return self.__mul__(other)
 
-    def __imul__(self, other) -> Frac:
-        result = self * other
-        self.n, self.d = result.n, result.d
-        return self
-
     def __truediv__(self, other) -> Frac:
-        if isinstance(other, (int, float)):
-            other = Frac(other)
-        new_n = self.n * other.d
-        new_d = self.d * other.n
-        return Frac(new_n / new_d)
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        n, d = pair
+        if n == 0:
+            raise ZeroDivisionError("Frac division by zero")
+        g1 = gcd(self._n, n)
+        g2 = gcd(d, self._d)
+        return _reduced_sign(
+            (self._n // g1) * (d // g2), (self._d // g2) * (n // g1))
 
     def __rtruediv__(self, other) -> Frac:
-        return self.__truediv__(other)
-
-    def __idiv__(self, other) -> Frac:
-        result = self / other
-        self.n, self.d = result.n, result.d
-        return self
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        return _new(*pair) / self
 
     def __floordiv__(self, other) -> Frac:
-        if isinstance(other, (int, float, Frac)):
-            other = Frac(other)
-        result = self.n * other.d // (self.d * other.n)
-        return Frac(result)
-    
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        n, d = pair
+        return _new(self._n * d // (self._d * n), 1)
+
     def __rfloordiv__(self, other) -> Frac:
-        return self.__floordiv__(other)
-    
-    def __ifloordiv__(self, other) -> Frac:
-        result = self // other
-        self.n, self.d = result.n, result.d
-        return self
-    
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        return _new(*pair) // self
+
     def __pow__(self, other) -> Frac:
-        if isinstance(other, (int, float)):
-            other = Frac(other)
+        if isinstance(other, Frac) and other._d == 1:
+            other = other._n
+        if isinstance(other, int):
+            if other >= 0:
+                return _new(self._n ** other, self._d ** other)
+            if self._n == 0:
+                raise ZeroDivisionError("Frac division by zero")
+            return _reduced_sign(self._d ** -other, self._n ** -other)
         return Frac(float(self) ** float(other))
-    
+
     def __rpow__(self, other) -> Frac:
-        return self.__pow__(other)
-    
-    def __ipow__(self, other) -> Frac:
-        result = self ** other
-        self.n, self.d = result.n, result.d
-        return self
+        if isinstance(other, int) and self._d == 1:
+            return Frac(other) ** self._n
+        return Frac(float(other) ** float(self))
 
     def __mod__(self, other) -> Frac:
-        if isinstance(other, (int, float)):
-            other = Frac(other)
-        new_n = self.n * other.d % (self.d * other.n)
-        new_d = self.d * other.d
-        return Frac(new_n / new_d)
-    
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        n, d = pair
+        return _reduced(self._n * d % (self._d * n), self._d * d)
+
     def __rmod__(self, other) -> Frac:
-        return self.__mod__(other)
-    
-    def __imod__(self, other) -> Frac:
-        result = self % other
-        self.n, self.d = result.n, result.d
-        return self
+        pair = self._pair(other)
+        if pair is None:
+            return NotImplemented
+        return _new(*pair) % self
 
     def __neg__(self) -> Frac:
-        return Frac(-self.n, self.d)
-    
+        return _new(-self._n, self._d)
+
     def __pos__(self) -> Frac:
-        return Frac(self.n, self.d)
-    
+        return _new(self._n, self._d)
+
     def __invert__(self) -> Frac:
-        return Frac(self.d, self.n)
-    
+        return Frac(self._d, self._n)
+
     def __abs__(self) -> Frac:
-        return Frac(abs(self.n), abs(self.d))
-    
+        return _new(abs(self._n), self._d)
+
     def __floor__(self) -> Frac:
-        return Frac(self.n // self.d)
-    
+        return _new(self._n // self._d, 1)
+
     def __round__(self, n: int = 0) -> float:
         return round(float(self), n)
 
@@ -389,49 +347,291 @@ class Frac:
 
     #region Comparison operators
     def __eq__(self, other) -> bool:
-        other = self._to_fraction(other)
-        if other is not None:
-            return self.n * other.d == self.d * other.n
-        return False
+        return self._order(other) == 0
 
     def __ne__(self, other) -> bool:
         return not self.__eq__(other)
 
     def __gt__(self, other) -> bool:
-        other = self._to_fraction(other)
-        if other is not None:
-            return self.n * other.d > self.d * other.n
-        return False
+        return self._order(other) == 1
 
     def __ge__(self, other) -> bool:
-        other = self._to_fraction(other)
-        if other is not None:
-            return self.__eq__(other) or self.__gt__(other)
-        return False
+        order = self._order(other)
+        return order is not None and order >= 0
 
     def __lt__(self, other) -> bool:
-        other = self._to_fraction(other)
-        if other is not None:
-            return not self.__eq__(other) and not self.__gt__(other)
-        return False
+        return self._order(other) == -1
 
     def __le__(self, other: (Frac, int, float)) -> bool:
-        other = self._to_fraction(other)
-        if other is not None:
-            return self.__eq__(other) or self.__lt__(other)
-        return False
+        order = self._order(other)
+        return order is not None and order <= 0
     #endregion Comparison operators
 
 
+_INFINITIES = (float('inf'), float('-inf'))
+
+# float -> fraction results, oldest entry evicted first, hits move to the end
+MEMO_SIZE = 1024
+_memo = {}
+
+
+def clear_memo() -> None:
+    _memo.clear()
+
+
+def _dec_to_frac(x, error, max_denominator) -> FracTuple:
+    n = int(x // 1)
+    x -= n
+
+    if max_denominator is not None and max_denominator < 1:
+        raise ValueError("max_denominator should be at least 1")
+    if x < error:
+        return FracTuple(n, 1)
+    elif 1 - error < x:
+        return FracTuple(n + 1, 1)
+
+    # continued fraction of the interval, 0 <= lo < hi < 1. Every step
+    # peels off the shared integer part a and flips to the reciprocals,
+    # until an integer t fits inside: x = [a0; a1, ..., t].
+    lo, hi = x - error, min(x + error, (x + 1) / 2)
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    for _ in range(64):
+        a = int(lo // 1)
+        # lo is only ever 0 on the first step, where 0/1 is no answer
+        done = (a == lo and a) or a + 1 <= hi
+        if done and a != lo:
+            a += 1
+        q = a * q1 + q0
+        if max_denominator is not None and q > max_denominator:
+            # best of the last convergent and its semiconvergent, as in
+            # Fraction.limit_denominator
+            k = (max_denominator - q0) // q1
+            semi_p, semi_q = p0 + k * p1, q0 + k * q1
+            if abs(semi_p / semi_q - x) <= abs(p1 / q1 - x):
+                p1, q1 = semi_p, semi_q
+            break
+        p0, q0, p1, q1 = p1, q1, a * p1 + p0, q
+        if done:
+            break
+        lo, hi = 1 / (hi - a), 1 / (lo - a) if lo > a else float('inf')
+    return FracTuple(n * q1 + p1, q1)
+
+
+try:
+    _HASH_MODULUS = sys.hash_info.modulus
+    _HASH_INF = sys.hash_info.inf
+except AttributeError:
+    # no hash_info (MicroPython), Frac then hashes as its (n, d) pair
+    _HASH_MODULUS = _HASH_INF = None
+
+# Shared instances for the values elimination keeps producing: the
+# integers in [-INTERN_LIMIT, INTERN_LIMIT] and proper fractions with a
+# denominator up to INTERN_DENOMINATOR. Frac is immutable, so handing the
+# same object out again is safe.
+INTERN_LIMIT = 256
+INTERN_DENOMINATOR = 12
+_interned_ints = []
+_interned = {}
+
+
+# the slot descriptors write past Frac.__setattr__, only _new uses them
+try:
+    _set_n, _set_d = Frac._n.__set__, Frac._d.__set__
+except AttributeError:
+    # no slot descriptors (MicroPython)
+    def _set_n(frac, value):
+        object.__setattr__(frac, '_n', value)
+
+    def _set_d(frac, value):
+        object.__setattr__(frac, '_d', value)
+
+
+def _new(numerator: int, denominator: int) -> Frac:
+    """Frac from a reduced pair with denominator > 0, interned when small."""
+    if denominator == 1:
+        if -INTERN_LIMIT <= numerator <= INTERN_LIMIT:
+            return _interned_ints[numerator + INTERN_LIMIT]
+    elif denominator <= INTERN_DENOMINATOR and -denominator < numerator < denominator:
+        return _interned[(numerator, denominator)]
+    frac = object.__new__(Frac)
+    _set_n(frac, numerator)
+    _set_d(frac, denominator)
+    return frac
+
+
+def _build_interned() -> None:
+    for n in range(-INTERN_LIMIT, INTERN_LIMIT + 1):
+        frac = object.__new__(Frac)
+        _set_n(frac, n)
+        _set_d(frac, 1)
+        _interned_ints.append(frac)
+    for d in range(2, INTERN_DENOMINATOR + 1):
+        for n in range(1 - d, d):
+            if gcd(n, d) == 1:
+                frac = object.__new__(Frac)
+                _set_n(frac, n)
+                _set_d(frac, d)
+                _interned[(n, d)] = frac
+
+
+_build_interned()
+
+
+def _exact(numerator: int, denominator: int) -> Frac:
+    if denominator == 0:
+        raise ZeroDivisionError("The denominator cannot be 0!")
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    common = gcd(numerator, denominator)
+    if common != 1:
+        numerator //= common
+        denominator //= common
+    return _new(numerator, denominator)
+
+
+def _reduced(numerator: int, denominator: int) -> Frac:
+    """Frac from an int pair with denominator > 0."""
+    common = gcd(numerator, denominator)
+    if common != 1:
+        numerator //= common
+        denominator //= common
+    return _new(numerator, denominator)
+
+
+def _reduced_sign(numerator: int, denominator: int) -> Frac:
+    """Frac from an already reduced int pair, fixing the sign only."""
+    if denominator < 0:
+        return _new(-numerator, -denominator)
+    return _new(numerator, denominator)
+
+
+def _is_fraction(value) -> bool:
+    return 'fractions' in sys.modules and isinstance(value, Fraction)
+
+
+def _float_ratio(x: float) -> tuple:
+    """Exact (numerator, denominator) of a finite float, not reduced."""
+    try:
+        return x.as_integer_ratio()
+    except AttributeError:
+        # MicroPython floats: x = mantissa * 2**exp exactly
+        mantissa, exp = frexp(x)
+        n, exp = int(mantissa * 2 ** 53), exp - 53
+        return (n << exp, 1) if exp >= 0 else (n, 1 << -exp)
+
+
+def _rational(value):
+    """(numerator, denominator) of an int, Frac, FracTuple or Fraction."""
+    if isinstance(value, int):
+        return value, 1
+    if isinstance(value, (Frac, FracTuple)) or _is_fraction(value):
+        return value.numerator * 1, value.denominator * 1
+    return None
+
+
+def _parse_from_string(string: str, error=1e-6) -> tuple:
+    string = string.strip().replace(' ', '')
+
+    parts = string.split('/')
+    if len(parts) <= 2:
+        try:
+            values = [_parse_number(part) for part in parts]
+            if len(values) == 1:
+                values.append(1)
+            if all(isinstance(v, int) for v in values):
+                return values
+            return Frac.dec_to_frac(values[0] / values[1], error=error)
+        except Exception:
+            pass
+    raise ValueError("Invalid string for Frac: {}".format(string))
+
+
+def _parse_number(text: str):
+    """int when the text is an integer, otherwise the float it evaluates to."""
+    try:
+        return int(text)
+    except ValueError:
+        value = eval(text)
+        return value if isinstance(value, int) else float(value)
+
+
 if __name__ == '__main__':
     one_third = 0.33333333333
 
-    assert Frac(one_third) == one_third
+    assert Frac(one_third) == Frac(1, 3) and Frac(one_third) != one_third
     assert tuple(Frac(one_third)) == (1, 3)
     assert str(Frac(one_third)) == "1/3"
     assert Frac("1/3") == Frac(1, 3)
     assert Frac("1/3") == Frac(2, 6)
-    assert Frac("1/3") == 1/3
+    assert Frac("1/3") != 1/3 and Frac("1/3") < 1/3 + 1e-15 and Frac(1, 4) == 0.25
     assert abs(Frac(one_third) - one_third) < 0.000001
     assert Frac(1.5) == 1.5
-    assert Frac(1.5) == Frac(3, 2)
\ No newline at end of file
+    assert Frac(1.5) == Frac(3, 2)
+
+    # exact integer arithmetic, no float round trip even for huge values
+    big = Frac(10 ** 30 + 1, 3)
+    assert (big - Frac(1, 3)).numerator == 10 ** 30
+    assert big * 3 == 10 ** 30 + 1 and (big * 3).denominator == 1
+    assert Frac(1, 3) + Frac(1, 6) == Frac(1, 2)
+    assert 1 - Frac(1, 3) == Frac(2, 3) and 1 / Frac(2, 3) == Frac(3, 2)
+    assert Frac(-2, 4) == Frac(1, -2) and Frac(-2, 4).denominator == 2
+    assert Frac(2, 3) ** -2 == Frac(9, 4) and int(Frac(-7, 2)) == -3
+    assert Frac(7, 2) % 1 == Frac(1, 2) and Frac(7, 2) // 1 == 3
+    assert not Frac(0) and Frac(1, 2) < Frac(2, 3) <= Frac(2, 3)
+    assert Frac(Fraction(3, 4)) == Frac(3, 4) and Fraction(1, 4) + Frac(1, 4) == Frac(1, 2)
+    assert str(Frac("0.5/2")) == "1/4" and Frac(1.5, 2) == Frac(3, 4)
+    assert Frac(Frac(1, 2), 2) == Frac(1, 4) and Frac(3, Frac(3, 4)) == 4
+    assert Frac(FracTuple(1, 2), Fraction(1, 3)) == Frac(3, 2) and Frac("1/2", 2) == Frac(1, 4)
+    assert Frac(Frac(1, 2), 0.5) == 1
+    x = half = Frac(1, 2)
+    x += 1
+    assert x == Frac(3, 2) and half == Frac(1, 2)
+
+    # unsupported operands raise the usual TypeError, nan and inf compare
+    try:
+        "a" - Frac(1)
+        assert False
+    except TypeError as e:
+        assert 'unsupported' in str(e)
+    nan, inf = float('nan'), float('inf')
+    assert not (half == nan or half < nan or half >= nan) and half != nan
+    assert half < inf and half > -inf and not half == inf and not half == "1/2"
+
+    # immutable and hashable like int, float and Fraction
+    for value in (Frac(1, 2), Frac(-7, 3), Frac(5), Frac(10 ** 40, 7), Frac(-1)):
+        assert hash(value) == hash(Fraction(value.numerator, value.denominator))
+    assert hash(Frac(1, 2)) == hash(0.5) and hash(Frac(3)) == hash(3)
+    assert {Frac(2, 4): 'half'}[Fraction(1, 2)] == 'half' and len({Frac(1, 2), 0.5}) == 1
+    # equal to a float only when the hashes agree too
+    assert Frac(1, 3) != 0.3333333 and len({Frac(1, 3), 0.3333333}) == 2
+    assert Frac(3, 2) == 1.5 and Frac(1, 10) != 0.1 and Frac(0.1) < 0.1
+    assert _float_ratio(-0.375) == (-3, 8) and _float_ratio(2.0 ** 60)[0] == 2 ** 60
+    for mutate in (lambda: setattr(half, 'n', 3), lambda: setattr(half, '_n', 3),
+                   lambda: delattr(half, '_d'), lambda: setattr(Frac(1, 2), 'extra', 1)):
+        try:
+            mutate()
+            assert False
+        except AttributeError:
+            pass
+    assert Frac(1, 2) == Fraction(1, 2) and Frac(1, 2) is half
+
+    # small values are shared instead of allocated again
+    assert Frac(2, 4) is Frac(1, 2) is Frac(1, 4) * 2 and Frac(0) is Frac(3) - 3
+    assert Frac(10 ** 6) is not Frac(10 ** 6) and Frac(10 ** 6) == 10 ** 6
+    import copy
+    import pickle
+    assert copy.deepcopy(half) is half and pickle.loads(pickle.dumps(Frac(2, 7))) == Frac(2, 7)
+    assert pickle.loads(pickle.dumps(Frac(0))) is Frac(0)
+
+    # continued fractions find the same simplest fraction as Stern-Brocot
+    assert Frac.dec_to_frac(0.0001) == (1, 9901) and Frac.dec_to_frac(0.99999) == (90909, 90910)
+    assert Frac.dec_to_frac(1e-6) == (1, 500000)
+    assert Frac.dec_to_frac(-0.5) == (-1, 2) and Frac.dec_to_frac(2 / 3, 1e-9) == (2, 3)
+    assert Frac.dec_to_frac(3.14159265358979, 1e-12, max_denominator=1000) == (355, 113)
+    for value in (0.1234567, 2.718281828, -7.25, 1 / 7):
+        expected = Fraction(value).limit_denominator(97)
+        assert Frac.dec_to_frac(value, 1e-15, 97) == (expected.numerator, expected.denominator)
+    clear_memo()
+    Frac.dec_to_frac(0.1)
+    Frac.dec_to_frac(0.1)
+    assert len(_memo) == 1
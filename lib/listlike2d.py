@@ -1,16 +1,30 @@
 from collections import namedtuple
 from matrix_tools import flatten, convert_element, is_flat_list
 from ti_formatting import mat_repr, display_matrix
+from flat_matrix import FlatMatrix
 Dimensions = namedtuple('Dimensions', ['rows', 'cols'])
 
+
+def mutates(func):
+    """Bump the version after a method that changes the data."""
+    def wrapper(self, *args, **kwargs):
+        result = func(self, *args, **kwargs)
+        self._version += 1
+        return result
+    return wrapper
+
+
 class ListLike2D:...
 class ListLike2D:
 
-    def __init__(self, data, cols=None, fill=0) -> None:
+    def __init__(self, data, cols=None, fill=0, convert=True) -> None:
 
         # we are specifying the number of rows and cols
         # and populating the matrix with the fill value
-        if isinstance(data, int) and isinstance(cols, int):
+        if isinstance(data, FlatMatrix):
+            # compact storage, one array buffer instead of row lists
+            self.data = data
+        elif isinstance(data, int) and isinstance(cols, int):
             self.data = [[fill] * cols for _ in range(data)]
         elif isinstance(data, list) and isinstance(cols, int):
 
@@ -48,17 +62,62 @@ class ListLike2D:
             else:
                 self.data = data
 
-        # convert all elements to numeric if possible
-        for row in self.data:
-            for i in range(len(row)):
-                row[i] = convert_element(row[i])
+        # convert all elements to numeric if possible, trusted numeric
+        # results (e.g. exact Frac entries) skip the conversion
+        if convert and self._flat is None:
+            for row in self.data:
+                for i in range(len(row)):
+                    row[i] = convert_element(row[i])
 
         self._dims = None
         self._current = 0
+        # bumped by every mutator, derived results are keyed on it
+        self._version = 0
 
 
 # region properties
 
+    @property
+    def data(self) -> list:
+        """
+            The rows as lists. A matrix in flat storage is unpacked into
+            row lists on first access, since callers may edit those in
+            place, and stays in list storage from then on.
+        """
+        if self._rows is None:
+            self._rows = self._flat.to_rows()
+            self._flat = None
+        return self._rows
+
+    @data.setter
+    def data(self, value) -> None:
+        if isinstance(value, FlatMatrix):
+            self._rows, self._flat = None, value
+        else:
+            self._rows, self._flat = value, None
+        self._dims = None
+
+    @property
+    def is_flat(self) -> bool:
+        """True while the data lives in a single FlatMatrix buffer."""
+        return self._flat is not None
+
+    def _peek_rows(self) -> list:
+        """The rows for reading only, without unpacking flat storage."""
+        return self._flat.to_rows() if self._rows is None else self._rows
+
+    @property
+    def version(self) -> int:
+        """
+            Changes whenever the matrix is mutated through its methods.
+            Writing to ``self.data`` directly bypasses it, call
+            ``_touch()`` afterwards in that case.
+        """
+        return self._version
+
+    def _touch(self) -> None:
+        self._version += 1
+
     @property
     def dims(self) -> Dimensions:
         if self._dims is None:
@@ -88,18 +147,24 @@ class ListLike2D:
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, list):
-            return self.data == other
+            return self._peek_rows() == other
+        if isinstance(other, ListLike2D):
+            if self._flat is not None and other._flat is not None:
+                return self._flat == other._flat
+            return self._peek_rows() == other._peek_rows()
         if not hasattr(other, 'data'):
             return False
         if not isinstance(other.data, list):
             return False
-        return self.data == other.data
+        return self._peek_rows() == other.data
 
     def __len__(self) -> int:
         return self.dims.rows * self.dims.cols
 
     def __getitem__(self, indices: tuple | int | list | slice) -> any:
         if isinstance(indices, tuple):
+            if self._flat is not None:
+                return self._flat[indices]
             return self.data[indices[0]][indices[1]]
         if isinstance(indices, int):
             return self.data[indices]
@@ -113,8 +178,12 @@ class ListLike2D:
             return self.data[indices]
         raise TypeError("indices must be an int or a tuple of ints")
 
+    @mutates
     def __setitem__(self, indices: tuple | int | list, value: any) -> None:
         if isinstance(indices, tuple):
+            if self._flat is not None and self._flat.can_store(value):
+                self._flat[indices] = value
+                return
             self.data[indices[0]][indices[1]] = value
         elif isinstance(indices, int):
             self.data[indices] = value
@@ -142,10 +211,10 @@ class ListLike2D:
         return self.data
 
     def __str__(self) -> str:
-        return mat_repr(self.data)
+        return mat_repr(self._peek_rows())
 
     def __repr__(self) -> str:
-        return mat_repr(self.data)
+        return mat_repr(self._peek_rows())
 
 
 # endregion dunder methods
@@ -156,6 +225,8 @@ class ListLike2D:
         Returns:
             _type_: _description_
         """
+        if self._flat is not None:
+            return self._flat.to_rows()
         return [row[:] for row in self.data]
 
     def clone(self) -> ListLike2D:
@@ -165,14 +236,41 @@ class ListLike2D:
         Returns:
             _type_: _description_
         """
+        if self._flat is not None:
+            # flat storage copies one buffer
+            return self.__class__(self._flat.clone())
         return self.__class__(self.data)
         return ListLike2D(self.data)
 
+    def to_flat(self, typecode: str = None):
+        """Compact array backed copy of a numeric matrix, see FlatMatrix."""
+        if self._flat is not None and typecode in (None, self._flat.typecode):
+            return self._flat.clone()
+        return FlatMatrix.from_rows(self._peek_rows(), typecode)
+
+    def compact(self, typecode: str = None):
+        """
+            Move int/float data into flat storage in place. Ints are kept
+            as int64 unless an entry is a float; raises ValueError for
+            other entries.
+        """
+        if self._flat is None:
+            self.data = FlatMatrix.from_rows(self.data, typecode)
+            self._touch()
+        return self
+
+    def row_view(self, i: int):
+        """Row i without a copy, a memoryview in flat storage."""
+        if self._flat is not None:
+            return self._flat.row(i)
+        return self.data[i]
+
     def T(self, count: int = 1):
         for _ in range(count):
             self.transpose()
         return self.__class__(self.data)
 
+    @mutates
     def set_column(self, col: int, values: list) -> None:
         if len(values) != self.dims.rows:
             raise ValueError(
@@ -183,6 +281,7 @@ class ListLike2D:
             self.data[row][col] = values[row]
         return self
 
+    @mutates
     def set_row(self, row: int, values: list) -> ListLike2D:
         if len(values) != self.dims.cols:
             raise ValueError(
@@ -191,8 +290,12 @@ class ListLike2D:
         return self
 
     def _set_dims(self) -> None:
+        if self._flat is not None:
+            self._dims = Dimensions(*self._flat.dims)
+            return
         self._dims = Dimensions(len(self.data), len(self.data[0]))
 
+    @mutates
     def _flatten(self):
         self.data = flatten(self.data)
         self._set_dims()
@@ -212,6 +315,7 @@ class ListLike2D:
         else:
             self.append_row(list_like.data)
 
+    @mutates
     def append_row(self, row: list):
         # if row is a list of lists, flatten it
         if hasattr(row, 'data'):
@@ -226,6 +330,7 @@ class ListLike2D:
         self._set_dims()
         return self
 
+    @mutates
     def append_col(self, col: list):
         # if col is a list of lists, flatten it
         if hasattr(col, 'data'):
@@ -241,18 +346,21 @@ class ListLike2D:
         self._set_dims()
         return self
 
+    @mutates
     def append_left(self, other_matrix):
         for i, row in enumerate(self.data):
             self.data[i] = other_matrix[i] + row
         self._set_dims()
         return self
 
+    @mutates
     def append_right(self, other_matrix):
         for i, _ in enumerate(self.data):
             self.data[i] += other_matrix[i]
         self._set_dims()
         return self
 
+    @mutates
     def reshape(self, rows: int = None, cols: int = None, fill: int = 0) -> None:
         # Flatten the data
         data = flatten(self.data)
@@ -285,6 +393,7 @@ class ListLike2D:
         self._set_dims()
         return self
 
+    @mutates
     def transpose(self):
         # swap rows and columns
         data = [[self.data[j][i]
@@ -306,6 +415,7 @@ class ListLike2D:
         if all(isinstance(row, int) for row in rows):
             return ListLike2D([self.data[row] for row in rows])
 
+    @mutates
     def shift_left(self, insert=False):
         new_data = [row[1:] + [row[0]] for row in self.data]
         if insert:
@@ -315,6 +425,7 @@ class ListLike2D:
         self._set_dims()
         return self
 
+    @mutates
     def shift_up(self, insert=False):
         new_data = [self.data[i - 1] for i in range(len(self.data))]
         if insert:
@@ -323,6 +434,7 @@ class ListLike2D:
         self._set_dims()
         return self
 
+    @mutates
     def shift_down(self, insert=False):
         new_data = [self.data[(i + 1) % len(self.data)]
                     for i in range(len(self.data))]
@@ -332,6 +444,7 @@ class ListLike2D:
         self._set_dims()
         return self
 
+    @mutates
     def shift_right(self, insert=False):
         rows, cols = self.dims
 
@@ -348,6 +461,7 @@ class ListLike2D:
         self._set_dims()
         return self
 
+    @mutates
     def swap_rows(self, row1, row2):
         if row1 < 0 or row1 >= self.dims.rows:
             raise ValueError(
@@ -355,6 +469,7 @@ class ListLike2D:
         self.data[row1], self.data[row2] = self.data[row2], self.data[row1]
         return self
 
+    @mutates
     def swap_columns(self, col1, col2):
         if col1 < 0 or col1 >= self.dims.cols:
             raise ValueError(
@@ -365,6 +480,7 @@ class ListLike2D:
             row[col1], row[col2] = row[col2], row[col1]
         return self
 
+    @mutates
     def insert_column(self, column, index: int) -> 'ListLike2D':
         """
         Insert a column in a matrix at the specified index.
@@ -393,6 +509,7 @@ class ListLike2D:
         self._set_dims()
         return self
 
+    @mutates
     def remove_column(self, index: int) -> 'ListLike2D':
         """
         Remove a column from a matrix at the specified index.
@@ -414,6 +531,7 @@ class ListLike2D:
         self._set_dims()
         return self
 
+    @mutates
     def flip_horizontal(self) -> 'ListLike2D':
         """
         Flip a matrix horizontally.
@@ -429,6 +547,7 @@ class ListLike2D:
         self.data = data
         return self
 
+    @mutates
     def flip_vertical(self) -> 'ListLike2D':
         """
         Flip a matrix vertically.
@@ -9,6 +9,12 @@ from wrappers import debug_in_out
 from ti_formatting import most_accurate
 from collections import namedtuple
 
+try:
+    from operator import mul as _mul
+except ImportError:
+    def _mul(a, b):
+        return a * b
+
 Dimensions = namedtuple('Dimensions', ['rows', 'cols'])
 
 
@@ -55,6 +61,12 @@ def convert_element(x):
     """
     if isinstance(x, Frac):
         return float(x)
+    if isinstance(x, int):
+        return x
+    if isinstance(x, float):
+        # numbers pass straight through, the string round trip below
+        # also rejected exponent notation such as 1e-05
+        return int(x) if x.is_integer() else x
     if not isinstance(x, str):
         x = str(x)
         # if "−" in x:
@@ -214,6 +226,33 @@ def identity_matrix(n):
     return [[1 if i == j else 0 for j in range(n)] for i in range(n)]
 
 
+def mat_mul(a, b):
+    """
+    Multiply two lists of rows. b is transposed once so every dot
+    product zips a row of a with a contiguous row of b^T instead of
+    walking b column-wise with double index lookups.
+    """
+    b_t = list(zip(*b))
+    return [[sum(map(_mul, row, col)) for col in b_t] for row in a]
+
+
+def mat_mul_blocked(a, b, block: int = 64):
+    """
+    Same result as mat_mul, but computes the product one block of
+    columns at a time so the active slice of b^T stays small. Pays
+    off for large operands (a few hundred columns and up).
+    """
+    b_t = list(zip(*b))
+    cols = len(b_t)
+    result = [[0] * cols for _ in a]
+    for start in range(0, cols, block):
+        stop = start + block
+        col_block = b_t[start:stop]
+        for out_row, row in zip(result, a):
+            out_row[start:stop] = [sum(map(_mul, row, col)) for col in col_block]
+    return result
+
+
 def _perform_tests():
     col_vec = [[1], [2], [3]]
     row_vec = [[1, 2, 3]]
@@ -254,6 +293,12 @@ def _perform_tests():
     assert get_matrix_dimensions(col_vec) == Dimensions(3, 1)
     assert get_matrix_dimensions(row_vec) == Dimensions(1, 3)
 
+    # assert matrix products
+    a = [[1, 2, 3], [4, 5, 6]]
+    b = [[7, 8], [9, 10], [11, 12]]
+    assert mat_mul(a, b) == [[58, 64], [139, 154]]
+    assert mat_mul_blocked(a, b, block=1) == [[58, 64], [139, 154]]
+
     print("{}: All tests passed!".format(__file__.split('\\')[-1]))
 
 
@@ -0,0 +1,153 @@
+"""
+Results of expensive matrix operations shared across instances.
+
+A matrix is identified by its content, not its identity: the shape, the
+set of entry types (which picks the int / Frac / float code path) and
+the values, with blanks removed from symbolic entries. Two matrices typed
+in separately hit the same entry of one bounded Cache.
+
+    class PyMatrix:
+        @content_cached
+        def determinant(self, tol=0): ...
+
+        @content_cached(records_steps=True)
+        def _compute_rref(self, tol, exact): ...
+
+The result of the outermost call is cached. Calls made while computing
+it (cofactor determinants, say) run uncached, so they don't flood the
+cache. A method that reports row operations is run again whenever
+self.recorder is enabled, because a replay has to show its steps. Lists
+and objects with _memo_copy() are copied on the way out, so callers can
+mutate what they get back.
+"""
+from cachable import Cache
+
+MEMO_SIZE = 256
+
+_results = Cache(MEMO_SIZE)
+_MISSING = object()
+_depth = 0
+
+
+def result_cache() -> Cache:
+    """The shared Cache, e.g. result_cache().max = 1024 or .ratio."""
+    return _results
+
+
+def clear_results() -> None:
+    _results.clear()
+
+
+def fingerprint(rows) -> tuple:
+    """(shape, entry types, values) of a list of rows, hashable."""
+    kinds = set()
+    for row in rows:
+        kinds.update(map(type, row))
+    if str in kinds:
+        values = tuple(tuple(x.replace(' ', '') if isinstance(x, str) else x for x in row)
+                       for row in rows)
+    else:
+        values = tuple(map(tuple, rows))
+    shape = (len(rows), len(rows[0]) if rows else 0)
+    return shape, frozenset(kinds), values
+
+
+def fresh_copy(value):
+    """Copy lists (nested) and objects with _memo_copy(), share the rest."""
+    if isinstance(value, list):
+        return [fresh_copy(x) for x in value]
+    if isinstance(value, tuple):
+        items = [fresh_copy(x) for x in value]
+        if all(a is b for a, b in zip(items, value)):
+            return value
+        return tuple(items)
+    copy = getattr(value, '_memo_copy', None)
+    return copy() if copy is not None else value
+
+
+def _uncached(func, self, args, kwargs):
+    """Run func with the cache off for every call it makes."""
+    global _depth
+    _depth += 1
+    try:
+        return func(self, *args, **kwargs)
+    finally:
+        _depth -= 1
+
+
+def content_cached(func=None, records_steps=False):
+    """
+    Memoize a matrix method on (class, method, content, arguments).
+    self.fingerprint() is used when the class provides one, otherwise
+    fingerprint(self.data). Unhashable arguments or entries skip the cache.
+    """
+    def decorator(func):
+        name = func.__name__
+
+        def wrapper(self, *args, **kwargs):
+            if _depth:
+                return func(self, *args, **kwargs)
+            if records_steps and getattr(self, 'recorder', None) is not None \
+                    and self.recorder.enabled:
+                return _uncached(func, self, args, kwargs)
+            identify = getattr(self, 'fingerprint', None)
+            try:
+                key = (type(self), name, identify() if identify else fingerprint(self.data),
+                       args, tuple(sorted(kwargs.items())))
+                result = _results.get(key, _MISSING)
+            except TypeError:
+                return _uncached(func, self, args, kwargs)
+            if result is _MISSING:
+                result = _uncached(func, self, args, kwargs)
+                _results.add(key, result)
+            return fresh_copy(result)
+        try:
+            wrapper.__name__ = name
+            wrapper.__doc__ = func.__doc__
+        except AttributeError:
+            # MicroPython functions take no attributes
+            pass
+        return wrapper
+    return decorator if func is None else decorator(func)
+
+
+if __name__ == '__main__':
+    from frac import Frac
+
+    assert fingerprint([[1, 2], [3, 4]]) == fingerprint([[1, 2], [3, 4]])
+    assert fingerprint([[1, 2]]) != fingerprint([[1.0, 2.0]])
+    assert fingerprint([[1, 2]]) != fingerprint([[1], [2]])
+    assert fingerprint([[1, Frac(1, 2)]]) != fingerprint([[1, 0.5]])
+    assert fingerprint([['x + 1', 2]]) == fingerprint([['x+1', 2]])
+
+    class Grid:
+        calls = 0
+
+        def __init__(self, data):
+            self.data = data
+
+        @content_cached
+        def total(self, scale=1):
+            Grid.calls += 1
+            return [sum(row) * scale for row in self.data] + [self.nested()]
+
+        @content_cached
+        def nested(self):
+            Grid.calls += 1
+            return 0
+
+    clear_results()
+    first = Grid([[1, 2], [3, 4]]).total()
+    assert first == [3, 7, 0] and Grid.calls == 2
+    first.append('mutated')
+    again = Grid([[1, 2], [3, 4]]).total()
+    assert again == [3, 7, 0] and Grid.calls == 2 and again is not first
+    Grid([[1, 2], [3, 4]]).total(scale=2)
+    assert Grid.calls == 4 and result_cache().hit == 1
+    # only the outermost call was stored
+    assert len(result_cache()) == 2
+    # an unhashable entry runs uncached
+    calls = Grid.calls
+    Grid([[[1], 2]]).nested()
+    Grid([[[1], 2]]).nested()
+    assert Grid.calls == calls + 2 and Grid.total.__name__ == 'total'
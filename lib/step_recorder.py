@@ -0,0 +1,332 @@
+"""
+Pluggable step recorders for the step-by-step matrix routines.
+
+Row operations report what they do to a recorder instead of printing.
+The base StepRecorder is a no-op whose ``enabled`` flag is False, and
+callers check that flag before building anything, so a silent matrix
+runs the same elimination code with no formatting or I/O at all.
+
+    StepRecorder()          - discard every step (bulk mode)
+    ListRecorder()          - keep a StepTrace in memory
+    CallbackRecorder(func)  - stream each rendered step to func
+    PrintRecorder()         - stream each rendered step to stdout
+
+Steps are stored as compact Step records (op, i, j, factor) and are only
+turned into text, LaTeX or TI-Nspire commands when a trace is rendered.
+Conclusions about a solved system ("free", "inconsistent", "unique") are
+Step records too and render to the sentence they stand for.
+"""
+
+# ops that act on a single row: (i, factor)
+_SCALE_OPS = ("multiply", "div")
+# ops that combine two rows: (i, j, factor=1), i is the target row
+_ROW_PAIR_OPS = ("add", "sub", "m_row_add")
+_ROW_OPS = ("swap",) + _SCALE_OPS + _ROW_PAIR_OPS
+
+
+class Step:
+    """
+    A single recorded operation. Row indices are 0-based.
+    Non row operations ("note", "display", "matrix") keep their
+    payload in ``factor``: the column for "free", the nonzero right-hand
+    side of row i for "inconsistent".
+    """
+    __slots__ = ('op', 'i', 'j', 'factor')
+
+    def __init__(self, op, i=None, j=None, factor=None):
+        self.op = op
+        self.i = i
+        self.j = j
+        self.factor = factor
+
+    @classmethod
+    def from_args(cls, op, args) -> 'Step':
+        """Build a Step from the positional arguments of a row operation."""
+        if op == "swap":
+            return cls(op, args[0], args[1])
+        if op in _SCALE_OPS:
+            return cls(op, args[0], None, args[1] if len(args) > 1 else 1)
+        if op in _ROW_PAIR_OPS:
+            return cls(op, args[0], args[1], args[2] if len(args) > 2 else 1)
+        if op == "inconsistent":
+            return cls(op, args[0], None, args[1])
+        if not args:
+            return cls(op)
+        return cls(op, factor=args[0] if len(args) == 1 else args)
+
+    def key(self) -> tuple:
+        return (self.op, self.i, self.j, self.factor)
+
+    def __eq__(self, other):
+        return isinstance(other, Step) and self.key() == other.key()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return "Step({!r}, {}, {}, {!r})".format(self.op, self.i, self.j, self.factor)
+
+
+# region Renderers
+
+def _describe(step: Step) -> str:
+    """The sentence behind a non row operation."""
+    op, factor = step.op, step.factor
+    if op == "free":
+        return ("The {0} column contains no pivots, thus x_{0} is a free variable "
+                "and the system has infinitely many solutions").format(factor + 1)
+    if op == "inconsistent":
+        return "The last row is equivalent to 0={}, thus the system is inconsistent".format(factor)
+    if op == "unique":
+        return "There are no free variables and the system has a unique solution"
+    return str(factor)
+
+
+def render_text(step: Step) -> str:
+    op, i, j, factor = step.op, step.i, step.j, step.factor
+    if op == "swap":
+        return "r{} ↔ r{}".format(i + 1, j + 1)
+    if op == "multiply":
+        return "R{} ← R{} * {}".format(i + 1, i + 1, factor)
+    if op == "div":
+        return "R{} ← R{} / {}".format(i + 1, i + 1, factor)
+    if op == "add" and factor == 1:
+        return "R{} ← R{} + R{}".format(i + 1, i + 1, j + 1)
+    if op in ("add", "m_row_add"):
+        return "R{} ← R{} + ({} * R{})".format(i + 1, i + 1, factor, j + 1)
+    if op == "sub":
+        if factor == 1:
+            return "R{} ← R{} - R{}".format(i + 1, i + 1, j + 1)
+        return "R{} ← R{} - ({} * R{})".format(i + 1, i + 1, factor, j + 1)
+    return _describe(step)
+
+
+def _latex_matrix(rows) -> str:
+    body = r" \\ ".join(" & ".join(str(x) for x in row) for row in rows)
+    return r"\begin{bmatrix} " + body + r" \end{bmatrix}"
+
+
+def _latex_coefficient(factor) -> str:
+    return '' if factor == 1 else "{} ".format(factor)
+
+
+def render_latex(step: Step) -> str:
+    op, i, j, factor = step.op, step.i, step.j, step.factor
+    if op == "swap":
+        return r"R_{{{}}} \leftrightarrow R_{{{}}}".format(i + 1, j + 1)
+    if op == "multiply":
+        return r"R_{{{0}}} \leftarrow {1} R_{{{0}}}".format(i + 1, factor)
+    if op == "div":
+        return r"R_{{{0}}} \leftarrow \frac{{R_{{{0}}}}}{{{1}}}".format(i + 1, factor)
+    if op in ("add", "m_row_add"):
+        return r"R_{{{0}}} \leftarrow R_{{{0}}} + {1}R_{{{2}}}".format(
+            i + 1, _latex_coefficient(factor), j + 1)
+    if op == "sub":
+        return r"R_{{{0}}} \leftarrow R_{{{0}}} - {1}R_{{{2}}}".format(
+            i + 1, _latex_coefficient(factor), j + 1)
+    if op == "matrix":
+        return _latex_matrix(factor)
+    return r"\text{{{}}}".format(_describe(step))
+
+
+def render_ti(step: Step, name: str = 'm') -> str:
+    """TI-Nspire CAS command that performs the step on matrix `name`."""
+    op, i, j, factor = step.op, step.i, step.j, step.factor
+    if op == "swap":
+        return "{0}:=rowSwap({0},{1},{2})".format(name, i + 1, j + 1)
+    if op == "multiply":
+        return "{0}:=mRow({1},{0},{2})".format(name, factor, i + 1)
+    if op == "div":
+        return "{0}:=mRow(1/({1}),{0},{2})".format(name, factor, i + 1)
+    if op in ("add", "m_row_add"):
+        return "{0}:=mRowAdd({1},{0},{2},{3})".format(name, factor, j + 1, i + 1)
+    if op == "sub":
+        return "{0}:=mRowAdd(-({1}),{0},{2},{3})".format(name, factor, j + 1, i + 1)
+    if op == "matrix":
+        return "[" + "".join(
+            "[" + ",".join(str(x) for x in row) + "]" for row in factor) + "]"
+    return '"{}"'.format(_describe(step))
+
+
+_RENDERERS = {
+    'text': render_text,
+    'latex': render_latex,
+    'ti': render_ti,
+}
+
+
+def format_step(op, *args) -> str:
+    """Render a single step, given as a row operation's arguments, as text."""
+    return render_text(Step.from_args(op, args))
+
+# endregion Renderers
+
+
+class StepTrace:
+    """An ordered list of Step records, rendered lazily on request."""
+
+    def __init__(self, steps=None):
+        self.steps = steps if steps is not None else []
+
+    def append(self, step: Step) -> None:
+        self.steps.append(step)
+
+    def row_ops(self) -> 'StepTrace':
+        """Only the row operations, without notes, displays or conclusions."""
+        return StepTrace([s for s in self.steps if s.op in _ROW_OPS])
+
+    def render(self, fmt: str = 'text') -> list:
+        renderer = _RENDERERS[fmt]
+        return [renderer(step) for step in self.steps]
+
+    def to_text(self) -> str:
+        return "\n".join(self.render('text'))
+
+    def to_latex(self) -> str:
+        return "\n".join(self.render('latex'))
+
+    def to_ti(self) -> str:
+        return "\n".join(self.render('ti'))
+
+    def diff(self, other: 'StepTrace') -> list:
+        """
+        (index, mine, theirs) for every position where the traces
+        differ, a missing step shows up as None.
+        """
+        mine, theirs = self.steps, other.steps
+        changes = []
+        for idx in range(max(len(mine), len(theirs))):
+            a = mine[idx] if idx < len(mine) else None
+            b = theirs[idx] if idx < len(theirs) else None
+            if a != b:
+                changes.append((idx, a, b))
+        return changes
+
+    def __eq__(self, other):
+        return isinstance(other, StepTrace) and self.steps == other.steps
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __getitem__(self, idx):
+        return self.steps[idx]
+
+    def __str__(self):
+        return self.to_text()
+
+
+class StepRecorder:
+    """No-op recorder, the bulk (silent) mode."""
+    enabled = False
+
+    def record(self, op, *args) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class ListRecorder(StepRecorder):
+    """Collects Step records into a StepTrace, rendered only when asked."""
+    enabled = True
+
+    def __init__(self):
+        self.trace = StepTrace()
+
+    @property
+    def steps(self) -> list:
+        return self.trace.steps
+
+    def record(self, op, *args) -> None:
+        self.trace.append(Step.from_args(op, args))
+
+    def clear(self) -> None:
+        self.trace = StepTrace()
+
+    def lines(self, fmt: str = 'text') -> list:
+        return self.trace.render(fmt)
+
+    def __len__(self):
+        return len(self.trace)
+
+    def __str__(self):
+        return str(self.trace)
+
+
+class CallbackRecorder(StepRecorder):
+    """Streams each rendered step to a callback as it happens."""
+    enabled = True
+
+    def __init__(self, callback, fmt: str = 'text'):
+        self.callback = callback
+        self.renderer = _RENDERERS[fmt]
+
+    def record(self, op, *args) -> None:
+        self.callback(self.renderer(Step.from_args(op, args)))
+
+
+class PrintRecorder(CallbackRecorder):
+    """Streams each step to stdout, the classic step-by-step output."""
+
+    def __init__(self, fmt: str = 'text'):
+        super().__init__(print, fmt)
+
+
+def records_step(operation):
+    """
+    Decorator for row operation methods, reports the call to
+    ``self.recorder`` before running it. Only the enabled check is
+    paid when recording is off.
+    """
+    def decorator(func):
+        def wrapper(self, *args, **kwargs):
+            recorder = self.recorder
+            if recorder.enabled:
+                recorder.record(operation, *args)
+            return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_default_recorder = PrintRecorder()
+
+
+def get_default_recorder() -> StepRecorder:
+    return _default_recorder
+
+
+def set_default_recorder(recorder: StepRecorder) -> None:
+    """Recorder used by matrices created without an explicit one."""
+    global _default_recorder
+    _default_recorder = recorder if recorder is not None else StepRecorder()
+
+
+if __name__ == '__main__':
+    recorder = ListRecorder()
+    recorder.record("swap", 0, 2)
+    recorder.record("sub", 1, 0, 3)
+    recorder.record("div", 2, -2)
+    recorder.record("note", "done")
+    assert recorder.lines() == ["r1 ↔ r3", "R2 ← R2 - (3 * R1)", "R3 ← R3 / -2", "done"]
+    assert recorder.lines('ti')[1] == "m:=mRowAdd(-(3),m,1,2)"
+    assert recorder.lines('latex')[0] == r"R_{1} \leftrightarrow R_{3}"
+    assert len(recorder.trace.row_ops()) == 3
+
+    other = StepTrace(recorder.steps[:2] + [Step("div", 2, None, 2)])
+    assert recorder.trace.diff(other) == [
+        (2, Step("div", 2, None, -2), Step("div", 2, None, 2)),
+        (3, Step("note", factor="done"), None)]
+    assert not StepRecorder().enabled
+
+    # conclusions are records too, worded only when rendered
+    recorder.record("free", 2)
+    recorder.record("inconsistent", 1, 5)
+    recorder.record("unique")
+    assert recorder.steps[-2] == Step("inconsistent", 1, None, 5) and recorder.steps[-1].factor is None
+    assert len(recorder.trace.row_ops()) == 3
+    assert recorder.lines()[-3].startswith("The 3 column contains no pivots, thus x_3 is a free")
+    assert recorder.lines()[-2] == "The last row is equivalent to 0=5, thus the system is inconsistent"
+    assert recorder.lines('latex')[-1].startswith(r"\text{There are no free variables")
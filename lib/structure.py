@@ -0,0 +1,468 @@
+"""
+Structure probe and the specialized kernels it unlocks.
+
+One O(n^2) pass over a square matrix records its lower and upper
+bandwidth and whether it is symmetric. That is enough to tell diagonal,
+triangular, tridiagonal and narrow banded matrices apart, and
+StructuredSolver then picks the cheapest kernel for det, solve and
+inverse:
+
+    diagonal     O(n) det, solve and inverse
+    upper/lower  O(n) det, O(n^2) substitution
+    tridiagonal  Thomas algorithm when dominant or SPD, O(n) per solve
+    banded       pivoted elimination inside the band, O(n·p·(p+q))
+    cholesky     symmetric positive definite, half the work of LU
+    lu           everything else
+
+    solver = StructuredSolver([[2, 1, 0], [1, 2, 1], [0, 1, 2]])
+    solver.method       # 'tridiagonal'
+    solver.solve([1, 0, 1])
+"""
+from collections import namedtuple
+from elimination import det_bareiss, det_pivoted, gauss_jordan_inverse, is_int_matrix
+from factorizations import Cholesky, LUFactorization, _as_vector
+
+_StructureFields = namedtuple('Structure', ['n', 'lower_bw', 'upper_bw', 'symmetric'])
+
+
+class Structure(_StructureFields):
+    """
+    lower_bw / upper_bw are the furthest nonzero below / above the
+    diagonal (0 for a diagonal matrix).
+    """
+    __slots__ = ()
+
+    @property
+    def diagonal(self) -> bool:
+        return self.lower_bw == 0 and self.upper_bw == 0
+
+    @property
+    def upper(self) -> bool:
+        return self.lower_bw == 0
+
+    @property
+    def lower(self) -> bool:
+        return self.upper_bw == 0
+
+    @property
+    def triangular(self) -> bool:
+        return self.lower_bw == 0 or self.upper_bw == 0
+
+    @property
+    def tridiagonal(self) -> bool:
+        return self.lower_bw <= 1 and self.upper_bw <= 1
+
+    @property
+    def banded(self) -> bool:
+        """Narrow enough that band limited elimination beats dense LU."""
+        return 4 * (self.lower_bw + self.upper_bw) < self.n
+
+    @property
+    def kind(self) -> str:
+        for kind in ('diagonal', 'upper', 'lower', 'tridiagonal', 'banded', 'symmetric'):
+            if getattr(self, kind):
+                return kind
+        return 'general'
+
+
+def probe(rows, tol=0) -> Structure:
+    """
+    Bandwidths and symmetry in a single pass, |x| <= tol counts as zero.
+    A row is only scanned entry by entry when any() finds a nonzero
+    outside the band seen so far, so the common cases run at C speed.
+    """
+    n = len(rows)
+    if any(len(row) != n for row in rows):
+        raise ValueError("The matrix must be square.")
+    if tol:
+        rows = [[x if abs(x) > tol else 0 for x in row] for row in rows]
+    lower = upper = 0
+    for i, row in enumerate(rows):
+        if i - lower > 0 and any(row[:i - lower]):
+            lower = i - next(j for j in range(i) if row[j])
+        if i + upper + 1 < n and any(row[i + upper + 1:]):
+            upper = max(j for j in range(i + 1, n) if row[j]) - i
+    symmetric = all(tuple(row) == col for row, col in zip(rows, zip(*rows)))
+    return Structure(n, lower, upper, symmetric)
+
+
+# region Kernels
+
+def diagonal_product(rows):
+    """det of a triangular matrix, exact for int and Frac entries."""
+    det = 1
+    for i, row in enumerate(rows):
+        det *= row[i]
+    return det
+
+
+def _check_pivot(rows, i, tol, first=0, last=None):
+    """
+    Raise when the pivot rows[i][i] is within tol times the largest
+    entry of its column (rows first..last, where the column can be
+    nonzero) of zero, the relative test gauss_jordan_inverse uses.
+    """
+    value = abs(rows[i][i])
+    if value == 0 or (tol and value <= tol * max(abs(row[i]) for row in rows[first:last])):
+        raise ValueError("The matrix is singular.")
+
+
+def solve_lower(rows, b, bw=None, tol=0) -> list:
+    """Forward substitution, only the `bw` entries left of the diagonal are read."""
+    n = len(rows)
+    bw = n if bw is None else bw
+    x = list(b)
+    for i in range(n):
+        row = rows[i]
+        _check_pivot(rows, i, tol, i, i + bw + 1)
+        acc = x[i]
+        for j in range(max(0, i - bw), i):
+            acc -= row[j] * x[j]
+        x[i] = acc / row[i]
+    return x
+
+
+def solve_upper(rows, b, bw=None, tol=0) -> list:
+    """Back substitution, only the `bw` entries right of the diagonal are read."""
+    n = len(rows)
+    bw = n if bw is None else bw
+    x = list(b)
+    for i in range(n - 1, -1, -1):
+        row = rows[i]
+        _check_pivot(rows, i, tol, max(0, i - bw), i + 1)
+        acc = x[i]
+        for j in range(i + 1, min(n, i + bw + 1)):
+            acc -= row[j] * x[j]
+        x[i] = acc / row[i]
+    return x
+
+
+def _column_limits(rows, tol, p, q) -> list:
+    """tol times the largest entry of each column, read inside the band."""
+    n = len(rows)
+    if not tol:
+        return [0] * n
+    return [tol * max(abs(rows[i][k]) for i in range(max(0, k - q), min(n, k + p + 1)))
+            for k in range(n)]
+
+
+def lower_inverse(rows, tol=0) -> list:
+    """Inverse of a lower triangular matrix, itself lower triangular."""
+    n = len(rows)
+    inv = [[0] * n for _ in range(n)]
+    for j in range(n):
+        _check_pivot(rows, j, tol, j)
+        inv[j][j] = 1 / rows[j][j]
+        for i in range(j + 1, n):
+            row = rows[i]
+            acc = 0
+            for k in range(j, i):
+                acc -= row[k] * inv[k][j]
+            inv[i][j] = acc / row[i]
+    return inv
+
+
+def upper_inverse(rows, tol=0) -> list:
+    """Inverse of an upper triangular matrix, through its transpose."""
+    # the pivots are tested against the columns of A, not of its transpose
+    for j in range(len(rows)):
+        _check_pivot(rows, j, tol, 0, j + 1)
+    transposed = lower_inverse([list(col) for col in zip(*rows)])
+    return [list(col) for col in zip(*transposed)]
+
+
+def tridiagonal_dominant(rows) -> bool:
+    """|a[i][i]| >= |a[i][i-1]| + |a[i][i+1]| on every row of a tridiagonal matrix."""
+    n = len(rows)
+    for i, row in enumerate(rows):
+        off = (abs(row[i - 1]) if i else 0) + (abs(row[i + 1]) if i + 1 < n else 0)
+        if abs(row[i]) < off:
+            return False
+    return True
+
+
+def thomas(rows, b, tol=0, positive=False):
+    """
+    Tridiagonal solve without pivoting in O(n). Only stable for a
+    diagonally dominant or a symmetric positive definite matrix; with
+    positive=True every pivot has to be > 0, which for a symmetric matrix
+    is exactly positive definiteness. Returns None when a pivot fails,
+    the caller then needs a pivoted solver.
+    """
+    n = len(rows)
+    c = [0] * n
+    d = list(b)
+    limits = _column_limits(rows, tol, 1, 1)
+    prev_c = prev_d = 0
+    for i in range(n):
+        row = rows[i]
+        sub = row[i - 1] if i else 0
+        pivot = row[i] - sub * prev_c
+        if abs(pivot) <= limits[i] or (positive and pivot <= 0):
+            return None
+        c[i] = prev_c = (row[i + 1] if i + 1 < n else 0) / pivot
+        d[i] = prev_d = (d[i] - sub * prev_d) / pivot
+    for i in range(n - 2, -1, -1):
+        d[i] -= c[i] * d[i + 1]
+    return d
+
+
+def banded_eliminate(rows, p, q, b=None, tol=0):
+    """
+    Partial pivoting elimination that never leaves the band: row k only
+    swaps with rows k+1..k+p, so the upper bandwidth grows to at most
+    p+q. Returns (U rows, eliminated b, det), det 0 when singular.
+    """
+    n = len(rows)
+    a = [list(row) for row in rows]
+    b = list(b) if b is not None else None
+    det = 1
+    width = p + q
+    limits = _column_limits(rows, tol, p, q)
+    for k in range(n):
+        last = min(n - 1, k + p)
+        r = k
+        best = abs(a[k][k])
+        for i in range(k + 1, last + 1):
+            value = abs(a[i][k])
+            if value > best:
+                r, best = i, value
+        if best <= limits[k]:
+            return a, b, 0
+        if r != k:
+            a[k], a[r] = a[r], a[k]
+            if b is not None:
+                b[k], b[r] = b[r], b[k]
+            det = -det
+        pivot_row = a[k]
+        pivot = pivot_row[k]
+        det *= pivot
+        end = min(n, k + width + 1)
+        for i in range(k + 1, last + 1):
+            row = a[i]
+            factor = row[k] / pivot
+            if factor == 0:
+                continue
+            row[k] = 0
+            for j in range(k + 1, end):
+                row[j] -= factor * pivot_row[j]
+            if b is not None:
+                b[i] -= factor * b[k]
+    return a, b, det
+
+
+def banded_solve(rows, b, p, q, tol=0) -> list:
+    u, y, det = banded_eliminate(rows, p, q, b, tol)
+    if det == 0:
+        raise ValueError("The matrix is singular.")
+    return solve_upper(u, y, p + q)
+
+# endregion Kernels
+
+
+class StructuredSolver:
+    """
+    det, solve and inverse of one square matrix through the cheapest
+    kernel its structure allows. The probe runs once in the constructor
+    and factorizations are built on first use and kept, so callers cache
+    the solver next to the matrix and reuse it.
+
+    Usage:
+        solver = StructuredSolver([[4, 1], [1, 3]])
+        solver.method            # 'tridiagonal'
+        solver.det(), solver.solve([1, 2]), solver.inverse()
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.structure = probe(rows)
+        self._method = None
+        self._factor = None
+
+    @property
+    def method(self) -> str:
+        if self._method is None:
+            s = self.structure
+            method = s.kind if s.kind not in ('symmetric', 'general') else 'lu'
+            if method == 'lu' and s.symmetric:
+                # symmetric with a positive diagonal is worth a Cholesky attempt
+                if all(row[i] > 0 for i, row in enumerate(self.rows)):
+                    try:
+                        self._factor = Cholesky(self.rows)
+                        method = 'cholesky'
+                    except (ValueError, TypeError):
+                        pass
+            self._method = method
+        return self._method
+
+    @property
+    def specialized(self) -> bool:
+        """False when nothing better than dense elimination applies."""
+        return self.method != 'lu'
+
+    def _lu(self, tol):
+        if not isinstance(self._factor, LUFactorization) or self._factor.tol != tol:
+            self._factor = LUFactorization(self.rows, tol)
+        return self._factor
+
+    def det(self, tol=0):
+        """Exact for triangular matrices and for any integer matrix."""
+        s = self.structure
+        if s.triangular:
+            return diagonal_product(self.rows)
+        if is_int_matrix(self.rows):
+            return det_bareiss(self.rows)
+        method = self.method
+        if method == 'cholesky':
+            return self._factor.det()
+        if method in ('tridiagonal', 'banded'):
+            return banded_eliminate(self.rows, s.lower_bw, s.upper_bw, tol=tol)[2]
+        return det_pivoted(self.rows, tol)
+
+    def solve(self, b, tol=0) -> list:
+        """x with A·x = b, raises ValueError when A is singular."""
+        b = _as_vector(b)
+        s = self.structure
+        if len(b) != s.n:
+            raise ValueError("b must have length {}".format(s.n))
+        method = self.method
+        rows = self.rows
+        if method == 'diagonal':
+            for i in range(len(rows)):
+                _check_pivot(rows, i, tol, i, i + 1)
+            return [x / row[i] for i, (x, row) in enumerate(zip(b, rows))]
+        if method == 'upper':
+            return solve_upper(rows, b, s.upper_bw, tol)
+        if method == 'lower':
+            return solve_lower(rows, b, s.lower_bw, tol)
+        if method == 'cholesky':
+            return self._factor.solve(b)
+        if method == 'tridiagonal':
+            # without pivoting Thomas is only safe when dominant or SPD
+            if tridiagonal_dominant(rows):
+                x = thomas(rows, b, tol)
+            else:
+                x = thomas(rows, b, tol, positive=s.symmetric) if s.symmetric else None
+            if x is not None:
+                return x
+        if method in ('tridiagonal', 'banded'):
+            return banded_solve(rows, b, s.lower_bw, s.upper_bw, tol)
+        lu = self._lu(tol)
+        if lu.singular:
+            raise ValueError("The matrix is singular.")
+        return lu.solve(b)
+
+    def solve_many(self, B, tol=0) -> list:
+        return [self.solve(b, tol) for b in B]
+
+    def inverse(self, tol=1e-12) -> list:
+        """A^-1 as rows, raises ValueError when A is singular."""
+        method = self.method
+        rows = self.rows
+        if method == 'diagonal':
+            n = len(rows)
+            inv = [[0] * n for _ in range(n)]
+            for i, row in enumerate(rows):
+                _check_pivot(rows, i, tol, i, i + 1)
+                inv[i][i] = 1 / row[i]
+            return inv
+        if method == 'upper':
+            return upper_inverse(rows, tol)
+        if method == 'lower':
+            return lower_inverse(rows, tol)
+        if method == 'cholesky':
+            return self._factor.inverse()
+        return gauss_jordan_inverse(rows, tol)
+
+    def __repr__(self):
+        return "<StructuredSolver n={} method={}>".format(self.structure.n, self.method)
+
+
+if __name__ == '__main__':
+    import random
+
+    def residual(a, x, b):
+        return max(abs(sum(v * xi for v, xi in zip(row, x)) - bi) for row, bi in zip(a, b))
+
+    def identity_error(a, inv):
+        n = len(a)
+        return max(abs(sum(a[i][k] * inv[k][j] for k in range(n)) - (i == j))
+                   for i in range(n) for j in range(n))
+
+    assert probe([[1, 2], [0, 3]]) == Structure(2, 0, 1, False)
+    assert probe([[1, 0], [0, 3]]).kind == 'diagonal'
+    assert StructuredSolver([[2, 1, 0], [1, 2, 1], [0, 1, 2]]).method == 'tridiagonal'
+    assert StructuredSolver([[4, 2, 2], [2, 5, 3], [2, 3, 6]]).method == 'cholesky'
+    assert StructuredSolver([[1, 2, 2], [2, 1, 3], [2, 3, 1]]).method == 'lu'
+    assert StructuredSolver([[2, 0], [5, 3]]).det() == 6
+
+    # a tiny pivot sends Thomas off, the pivoted band solver takes over
+    tiny = StructuredSolver([[1e-20, 1], [1, 1]])
+    assert tiny.method == 'tridiagonal'
+    assert residual([[1e-20, 1], [1, 1]], tiny.solve([1, 2]), [1, 2]) < 1e-12
+    assert [round(x, 12) for x in tiny.solve([1, 2])] == [1, 1]
+    small = [[1e-17, 1, 0], [1, 1, 1], [0, 1, 1]]
+    assert [round(x, 12) for x in StructuredSolver(small).solve([1, 2, 3])] == [-1, 1, 2]
+    assert StructuredSolver([[0, 1], [1, 0]]).solve([2, 3]) == [3, 2]
+
+    random.seed(18)
+    n = 24
+    dense = [[random.uniform(-1, 1) for _ in range(n)] for _ in range(n)]
+    for i in range(n):
+        dense[i][i] += n
+    shapes = {
+        'diagonal': lambda i, j: i == j,
+        'upper': lambda i, j: j >= i,
+        'lower': lambda i, j: j <= i,
+        'tridiagonal': lambda i, j: abs(i - j) <= 1,
+        'banded': lambda i, j: -2 <= j - i <= 1,
+        'lu': lambda i, j: True,
+    }
+    for expected, inside in shapes.items():
+        a = [[dense[i][j] if inside(i, j) else 0 for j in range(n)] for i in range(n)]
+        solver = StructuredSolver(a)
+        assert solver.method == expected, (expected, solver.method)
+        b = [random.uniform(-5, 5) for _ in range(n)]
+        assert residual(a, solver.solve(b), b) < 1e-9
+        assert identity_error(a, solver.inverse()) < 1e-9
+        assert abs(solver.det() - det_pivoted(a)) <= 1e-9 * abs(det_pivoted(a))
+
+    # SPD: A = M·M^T + n·I
+    spd = [[sum(dense[i][k] * dense[j][k] for k in range(n)) for j in range(n)] for i in range(n)]
+    solver = StructuredSolver(spd)
+    assert solver.method == 'cholesky'
+    b = [1.0] * n
+    assert residual(spd, solver.solve(b), b) < 1e-8
+    assert abs(solver.det() / det_pivoted(spd) - 1) < 1e-9
+
+    # a zero pivot on the tridiagonal falls back to pivoting
+    tri = [[0, 1, 0], [1, 0, 1], [0, 1, 1]]
+    assert residual(tri, StructuredSolver(tri).solve([1, 2, 3]), [1, 2, 3]) < 1e-12
+    for singular in ([[1, 0], [0, 0]], [[1, 2], [0, 0]], [[1, 1, 0], [1, 1, 0], [0, 0, 1]]):
+        try:
+            StructuredSolver(singular).solve([1] * len(singular))
+            assert False
+        except ValueError:
+            pass
+
+    # singular means the same on every path: the pivot is tested against
+    # tol times the largest entry of its column, as in gauss_jordan_inverse
+    for scaled in ([[1e-13, 0.0], [0.0, 1.0]], [[1e-13, 1e-13], [0.0, 1.0]],
+                   [[1e-13, 0.0], [1e-13, 1.0]], [[2e-13, 1e-13], [1e-13, 3e-13]]):
+        solver = StructuredSolver(scaled)
+        assert identity_error(scaled, solver.inverse()) < 1e-9
+        assert residual(scaled, solver.solve([1.0, 1.0], tol=1e-12), [1.0, 1.0]) < 1e-9
+    assert [StructuredSolver(a).method for a in ([[1e-13, 0.0], [0.0, 1.0]],
+            [[1e-13, 1e-13], [0.0, 1.0]], [[1e-13, 0.0], [1e-13, 1.0]])] == ['diagonal', 'upper', 'lower']
+    for nearly in ([[1.0, 1e15], [0.0, 100.0]], [[100.0, 0.0], [1e15, 1.0]]):
+        for invert in (StructuredSolver(nearly).inverse, lambda: gauss_jordan_inverse(nearly)):
+            try:
+                invert()
+                assert False
+            except ValueError:
+                pass
+        try:
+            StructuredSolver(nearly).solve([1.0, 1.0], tol=1e-12)
+            assert False
+        except ValueError:
+            pass
@@ -0,0 +1,167 @@
+"""
+Subspace analysis built from a single RREF.
+
+Everything a rank/nullity/basis question needs is read off one reduced
+row echelon form, so ``analyze(rows, rref, pivots)`` never eliminates
+again. Entries stay whatever the RREF produced: ints and Frac for the
+exact integer path, floats otherwise.
+"""
+from collections import namedtuple
+from frac import Frac
+from ti_formatting import most_accurate
+
+
+def null_space_basis(rref, pivots, cols: int, tol=1e-10) -> list:
+    """
+    One basis vector per free column f: x_f = 1, every pivot variable
+    x_c = -rref[row][f] and the other free variables 0.
+    """
+    pivot_of = {col: row for row, col in pivots}
+    basis = []
+    for free in range(cols):
+        if free in pivot_of:
+            continue
+        vector = [0] * cols
+        vector[free] = 1
+        for col, row in pivot_of.items():
+            value = rref[row][free]
+            if abs(value) > tol:
+                vector[col] = -value
+        basis.append(vector)
+    return basis
+
+
+def free_var_names(count: int) -> list:
+    """t and s for one or two free variables, t1..tN beyond that."""
+    if count <= 2:
+        return ['t', 's'][:count]
+    return ['t{}'.format(i + 1) for i in range(count)]
+
+
+def _term(coefficient, name: str) -> str:
+    if coefficient == 1:
+        return name
+    if coefficient == -1:
+        return '-' + name
+    if isinstance(coefficient, float):
+        coefficient = most_accurate(coefficient)
+    if isinstance(coefficient, Frac) and coefficient.denominator != 1:
+        return "({}){}".format(coefficient, name)
+    return "{}{}".format(coefficient, name)
+
+
+def parametric_form(basis, names=None, tol=1e-10) -> str:
+    """
+    General solution of A·x = 0 as x1=..,x2=.. from a null space basis,
+    e.g. [[-2, 1]] renders as "x1=-2t,x2=t". Only called when a string
+    is actually wanted.
+    """
+    if not basis:
+        return "x=0"
+    names = names or free_var_names(len(basis))
+    equations = []
+    for i in range(len(basis[0])):
+        terms = [_term(vector[i], name) for vector, name in zip(basis, names)
+                 if abs(vector[i]) > tol]
+        rhs = "+".join(terms).replace("+-", "-") if terms else "0"
+        equations.append("x{}={}".format(i + 1, rhs))
+    return ",".join(equations)
+
+
+_ReportFields = namedtuple('SubspaceReport', [
+    'dims', 'rank', 'nullity', 'pivot_cols', 'free_cols', 'rref',
+    'row_space', 'col_space', 'null_space'])
+
+
+class SubspaceReport(_ReportFields):
+    """
+    Immutable result of a one pass subspace analysis. Bases are tuples of
+    vectors (tuples) and columns are 0-based. Nothing is formatted until
+    the report is turned into a string.
+    """
+    __slots__ = ()
+
+    @property
+    def independent(self) -> bool:
+        """True when the columns are linearly independent."""
+        return self.nullity == 0
+
+    @property
+    def spans(self) -> bool:
+        """True when the columns span R^rows."""
+        return self.rank == self.dims[0]
+
+    def parametric(self) -> str:
+        """The general solution of A·x = 0, rendered on demand."""
+        return parametric_form(self.null_space)
+
+    def lines(self) -> list:
+        cols_1 = lambda cols: ", ".join(str(col + 1) for col in cols)
+        lines = [
+            "rank: {}".format(self.rank),
+            "nullity: {}".format(self.nullity),
+            "Spans: R^{}".format(self.rank),
+            "LI: Linearly {}".format("Independent" if self.independent else "Dependent"),
+            "Lin. Ind. Cols: {}".format(cols_1(self.pivot_cols)),
+        ]
+        if not self.independent:
+            lines.append("Free Cols: {}".format(cols_1(self.free_cols)))
+            lines.append("Free Col Cnt: {}".format(len(self.free_cols)))
+        for name, basis in (("Row space", self.row_space),
+                            ("Col space", self.col_space),
+                            ("Null space", self.null_space)):
+            lines.append("{}: {}".format(name, _render_basis(basis)))
+        return lines
+
+    def __str__(self):
+        return "\n".join(self.lines())
+
+
+def _render_basis(basis) -> str:
+    if not basis:
+        return "{0}"
+    return "{" + ", ".join(
+        "[" + ", ".join(str(x) for x in vector) + "]" for vector in basis) + "}"
+
+
+def analyze(rows, rref, pivots, tol=1e-10) -> SubspaceReport:
+    """Build the report from the matrix rows and their RREF and pivots."""
+    m = len(rows)
+    n = len(rows[0]) if m else 0
+    pivot_cols = tuple(col for _, col in pivots)
+    pivot_set = set(pivot_cols)
+    rank = len(pivot_cols)
+    return SubspaceReport(
+        dims=(m, n),
+        rank=rank,
+        nullity=n - rank,
+        pivot_cols=pivot_cols,
+        free_cols=tuple(col for col in range(n) if col not in pivot_set),
+        rref=tuple(tuple(row) for row in rref),
+        # the nonzero RREF rows span the row space
+        row_space=tuple(tuple(rref[row]) for row, _ in pivots),
+        col_space=tuple(tuple(row[col] for row in rows) for col in pivot_cols),
+        null_space=tuple(tuple(v) for v in null_space_basis(rref, pivots, n, tol)),
+    )
+
+
+if __name__ == '__main__':
+    rows = [[1, 2, 3], [2, 4, 6], [1, 0, 1]]
+    rref = [[1, 0, 1], [0, 1, 1], [0, 0, 0]]
+    report = analyze(rows, rref, [(0, 0), (1, 1)])
+    assert report.rank == 2 and report.nullity == 1
+    assert report.pivot_cols == (0, 1) and report.free_cols == (2,)
+    assert report.null_space == ((-1, -1, 1),)
+    assert report.col_space == ((1, 2, 1), (2, 4, 0))
+    assert not report.independent and not report.spans
+    for vector in report.null_space:
+        assert all(sum(a * x for a, x in zip(row, vector)) == 0 for row in rows)
+    assert "Free Cols: 3" in str(report)
+    assert report.parametric() == "x1=-t,x2=-t,x3=t"
+    assert parametric_form([[-2, 1, 0], [Frac(1, 2), 0, 1]]) == "x1=-2t+(1/2)s,x2=t,x3=s"
+    assert free_var_names(300)[-1] == 't300'
+    try:
+        report.rank = 3
+        assert False
+    except AttributeError:
+        pass
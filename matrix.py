@@ -4,37 +4,30 @@
 import parsing
 import sys
 sys.path.append('./lib')
+from elimination import determinant as eliminate_determinant
+from elimination import is_int_matrix, rref_exact, rank_exact
+from factorizations import LUFactorization
+from structure import StructuredSolver
+from step_recorder import Step, StepTrace, get_default_recorder, records_step
+from memo import content_cached
 
 
-def log_matrix_operation(operation):
-    def decorator(func):
-        def wrapper(*args, **kwargs):
-            if operation == "swap":
-                print("r{} ↔ r{}".format(args[1]+1, args[2]+1))
-            elif operation == "multiply":
-                print("R{} ← R{} * {}".format(args[1]+1, args[1]+1, args[2]))
-            elif operation == "add":
-                print(
-                    "R{} ← R{} + R{}".format(args[1]+1, args[1]+1, args[2]+1))
-            elif operation == "m_row_add":
-                print(
-                    "R{} ← R{} + ({} * R{})".format(args[1]+1, args[1]+1, args[2], args[3]+1))
-            elif operation == "sub":
-                print(
-                    "R{} ← R{} - R{}".format(args[1]+1, args[1]+1, args[2]+1))
-            elif operation == "div":
-                print("R{} ← R{} / {}".format(args[1]+1, args[1]+1, args[2]))
-            # Add more operation types if needed
-
-            result = func(*args, **kwargs)
-            return result
-        return wrapper
-    return decorator
+# row operations report (op, i, j, factor) steps to self.recorder
+log_matrix_operation = records_step
+
+
+def _display_block(cells):
+    """Compact [[ a, b ], [ c, d ]] rendering used for arithmetic steps."""
+    compact_display = "["
+    for i, v in enumerate(cells):
+        spacer = "[ " if i == 0 else " [ "
+        compact_display += spacer + ", ".join(v) + " ],\n"
+    return compact_display.rstrip(",\n") + "]"
 
 
 class Matrix:
 
-    def __init__(self, matrix, aug_col=False):
+    def __init__(self, matrix, aug_col=False, recorder=None):
         self.matrix = matrix
         self.m = len(matrix)  # number of rows
         self.n = len(matrix[0]) if self.m else 0
@@ -42,6 +35,17 @@ class Matrix:
         self.current_col = 0
         self.has_aug_col = aug_col
         self.data = self.matrix
+        self._lu = None
+        self._inverse = None
+        self._solver = None
+        # where row operations report their steps, see step_recorder
+        self.recorder = recorder if recorder is not None else get_default_recorder()
+
+    def _invalidate(self):
+        """Drop cached factorizations after the matrix is mutated."""
+        self._lu = None
+        self._inverse = None
+        self._solver = None
 
     @property
     def T(self):
@@ -56,7 +60,17 @@ class Matrix:
         return len(self.matrix[0]) if self.m else 0
 
     def identity(self, n):
-        return Matrix([[1 if i == j else 0 for j in range(n)] for i in range(n)])
+        return Matrix([[1 if i == j else 0 for j in range(n)] for i in range(n)], recorder=self.recorder)
+
+    def _note(self, text):
+        """Report a message to the recorder, skipped when recording is off."""
+        if self.recorder.enabled:
+            self.recorder.record("note", text)
+
+    def _show(self):
+        """Report a snapshot of the current rows to the recorder."""
+        if self.recorder.enabled:
+            self.recorder.record("matrix", [row[:] for row in self.matrix])
 
     def __len__(self):
         return len(self.matrix)
@@ -65,6 +79,7 @@ class Matrix:
         return self.matrix[indices[0]][indices[1]] if isinstance(indices, tuple) else self.matrix[indices]
 
     def __setitem__(self, indices, value):
+        self._invalidate()
         if isinstance(indices, tuple):
             row, col = indices
             self.matrix[row][col] = value
@@ -89,26 +104,15 @@ class Matrix:
             print("Matrices must have the same dimensions")
             return None
 
-        # Initialize the result matrix and an intermediate display matrix
-        C = [[0 for _ in range(len(A[0]))] for _ in range(len(A))]
-        display = [["" for _ in range(len(A[0]))] for _ in range(len(A))]
-
-        for i in range(len(A)):
-            for j in range(len(A[0])):
-                display[i][j] = "{}+{}".format(A[i][j], B[i][j])
-                display[i][j] = display[i][j].replace(
-                    "+-", "-")  # Correcting double negative
-                C[i][j] = A[i][j] + B[i][j]
+        C = [[a + b for a, b in zip(row_a, row_b)] for row_a, row_b in zip(A, B)]
 
         # Display the addition steps
-        compact_display = "["
-        for i, v in enumerate(display):
-            spacer = "[ " if i == 0 else " [ "
-            compact_display += spacer + ", ".join(v) + " ],\n"
-        compact_display = compact_display.rstrip(",\n") + "]"
-        print(compact_display)
+        if self.recorder.enabled:
+            display = [["{}+{}".format(a, b).replace("+-", "-")  # Correcting double negative
+                        for a, b in zip(row_a, row_b)] for row_a, row_b in zip(A, B)]
+            self.recorder.record("display", _display_block(display))
 
-        return Matrix(C)
+        return Matrix(C, recorder=self.recorder)
 
     def __sub__(self, other):
         A = self.matrix
@@ -119,26 +123,15 @@ class Matrix:
             print("Matrices must have the same dimensions")
             return None
 
-        # Initialize the result matrix and an intermediate display matrix
-        C = [[0 for _ in range(len(A[0]))] for _ in range(len(A))]
-        display = [["" for _ in range(len(A[0]))] for _ in range(len(A))]
-
-        for i in range(len(A)):
-            for j in range(len(A[0])):
-                display[i][j] = "{}-{}".format(A[i][j], B[i][j])
-                display[i][j] = display[i][j].replace(
-                    "--", "+")  # Correcting double negative
-                C[i][j] = A[i][j] - B[i][j]
+        C = [[a - b for a, b in zip(row_a, row_b)] for row_a, row_b in zip(A, B)]
 
         # Display the subtraction steps
-        compact_display = "["
-        for i, v in enumerate(display):
-            spacer = "[ " if i == 0 else " [ "
-            compact_display += spacer + ", ".join(v) + " ],\n"
-        compact_display = compact_display.rstrip(",\n") + "]"
-        print(compact_display)
+        if self.recorder.enabled:
+            display = [["{}-{}".format(a, b).replace("--", "+")  # Correcting double negative
+                        for a, b in zip(row_a, row_b)] for row_a, row_b in zip(A, B)]
+            self.recorder.record("display", _display_block(display))
 
-        return Matrix(C)
+        return Matrix(C, recorder=self.recorder)
 
     def __mul__(self, other):
         if isinstance(other, (int, float)):
@@ -152,27 +145,25 @@ class Matrix:
             print("Matrices cannot be multiplied")
             return None
 
-        # Initialize the result matrix with zeros and an intermediate display matrix
+        # Initialize the result matrix with zeros
         C = [[0 for _ in range(len(B[0]))] for _ in range(len(A))]
-        display = [["" for _ in range(len(B[0]))] for _ in range(len(A))]
 
         for i in range(len(A)):
             for j in range(len(B[0])):
                 for k in range(len(B)):
-                    # Update the intermediate display matrix
-                    if display[i][j]:
-                        display[i][j] += "+"
-                    display[i][j] += "{}*{}".format(A[i][k], B[k][j])
                     C[i][j] += A[i][k] * B[k][j]
 
-        display = self.template.format_matrix(C)
-        self.pm.add_to_queue(display)
+        # Display the multiplication steps
+        if self.recorder.enabled:
+            display = [["+".join("{}*{}".format(A[i][k], B[k][j]) for k in range(len(B)))
+                        for j in range(len(B[0]))] for i in range(len(A))]
+            self.recorder.record("display", _display_block(display))
 
-        return Matrix(C)
+        return Matrix(C, recorder=self.recorder)
 
     def __mul_scalar(self, other: (int, float)):
         """Multiply matrix by a scalar."""
-        return Matrix([[other * self.matrix[i][j] for j in range(self.n)] for i in range(self.m)])
+        return Matrix([[other * self.matrix[i][j] for j in range(self.n)] for i in range(self.m)], recorder=self.recorder)
 
     def __eq__(self, other):
         return self.matrix == other.matrix if isinstance(other, Matrix) else self.matrix == other
@@ -184,18 +175,46 @@ class Matrix:
         return self.__mul__(other)
 
     def __pow__(self, power):
-        """Computes the matrix raised to a given power."""
+        """
+        Computes the matrix raised to a given power by repeated squaring,
+        O(log p) multiplications and no recursion. Negative powers raise
+        the cached inverse. The result is always a new matrix.
+        """
         if self.m != self.n:
             print("Matrix must be square for matrix exponentiation.")
             return None
 
+        base = self
         if power < 0:
-            inverse = self.inverse()
-            if not inverse:
+            base = self._inverse_matrix()
+            if base is None:
                 print("Matrix is singular. Cannot compute negative power.")
                 return None
-            return inverse ** (-power)
-        return self.identity(self.m) if power == 0 else self * (self ** (power - 1))
+            power = -power
+        shared = base
+
+        result = None
+        while power:
+            if power & 1:
+                result = base if result is None else result * base
+            power >>= 1
+            if power:
+                base = base * base
+        if result is None:
+            return self.identity(self.m)
+        if result is shared:
+            # never hand out self or the cached inverse
+            result = Matrix([row[:] for row in result.matrix], recorder=self.recorder)
+        return result
+
+    def _inverse_matrix(self):
+        """Inverse from the cached LU factors, computed once until mutated."""
+        if self._inverse is None:
+            lu = self.lu()
+            if lu.singular:
+                return None
+            self._inverse = Matrix(lu.inverse(), recorder=self.recorder)
+        return self._inverse
 
     def __iter__(self):
         self.current_row, self.current_col = 0, 0
@@ -225,7 +244,7 @@ class Matrix:
             return None
         flattened = [item for sublist in self.matrix for item in sublist]
         reshaped = [[flattened[i * n + j] for j in range(n)] for i in range(m)]
-        return Matrix(reshaped)
+        return Matrix(reshaped, recorder=self.recorder)
 
     def transpose(self):
         result = [[0 for _ in range(self.m)] for _ in range(self.n)]
@@ -233,28 +252,34 @@ class Matrix:
             for j in range(self.n):
                 result[j][i] = self.matrix[i][j]
 
-        return Matrix(result)
+        return Matrix(result, recorder=self.recorder)
 
-    def determinant(self):
+    @content_cached
+    def determinant(self, tol=0):
         """
-        Compute the determinant of a matrix.
-        Uses recursion for matrices larger than 2x2.
+        Compute the determinant of a matrix in O(n^3), or O(n) for a
+        triangular one. Integer matrices use exact Bareiss elimination,
+        Fractions stay exact under pivoted elimination and float pivots
+        with abs(pivot) <= tol are treated as zero.
         """
         if len(self.matrix) != len(self.matrix[0]):
             raise ValueError("The matrix must be square.")
 
-        if len(self.matrix) == 1:
-            return self.matrix[0][0]
-
-        if len(self.matrix) == 2:
-            return self.matrix[0][0] * self.matrix[1][1] - self.matrix[0][1] * self.matrix[1][0]
+        solver = self.solver()
+        if solver is not None and solver.structure.triangular:
+            return solver.det()
+        return eliminate_determinant(self.matrix, tol)
 
-        det = 0
-        for j in range(len(self.matrix)):
-            sub_matrix = Matrix(self.submatrix(0, j))
-            det += ((-1) ** j) * \
-                self.matrix[0][j] * self.determinant(sub_matrix)
-        return det
+    def solver(self):
+        """
+        Structure probe and structured kernels, cached until mutated.
+        None for matrices with symbolic entries.
+        """
+        if self._solver is None:
+            if any(isinstance(x, str) for row in self.matrix for x in row):
+                return None
+            self._solver = StructuredSolver(self.matrix)
+        return self._solver
 
     def cofactor(self, i, j):
         """
@@ -262,13 +287,13 @@ class Matrix:
         Uses determinant of submatrix obtained by removing row i and column j.
         """
 
-        sub_matrix = Matrix(self.submatrix(i, j))
-        return ((-1) ** (i + j)) * sub_matrix.determinant()
+        return ((-1) ** (i + j)) * self.submatrix(i, j).determinant()
 
     def matrix_of_cofactors(self):
         """Compute the matrix of cofactors."""
         return [[self.cofactor(i, j) for j in range(len(self.matrix))] for i in range(len(self.matrix))]
 
+    @content_cached(records_steps=True)
     def inverse(self):
         """Compute the inverse of a matrix."""
         det = self.determinant()
@@ -278,7 +303,7 @@ class Matrix:
 
         cofactors = self.matrix_of_cofactors()
         # Transpose the matrix of cofactors
-        adjugate = Matrix(list(map(list, zip(*cofactors))))
+        adjugate = Matrix(list(map(list, zip(*cofactors))), recorder=self.recorder)
 
         # Using the row_div method to divide each row by the determinant
         for i in range(len(adjugate.matrix)):
@@ -329,7 +354,7 @@ class Matrix:
 
         # Create a copy of the matrix for manipulation
         matrix_copy = [row.copy() for row in self.matrix]
-        m = Matrix(matrix_copy)
+        m = Matrix(matrix_copy, recorder=self.recorder)
 
         det = 1  # Starting value for determinant
 
@@ -338,7 +363,6 @@ class Matrix:
             if m.matrix[j][j] == 0:
                 for i in range(j+1, m.rows):
                     if m.matrix[i][j] != 0:
-                        print(f"Swapping row {j} with row {i}")
                         m._row_swap(i, j)
                         det *= -1  # Swapping rows changes the sign of determinant
                         break
@@ -352,9 +376,8 @@ class Matrix:
             # Eliminate all entries below the pivot
             for i in range(j+1, m.rows):
                 if m.matrix[i][j] != 0:
+                    # the recorder reports the elimination step
                     factor = m.matrix[i][j] / m.matrix[j][j]
-                    print(
-                        f"Making zero at position {i},{j} by subtracting {factor:.2f} times row {j} from row {i}")
                     m._row_subtract(i, j, factor)
 
         return det
@@ -410,7 +433,7 @@ class Matrix:
     def to_ref(self, rref_caller=False):
         if self.is_ref():
             if not rref_caller:
-                print("Matrix is already in REF.")
+                self._note("Matrix is already in REF.")
             return
 
         matrix = self.matrix
@@ -439,11 +462,29 @@ class Matrix:
                     self._row_subtract(k, i, factor)
 
         if not rref_caller:
-            print("The matrix in Row Echelon Form (REF) is:")
+            self._note("The matrix in Row Echelon Form (REF) is:")
             # self.pm.add_to_queue(self.template.format_matrix(self.matrix))
 
-    def to_rref(self):
-        """Refined method to manually convert the matrix to its Reduced Row Echelon Form (RREF)"""
+    def rank(self):
+        """Number of pivots, exact (Bareiss) for integer matrices."""
+        if is_int_matrix(self.matrix):
+            return rank_exact(self.matrix)
+        return self.get_num_pivots()
+
+    def to_rref(self, exact=False):
+        """Refined method to manually convert the matrix to its Reduced Row Echelon Form (RREF)
+
+        With exact=True an integer matrix is reduced by fraction-free
+        Bareiss elimination, entries stay ints or exact Frac values.
+        """
+        if exact and is_int_matrix(self.matrix):
+            self._invalidate()
+            self.matrix, _ = rref_exact(self.matrix)
+            self.data = self.matrix
+            self._note("The matrix in Reduced Row Echelon Form (RREF) is:")
+            self._show()
+            return self.matrix
+
         matrix = self.matrix
         m, n = len(matrix), len(matrix[0])
 
@@ -473,7 +514,8 @@ class Matrix:
                     # matrix[i] = [iv - lv*rv for rv,iv in zip(matrix[r], matrix[i])]
             lead += 1
         self.matrix = matrix
-        self.pm.add_to_queue(self.template.format_matrix(self.matrix))
+        self._note("The matrix in Reduced Row Echelon Form (RREF) is:")
+        self._show()
         return self.matrix
 
     def gaussian_elimination(self):
@@ -504,24 +546,22 @@ class Matrix:
                 if factor != 0:
                     self._row_subtract(k, i, factor)
 
-        comments = []
+        # conclusions are Step records, worded only when the trace is rendered
+        comments = StepTrace()
         free_vars = set(range(n)) - set(pivots)
         for f in free_vars:
-            comments.append(
-                f"The {f+1} column contains no pivots, thus x_{f+1} is a free variable and the system has infinitely many solutions")
+            comments.append(Step("free", factor=f))
 
         num_solutions = 1 if not free_vars else float('inf')
         solutions = []
         for i in range(m):
             if all([cell == 0 for cell in matrix[i][:n]]) and matrix[i][last_col-1] != 0:
                 solutions.append("The system has no solution.")
-                comments.append(
-                    f"The last row is equivalent to 0={matrix[i][last_col-1]}, thus the system is inconsistent")
+                comments.append(Step("inconsistent", i, None, matrix[i][last_col-1]))
                 return 0, solutions, comments
 
         if not free_vars:
-            comments.append(
-                "There are no free variables and the system has a unique solution")
+            comments.append(Step("unique"))
             x = [0 for _ in range(n)]
             for i in pivots[::-1]:
                 x[i] = matrix[i][last_col-1]
@@ -537,6 +577,7 @@ class Matrix:
     @log_matrix_operation("swap")
     def _row_swap(self, i, j):
         """Swap rows i and j of the matrix."""
+        self._invalidate()
         self.matrix[i], self.matrix[j] = self.matrix[j], self.matrix[i]
         return self
 
@@ -579,6 +620,7 @@ class Matrix:
 
     def set_row(self, i, row):
         if 0 <= i < self.m:
+            self._invalidate()
             self.matrix[i] = row
             return
         raise IndexError("Row index out of range")
@@ -587,6 +629,7 @@ class Matrix:
         if 0 <= i < self.n:
             if isinstance(col, list) and isinstance(col[0], list):
                 col = [row[0] for row in col]
+            self._invalidate()
             for j, val in enumerate(col):
                 self.matrix[j][i] = val
             return
@@ -599,7 +642,7 @@ class Matrix:
 
     def submatrix(self, i, j):
         """Return the submatrix formed by deleting the ith row and jth column."""
-        return Matrix([row[:j] + row[j+1:] for row in (self.matrix[:i]+self.matrix[i+1:])])
+        return Matrix([row[:j] + row[j+1:] for row in (self.matrix[:i]+self.matrix[i+1:])], recorder=self.recorder)
 
     def lu_factorization(self):
         """
@@ -608,8 +651,8 @@ class Matrix:
         n = len(self.matrix)
 
         # Initialize L as identity matrix and U as a copy of the original matrix
-        L = Matrix([[0]*n for _ in range(n)])
-        U = Matrix([row.copy() for row in self.matrix])
+        L = Matrix([[0]*n for _ in range(n)], recorder=self.recorder)
+        U = Matrix([row.copy() for row in self.matrix], recorder=self.recorder)
 
         for i in range(n):
             L.matrix[i][i] = 1.0
@@ -649,6 +692,15 @@ class Matrix:
                     for j in range(i+1, n))) / U.matrix[i][i]
         return x
 
+    def lu(self, tol=0):
+        """
+        Pivoted LU factorization (P·A = L·U), cached on the matrix until
+        it is mutated so repeated solves only cost O(n^2) each.
+        """
+        if self._lu is None or self._lu.tol != tol:
+            self._lu = LUFactorization(self.matrix, tol)
+        return self._lu
+
     def solve_system(self, b):
         ''' USAGE:
           A = Matrix([
@@ -662,24 +714,29 @@ class Matrix:
           print("Ly = " + str(Ly))
           print("Ux = " + str(Ux))
           print("x = " + str(x))
+
+          L and U come from the pivoted factorization, so Ly
+          reproduces b with its rows permuted (P·b).
         '''
 
-        # LU Factorization
-        L, U = self.lu_factorization()
+        # LU Factorization, reused across calls
+        lu = self.lu()
+        L, U = lu.L, lu.U
+        n = lu.n
 
-        # Solve for y in Ly = b
-        y = self.forward_substitution(L, b)
+        # Solve for y in Ly = Pb
+        y = lu.forward(b)
 
         # Compute Ly for verification
-        Ly = [sum(L.matrix[i][j] * y[j] for j in range(3)) for i in range(3)]
+        Ly = [sum(L[i][j] * y[j] for j in range(n)) for i in range(n)]
 
         # Solve for x in Ux = y
-        x = self.backward_substitution(U, y)
+        x = lu.backward(y)
 
         # Compute Ux for verification
-        Ux = [sum(U.matrix[i][j] * x[j] for j in range(3)) for i in range(3)]
+        Ux = [sum(U[i][j] * x[j] for j in range(n)) for i in range(n)]
 
-        return L.matrix, U.matrix, Ly, Ux, x
+        return L, U, Ly, Ux, x
 
 
 def flatten(lst):
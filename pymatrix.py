@@ -8,14 +8,29 @@ if sys.platform == 'win32':
 from pyvector import PyVector
 from ti_matrix import TiMatrix
 from ti_converters import to_py_row_vec, to_py_col_vec, to_ti_mat
-from matrix_tools import apply_percise_numbers
+from matrix_tools import apply_percise_numbers, mat_mul, mat_mul_blocked
 from listlike2d import ListLike2D
 from ti_formatting import most_accurate
 from character_scripting import char_subscript
-from polyfill import map_replace
+from frac import Frac
+from elimination import is_int_matrix, det_bareiss, det_pivoted, rref_exact
+from elimination import gauss_jordan_inverse
+from flat_matrix import FlatMatrix, FLOAT_CODE
+from factorizations import LUFactorization, QRFactorization
+from structure import StructuredSolver
+from rational_matrix import RationalMatrix, is_rational_matrix
+from step_recorder import StepRecorder, records_step
+from backends import get_backend, is_float_matrix
+import batch
+from memo import content_cached, fingerprint, fresh_copy
+from eigen import eig as local_eig
+from subspace import analyze as analyze_subspaces, null_space_basis, parametric_form
 
 Pivot = namedtuple('Pivot', ['row', 'col'])
 
+# products with at least this many columns use the blocked kernel
+BLOCKED_MUL_COLS = 256
+
 
 def enforces_symbolic(func):
     def wrapper(self, *args, **kwargs):
@@ -35,31 +50,149 @@ def index_adjuster(func):
         return func(self, *args, **kwargs)
     return wrapper
 
+
+def invalidates_cache(func):
+    def wrapper(self, *args, **kwargs):
+        result = func(self, *args, **kwargs)
+        self._invalidate()
+        return result
+    return wrapper
+
 class PyMatrix:...
 class PyMatrix(ListLike2D):
 
-    def __init__(self, data, cols=None, fill=0, zero_based=False):
+    def __init__(self, data, cols=None, fill=0, zero_based=False, convert=True, recorder=None,
+                 backend=None):
         self.data = data
-        super().__init__(data, cols, fill)
-        self._allnumeric = all(isinstance(x, (int, float))
-                               for row in self.data for x in row)
-        self._longest = max(len(str(x)) for row in self.data for x in row)
+        super().__init__(data, cols, fill, convert)
+        self._allnumeric = self.is_flat or all(isinstance(x, (int, float, Frac))
+                                               for row in self.data for x in row)
         self._zero_based = zero_based
-        self._pivots = None
-        self._rref = None
+        # results derived from the data (RREF, LU, bases...) for one version
+        self._derived = {}
+        self._derived_version = self._version
+        # silent by default, pass a ListRecorder to collect a StepTrace
+        self.recorder = recorder if recorder is not None else StepRecorder()
+        # 'python', 'numpy' or None for the default (NumPy when importable)
+        self.backend = get_backend(backend)
+
+    def _invalidate(self):
+        """Mark the data as changed, derived results are recomputed on demand."""
+        self._touch()
+
+    def _cached(self, key, compute):
+        """
+            compute() once per data version. Every mutator bumps the
+            version, so a stale RREF or factorization is never returned.
+        """
+        if self._derived_version != self._version:
+            self._derived = {}
+            self._derived_version = self._version
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
+
+    @property
+    def _longest(self) -> int:
+        """Widest entry as text, only computed when asked for."""
+        return max(len(str(x)) for row in self.data for x in row)
+
+    # many small problems at once without a PyMatrix per problem, see lib/batch.py
+    batch_det = staticmethod(batch.batch_det)
+    batch_inverse = staticmethod(batch.batch_inverse)
+    batch_solve = staticmethod(batch.batch_solve)
+    batch_rref = staticmethod(batch.batch_rref)
+
+    def _vectorized(self):
+        """
+            The backend to route through, or None for the pure python
+            path. Only float data goes to the backend: int, Frac and
+            symbolic matrices and recorded (step-by-step) runs stay in
+            python, where they keep exact results.
+        """
+        if self.backend is None or self.recorder.enabled or not self._float_data():
+            return None
+        return self.backend
+
+    def _float_data(self) -> bool:
+        """Some float entry, and every int small enough to be an exact float64."""
+        if self.is_flat:
+            return self._flat.typecode == FLOAT_CODE
+        return self._cached('float_data', lambda: is_float_matrix(self.data))
+
+    @property
+    def array(self):
+        """Contiguous float64 copy of the data, cached until mutated."""
+        return self._cached('array', lambda: get_backend('numpy').asarray(
+            self._flat if self.is_flat else self.data))
+
+    def lu(self, tol=0) -> LUFactorization:
+        """
+            Pivoted LU factorization (P·A = L·U), cached until the
+            matrix is mutated so each solve only costs O(n^2).
+        """
+        return self._cached(('lu', tol), lambda: LUFactorization(self.data, tol))
+
+    def qr(self, tol=1e-12) -> QRFactorization:
+        """
+            Householder QR (A = Q·R, rows >= cols), cached until the
+            matrix is mutated. Reuse it for many right-hand sides.
+        """
+        return self._cached(('qr', tol), lambda: QRFactorization(self.data, tol))
+
+    def lstsq(self, b, tol=1e-12) -> list:
+        """
+            Least squares solution of an overdetermined A·x = b through
+            the cached QR, never the normal equations. The residual norm
+            is qr().residual_norm(b).
+        """
+        return self.qr(tol).solve(b)
+
+    def solver(self) -> StructuredSolver:
+        """
+            Structure probe (diagonal, triangular, banded, symmetric) and
+            the kernels it selects, run once per data version.
+        """
+        return self._cached('solver', lambda: StructuredSolver(self.data))
+
+    def structure(self):
+        return self.solver().structure
 
     def clone(self):
-        data = self.clone_data()
-        return PyMatrix(data)
+        data = self._flat.clone() if self.is_flat else self.clone_data()
+        return PyMatrix(data, backend=self._backend_name())
+
+    def fingerprint(self) -> tuple:
+        """Content key for the shared result cache, see lib/memo.py."""
+        return self._cached('fingerprint', lambda: (self._backend_name(),) + fingerprint(self.data))
+
+    def _copy(self):
+        # clone() would turn Frac entries into floats
+        data = self._flat.clone() if self.is_flat else self.clone_data()
+        return PyMatrix(data, convert=False, backend=self._backend_name())
+
+    _memo_copy = _copy
+
+    def _backend_name(self):
+        return 'python' if self.backend is None else self.backend.name
 
     @enforces_symbolic
     def REF(self, tol=1e-10):
+        """Row echelon form and pivot positions, the matrix is left untouched."""
+        backend = self._vectorized()
+        if backend is not None:
+            data, pivots = backend.ref(self.array, tol)
+            return PyMatrix(data, convert=False, backend=backend.name), pivots
 
         def zero_below(matrix, pivot_row: int, pivot_col: int) -> None:
             """Zero out all entries below the pivot in the same column."""
             pivot_val = matrix[pivot_row][pivot_col]
             for i in range(pivot_row + 1, len(matrix)):
                 factor = matrix[i][pivot_col] / pivot_val
+                if factor == 0:
+                    continue
+                if record:
+                    recorder.record("sub", i, pivot_row, factor)
                 matrix[i] = [a - factor * b for a,
                              b in zip(matrix[i], matrix[pivot_row])]
 
@@ -68,11 +201,16 @@ class PyMatrix(ListLike2D):
             factor = row[idx]
             return [e / factor for e in row]
 
+        recorder = self.recorder
+        record = recorder.enabled
+
         def swap_rows(matrix, idx1: int, idx2: int) -> None:
             """Swap the rows at the given indices in the matrix."""
+            if record and idx1 != idx2:
+                recorder.record("swap", idx1, idx2)
             matrix[idx1], matrix[idx2] = matrix[idx2], matrix[idx1]
 
-        data = self.data
+        data = self.clone_data()
         rows, cols = len(data), len(data[0])
         pivots = []
 
@@ -90,6 +228,8 @@ class PyMatrix(ListLike2D):
                 continue
 
             # Make the diagonal element 1
+            if record and data[row][col] != 1:
+                recorder.record("div", row, data[row][col])
             data[row] = normalize_row(data[row], col)
 
             pivots.append((row, col))
@@ -109,13 +249,57 @@ class PyMatrix(ListLike2D):
 
         return PyMatrix(data), pivots
 
-    def RREF(self, tol=1e-10):
+    def RREF(self, tol=1e-10, exact=None):
+        """
+            Reduced row echelon form and pivot positions.
+            exact=None picks the fraction-free Bareiss path for integer
+            matrices and RationalMatrix for int/Frac ones, exact=True
+            also reads floats as fractions, exact=False forces float
+            elimination.
+            The result is cached until the matrix is mutated, every call
+            returns its own copy.
+        """
+        return fresh_copy(self._rref(tol, exact))
+
+    def _rref(self, tol=1e-10, exact=None):
+        """The cached (matrix, pivots) itself, callers must not mutate it."""
+        if exact is None:
+            # one cache entry per elimination path: float data is the same
+            # RREF for exact=None and exact=False
+            exact = self._cached('rational', lambda: is_rational_matrix(self.data))
+        if self.recorder.enabled:
+            # a recorded run has to replay its steps every time
+            return self._compute_rref(tol, exact)
+        return self._cached(('rref', tol, exact), lambda: self._compute_rref(tol, exact))
+
+    @content_cached(records_steps=True)
+    def _compute_rref(self, tol, exact):
+        if exact is None:
+            exact = is_rational_matrix(self.data)
+        if exact:
+            if is_int_matrix(self.data):
+                data, pivots = rref_exact(self.data)
+            else:
+                reduced, pivots = RationalMatrix.from_rows(self.data).rref()
+                data = reduced.to_rows()
+            pivots = [Pivot(row, col) for row, col in pivots]
+            return PyMatrix(data, convert=False), pivots
+
+        backend = self._vectorized()
+        if backend is not None:
+            data, pivots = backend.rref(self.array, tol)
+            pivots = [Pivot(row, col) for row, col in pivots]
+            return PyMatrix(data, convert=False, backend=backend.name), pivots
 
         def zero_below(matrix, pivot_row: int, pivot_col: int) -> None:
             """Zero out all entries below the pivot in the same column."""
             pivot_val = matrix[pivot_row][pivot_col]
             for i in range(pivot_row + 1, len(matrix)):
                 factor = matrix[i][pivot_col] / pivot_val
+                if factor == 0:
+                    continue
+                if record:
+                    recorder.record("sub", i, pivot_row, factor)
                 matrix[i] = [a - factor * b for a,
                              b in zip(matrix[i], matrix[pivot_row])]
 
@@ -124,6 +308,10 @@ class PyMatrix(ListLike2D):
             pivot_val = matrix[pivot_row][pivot_col]
             for i in range(pivot_row):
                 factor = matrix[i][pivot_col] / pivot_val
+                if factor == 0:
+                    continue
+                if record:
+                    recorder.record("sub", i, pivot_row, factor)
                 matrix[i] = [a - factor * b for a,
                              b in zip(matrix[i], matrix[pivot_row])]
 
@@ -132,8 +320,13 @@ class PyMatrix(ListLike2D):
             factor = row[idx]
             return [e / factor for e in row]
 
+        recorder = self.recorder
+        record = recorder.enabled
+
         def swap_rows(matrix, idx1: int, idx2: int) -> None:
             """Swap the rows at the given indices in the matrix."""
+            if record and idx1 != idx2:
+                recorder.record("swap", idx1, idx2)
             matrix[idx1], matrix[idx2] = matrix[idx2], matrix[idx1]
 
         data = [row[:] for row in self.data]
@@ -154,6 +347,8 @@ class PyMatrix(ListLike2D):
                 continue
 
             # Make the diagonal element 1
+            if record and data[row][col] != 1:
+                recorder.record("div", row, data[row][col])
             data[row] = normalize_row(data[row], col)
 
             pivots.append(Pivot(row, col))
@@ -172,19 +367,17 @@ class PyMatrix(ListLike2D):
                 if abs(data[r][c]) < tol:
                     data[r][c] = 0.0
 
-        self._pivots = pivots
-        self._rref = PyMatrix(data)
-        return self._rref, self._pivots
+        return PyMatrix(data), pivots
 
 # region Arithmetic Dunder Methods
 
     def __mul__(self, other):
-        if isinstance(other, list):
+        if isinstance(other, PyMatrix):
+            B = other
+        elif isinstance(other, list):
             B = PyMatrix(other)
         elif hasattr(other, 'data') and isinstance(other.data, list):
             B = PyMatrix(other.data)
-        elif isinstance(other, PyMatrix):
-            B = other
         else:
             B = None
 
@@ -195,28 +388,70 @@ class PyMatrix(ListLike2D):
         else:
             raise TypeError("Unsupported type for multiplication")
 
-        # A = self.clone_data()
-        # B = other.clone_data()
-        # # Initialize the result matrix with zeros and an intermediate display matrix
-        #
-
     def __mul_matrix(self, other):
-        """Multiply this matrix by another matrix."""
+        """
+            Multiply this matrix by another matrix. Neither operand is
+            copied and the product is already numeric, so it skips the
+            per-cell conversion. Wide products use the blocked kernel.
+        """
         if self.dims.cols != other.dims.rows:
             raise ValueError("Matrices cannot be multiplied")
-        A = self.clone_data()
-        B = other.clone_data()
-
-        return PyMatrix([[sum(A[i][k] * B[k][j] for k in range(self.dims.cols)) for j in range(other.dims.cols)] for i in range(self.dims.rows)])
+        backend = self._vectorized()
+        if backend is not None and other._float_data():
+            return PyMatrix(backend.multiply(self.array, other.array),
+                            convert=False, backend=backend.name)
+        if other.dims.cols >= BLOCKED_MUL_COLS:
+            data = mat_mul_blocked(self.data, other.data)
+        else:
+            data = mat_mul(self.data, other.data)
+        return PyMatrix(data, convert=False)
 
     def __mul_scalar(self, other):
         """Multiply this matrix by a scalar."""
-        data = self.clone_data()
-        return PyMatrix([[other * elem for elem in row] for row in data])
+        if self.is_flat:
+            try:
+                return PyMatrix(self._flat * other, convert=False)
+            except OverflowError:
+                pass
+        return PyMatrix([[other * elem for elem in row] for row in self._peek_rows()],
+                        convert=False)
 
     def __rmul__(self, other):
         return self.__mul__(other)
 
+    def __pow__(self, power: int) -> PyMatrix:
+        """
+            Matrix power by repeated squaring, O(log p) multiplications
+            without recursion. Negative powers raise the cached inverse.
+            The result is always a new matrix, never self or the cache.
+        """
+        if self.dims.rows != self.dims.cols:
+            raise ValueError("Matrix must be square for matrix exponentiation.")
+
+        base = self
+        if power < 0:
+            base = self._cached('inverse', self._lu_inverse)
+            power = -power
+        shared = base
+
+        result = None
+        while power:
+            if power & 1:
+                result = base if result is None else result * base
+            power >>= 1
+            if power:
+                base = base * base
+        if result is None:
+            return PyMatrix.eye(self.dims.rows)
+        return result._copy() if result is shared else result
+
+    def _lu_inverse(self) -> PyMatrix:
+        lu = self.lu()
+        if lu.singular:
+            raise ValueError("Matrix is singular. Cannot compute negative power.")
+        return PyMatrix(lu.inverse())
+
+    @invalidates_cache
     def __imul__(self, other):
         result = self * other
         self.data = result.data
@@ -230,17 +465,34 @@ class PyMatrix(ListLike2D):
 
     #     return PyMatrix(C)
 
+    def _flat_combine(self, other, op):
+        """op on two flat buffers, None when either side is in row lists."""
+        if self.is_flat and getattr(other, 'is_flat', False):
+            try:
+                return PyMatrix(op(self._flat, other._flat), convert=False)
+            except OverflowError:
+                # int64 overflow, the row lists hold big ints
+                return None
+        return None
+
     def __add__(self, other):
-        A = self.clone_data()
-        B = other.clone_data()
+        flat = self._flat_combine(other, lambda a, b: a + b)
+        if flat is not None:
+            return flat
+        # the sums are new rows already, no need to copy the operands
+        A = self._peek_rows()
+        B = other._peek_rows()
         return PyMatrix([[a + b for a, b in zip(row1, row2)] for row1, row2 in zip(A, B)])
 
     def __radd__(self, other):
         return self.__add__(other)
 
     def __sub__(self, other):
-        A = self.clone_data()
-        B = other.clone_data()
+        flat = self._flat_combine(other, lambda a, b: a - b)
+        if flat is not None:
+            return flat
+        A = self._peek_rows()
+        B = other._peek_rows()
         return PyMatrix([[a - b for a, b in zip(row1, row2)] for row1, row2 in zip(A, B)])
 
     def __rsub__(self, other):
@@ -254,9 +506,7 @@ class PyMatrix(ListLike2D):
         Returns:
             list: _description_ pivot positions in the matrix columns
         """
-        if self._pivots is None:
-            self._pivots = self.RREF()[1]
-        return self._pivots
+        return list(self._rref()[1])
 
     def rank(self) -> int:
         """_summary_
@@ -265,7 +515,7 @@ class PyMatrix(ListLike2D):
         Returns:
             int: _description_ number of pivots in the matrix after RREF
         """
-        return len(self.pivots())
+        return len(self._rref()[1])
 
     def nullity(self, message=False) -> int:
         """
@@ -278,32 +528,42 @@ class PyMatrix(ListLike2D):
 
     # region Row Operations
 
+    @invalidates_cache
     @index_adjuster
+    @records_step("swap")
     def row_swap(self, i: int, j: int) -> PyMatrix:
         self.data[i], self.data[j] = self.data[j], self.data[i]
         return self
 
+    @invalidates_cache
     @index_adjuster
+    @records_step("multiply")
     def row_mul(self, i: int, val: (int, float)) -> PyMatrix:
         """ multiply row i by val """
         self.data[i] = [x * val for x in self.data[i]]
         return self
 
+    @invalidates_cache
     @index_adjuster
+    @records_step("div")
     def row_div(self, i: int, val: int | float) -> PyMatrix:
         """ divide row i by val """
         self.data[i] = [x / val for x in self.data[i]]
         return self
 
     @enforces_symbolic
+    @invalidates_cache
     @index_adjuster
+    @records_step("add")
     def row_add(self, i: int, j: int, factor: (int, float) = 1) -> PyMatrix:
         """ add row j to row i with factor """
         self.data[i] = [x + factor * y for x,
                         y in zip(self.data[i], self.data[j])]
         return self
 
+    @invalidates_cache
     @index_adjuster
+    @records_step("sub")
     def row_sub(self, i: int, j: int, factor: (int, float) = 1) -> PyMatrix:
         """ subtract row j from row i with factor """
         self.data[i] = [x - factor * y for x,
@@ -332,10 +592,10 @@ class PyMatrix(ListLike2D):
         return self.rank()
 
     def lin_indep_cols(self):
-        return [pivot.col for pivot in self.pivots()]
+        return list(self._cached('pivot_cols', lambda: [pivot.col for pivot in self._rref()[1]]))
 
     def lin_indep_rows(self):
-        return [pivot.row for pivot in self.pivots()]
+        return list(self._cached('pivot_rows', lambda: [pivot.row for pivot in self._rref()[1]]))
 
     def pivot_cols(self):
         return self.lin_indep_cols()
@@ -344,13 +604,17 @@ class PyMatrix(ListLike2D):
         return self.lin_indep_rows()
 
     def free_var_cols(self):
-        return [col for col in range(self.dims.cols) if col not in self.lin_indep_cols()]
+        def compute():
+            pivot_cols = set(self.lin_indep_cols())
+            return [col for col in range(self.dims.cols) if col not in pivot_cols]
+        return list(self._cached('free_cols', compute))
 
     def row_space_basis(self):
-        return PyMatrix([self.data[row] for row in self.lin_indep_rows()])
+        return self._cached('row_space', lambda: PyMatrix(
+            [self.data[row] for row in self.lin_indep_rows()]))._copy()
 
     def col_space_basis(self):
-        return self.get_cols(*self.lin_indep_cols())
+        return self._cached('col_space', lambda: self.get_cols(*self.lin_indep_cols()))._copy()
 
     def subspace_basis(self):
         return self.get_cols(*self.pivot_cols())
@@ -358,73 +622,68 @@ class PyMatrix(ListLike2D):
     def subspace_dimension(self):
         return self.rank()
 
-    def summary(self, rref=True, rank=True, nullity=True, spans=True, lin_indep=True, free_vars=True):
-        print(self.RREF()[0])
+    def analyze(self, tol=1e-10):
+        """
+            Rank, nullity, pivot/free columns and row, column and null
+            space bases from a single elimination, as an immutable
+            SubspaceReport. Cached until the matrix is mutated.
+        """
+        def compute():
+            rref, pivots = self._rref(tol)
+            return analyze_subspaces(self.data, rref.data, pivots, tol)
+        return self._cached(('analysis', tol), compute)
+
+    def summary(self, rref=True, rank=True, nullity=True, spans=True, lin_indep=True, free_vars=True,
+                tol=1e-10):
+        # everything below is read off the one elimination analyze() caches
+        report = self.analyze(tol)
+        print(self._rref(tol)[0])
         print("Write down the RREF of the matrix")
 
         input("Press any key to continue...")
 
-        print("rank: {}".format(self.rank()))
-        print("nullity: {}".format(self.nullity()))
-        print("Spans: R^{}".format(self.span()))
+        print("rank: {}".format(report.rank))
+        print("nullity: {}".format(report.nullity))
+        print("Spans: R^{}".format(report.rank))
 
         input("Press any key to continue...")
 
-        if self.rank() == self.dims.cols:
+        if report.independent:
             print("LI: Linearly Independent")
             print("Lin. Ind. Cols: {}".format(", ".join(str(col+1)
-                  for col in self.lin_indep_cols())))
+                  for col in report.pivot_cols)))
         else:
             print("LI: Linearly Dependent")
             print("Free Cols: {}".format(", ".join(str(col+1)
-                  for col in self.free_var_cols())))
-            print("Free Col Cnt: {}".format(len(self.free_var_cols())))
+                  for col in report.free_cols)))
+            print("Free Col Cnt: {}".format(len(report.free_cols)))
 
             input("Press any key to continue...\n")
 
-            non_trivial = self.non_trivial_solutions()
+            non_trivial = report.parametric()
             print(non_trivial)
             if '=s' in non_trivial and '=t' in non_trivial:
                 print("If you have S & T:\nset S = 1 and T = 0,\nthen S = 0 and T = 1")
             print("Lin. Ind. Cols: {}".format(", ".join(str(col+1)
-                  for col in self.lin_indep_cols())))
+                  for col in report.pivot_cols)))
+
+    def null_space(self, exact=None, tol=1e-10) -> list:
+        """
+            Basis of the null space, one vector per free column, read
+            straight off the cached RREF that RREF() and analyze() share.
+            Integer and Frac matrices give exact int/Frac entries
+            (exact=None), exact=False forces floats.
+        """
+        def compute():
+            if exact and not is_rational_matrix(self.data):
+                raise ValueError("exact=True needs an int or Frac matrix")
+            rref, pivots = self._rref(tol, None if exact else exact)
+            return null_space_basis(rref.data, pivots, self.dims.cols, tol)
+        return fresh_copy(self._cached(('null_space', exact, tol), compute))
 
     def non_trivial_solutions(self, tol=1e-10):
-        replacement_map = {
-            ' ': '',
-            'u': 's',
-            '+-': '-',
-        }
-
-        # Step 1: Identify the free variables and get the RREF matrix and its dimensions
-        rref, pivots = self.RREF()
-        rows, cols = rref.dims
-        pivot_cols = [col for row, col in pivots]
-        # Using characters 't', 'u', ...
-        free_vars = [chr(116 + i) for i in range(cols - len(pivot_cols))]
-
-        # Step 2: Create expressions for each row in the RREF matrix
-        relations = []
-        for row in range(rows):
-            relation = " + ".join(
-                "{}x{}".format(most_accurate(
-                    rref.data[row][col]), str(col + 1))
-                for col in range(cols) if abs(rref.data[row][col]) > tol
-            )
-            if relation:
-                relations.append("0 = " + relation)
-
-        # Step 3: Add expressions for the free variables
-        for i in range(cols):
-            if i not in pivot_cols:
-                relations.append("x{} = {}".format(
-                    str(i + 1), free_vars[i - len(pivot_cols)]))
-
-        # Combine the relations into a single string
-
-        solution_str = ", ".join(relations)
-        solution_str = map_replace(solution_str, **replacement_map)
-        return solution_str
+        """General solution of A·x = 0, e.g. "x1=-2t,x2=t", built on demand."""
+        return parametric_form(self.null_space(tol=tol), tol=tol)
 
     def get_cols(self, *cols):
         return PyMatrix(super().get_cols(*cols).data)
@@ -432,121 +691,87 @@ class PyMatrix(ListLike2D):
     def get_rows(self, *rows):
         return PyMatrix(super().get_rows(*rows).data)
 
-    def determinant(self):
-        matrix = self.clone_data()
-        n = len(matrix)
-
-        det = 1
-
-        for i in range(n):
-            max_el = abs(matrix[i][i])
-            max_row = i
-            for k in range(i + 1, n):
-                if abs(matrix[k][i]) > max_el:
-                    max_el = abs(matrix[k][i])
-                    max_row = k
-            matrix[i], matrix[max_row] = matrix[max_row], matrix[i]
-            det *= matrix[i][i]
-            for k in range(i + 1, n):
-                matrix[k][i] /= matrix[i][i]
-                for j in range(i + 1, n):
-                    matrix[k][j] -= matrix[k][i] * matrix[i][j]
-
-        return most_accurate(det)
-
-    def inverse(self):
-        n = self.dims.rows
-        matrix = self.clone_data()
-
-        # Augment the matrix with the identity matrix
-        for i in range(n):
-            matrix[i] += [0] * i + [1] + [0] * (n - i - 1)
-
-        # Apply Gauss-Jordan elimination
-        for i in range(n):
-            # Find the row with the maximum element in column i and swap with row i
-            max_row = max(range(i, n), key=lambda r: abs(matrix[r][i]))
-            matrix[i], matrix[max_row] = matrix[max_row], matrix[i]
-
-            # Make the diagonal element of the current row equal to 1
-            div = matrix[i][i]
-            matrix[i] = [x / div for x in matrix[i]]
-
-            # Make the elements above and below the diagonal element equal to 0
-            for j in range(n):
-                if j != i:
-                    ratio = matrix[j][i] / matrix[i][i]
-                    matrix[j] = [x - ratio * y for x,
-                                 y in zip(matrix[j], matrix[i])]
-            inverse_matrix = [row[n:] for row in matrix]
-        # print("Inverse matrix:")
-        # for row in inverse_matrix:
-        #     print(row)
-
-        return apply_percise_numbers(inverse_matrix)
-
-    def inverse_back(self):
-        n = self.dims.rows
-        matrix = self.clone_data()
-
-        # Augment the matrix with the identity matrix
-        for i in range(n):
-            matrix[i] += [0] * i + [1] + [0] * (n - i - 1)
-
-        # Apply Gauss-Jordan elimination
-        # Forward elimination
-        for i in range(n):
-            max_row = max(range(i, n), key=lambda r: abs(matrix[r][i]))
-            matrix[i], matrix[max_row] = matrix[max_row], matrix[i]
-
-            for j in range(i + 1, n):
-                ratio = matrix[j][i] / matrix[i][i]
-                for k in range(2 * n):
-                    matrix[j][k] -= ratio * matrix[i][k]
-
-        # Back substitution
-        for i in range(n-1, -1, -1):
-            for j in range(i-1, -1, -1):
-                ratio = matrix[j][i] / matrix[i][i]
-                for k in range(2 * n):
-                    matrix[j][k] -= ratio * matrix[i][k]
-
-            # Divide the row by the pivot element
-            div = matrix[i][i]
-            for k in range(2 * n):
-                matrix[i][k] /= div
-
-        # Extract the inverse matrix and apply precision numbers
-        return apply_percise_numbers([row[n:] for row in matrix])
-
-    def inverse2(self):
-        n = self.dims.rows
-        matrix = self.clone_data()
-
-        # Augment the matrix with the identity matrix
-        for i in range(n):
-            matrix[i] += [0] * i + [1] + [0] * (n - i - 1)
-
-        # Apply Gauss-Jordan elimination
-        for i in range(n):
-            max_row = max(range(i, n), key=lambda r: abs(matrix[r][i]))
-            matrix[i], matrix[max_row] = matrix[max_row], matrix[i]
-            for j in range(i + 1, n):
-                ratio = matrix[j][i] / matrix[i][i]
-                for k in range(i, 2 * n):
-                    matrix[j][k] -= ratio * matrix[i][k]
-            for j in range(n):
-                if j != i:
-                    ratio = matrix[j][i] / matrix[i][i]
-                    for k in range(2 * n):
-                        matrix[j][k] -= ratio * matrix[i][k]
-            div = matrix[i][i]
-            for k in range(2 * n):
-                matrix[i][k] /= div
-
-        # Extract the inverse matrix
-        # return PyMatrix([row[n:] for row in matrix])
-        return apply_percise_numbers([row[n:] for row in matrix])
+    @content_cached
+    def determinant(self, tol=0, exact=None):
+        """
+            Determinant by elimination. Triangular matrices only multiply
+            the diagonal, integer matrices use the exact Bareiss path and
+            banded or SPD matrices their structured kernels, anything else
+            is pivoted Gaussian elimination. Matrices with Frac entries
+            (or any rational matrix with exact=True) give an exact int/Frac
+            through RationalMatrix.
+        """
+        if self.dims.rows != self.dims.cols:
+            raise ValueError("The matrix must be square.")
+        if exact is None:
+            exact = not is_int_matrix(self.data) and is_rational_matrix(self.data)
+        if exact:
+            return RationalMatrix.from_rows(self.data).det()
+        if not self._allnumeric:
+            return most_accurate(det_pivoted(self.data, tol))
+        solver = self.solver()
+        if solver.structure.triangular or is_int_matrix(self.data):
+            return solver.det(tol)
+        backend = self._vectorized()
+        if backend is not None and not solver.specialized:
+            return most_accurate(backend.determinant(self.array, tol))
+        return most_accurate(solver.det(tol))
+
+    def solve(self, b, tol=0) -> list:
+        """
+            x with A·x = b as a list, through the structured solver so a
+            triangular system is one substitution and a tridiagonal one
+            O(n). Raises ValueError for a singular matrix.
+        """
+        if self.dims.rows != self.dims.cols:
+            raise ValueError("The matrix must be square.")
+        return self.solver().solve(b, tol)
+
+    @content_cached
+    def inverse(self, tol=1e-12, pretty=True, exact=False):
+        """
+            Inverse as a list of rows. Diagonal, triangular and SPD
+            matrices use their structured kernels, anything else a single
+            in-place Gauss-Jordan pass (or the NumPy backend). Raises ValueError for a singular
+            matrix. pretty=True turns the entries into their most
+            readable Frac form, pass False to skip that per-entry cost.
+            exact=True inverts an int/Frac matrix exactly through
+            RationalMatrix, its entries are already ints and Frac.
+        """
+        if exact:
+            if self.dims.rows != self.dims.cols:
+                raise ValueError("The matrix must be square.")
+            return RationalMatrix.from_rows(self.data).inverse().to_rows()
+        backend = self._vectorized()
+        solver = self.solver() if self._allnumeric else None
+        if solver is not None and solver.specialized:
+            inverse = solver.inverse(tol)
+        elif backend is not None:
+            inverse = backend.inverse(self.array)
+        else:
+            inverse = gauss_jordan_inverse(self.data, tol)
+        return apply_percise_numbers(inverse) if pretty else inverse
+
+    # earlier variants, kept as names for existing callers
+    inverse_back = inverse
+    inverse2 = inverse
+
+    def eig(self, tol=1e-12):
+        """
+            (eigenvalues, eigenvectors) of a numeric square matrix, see
+            lib/eigen.py. Values are sorted by decreasing magnitude and
+            each vector is a unit length list. Cached until mutated.
+        """
+        if self.dims.rows != self.dims.cols:
+            raise ValueError("The matrix must be square.")
+        return fresh_copy(self._cached(('eig', tol), lambda: self._compute_eig(tol)))
+
+    @content_cached
+    def _compute_eig(self, tol):
+        return local_eig(self.data, tol)
+
+    def eigenvalues(self, tol=1e-12) -> list:
+        return self.eig(tol)[0]
 
     def __repr__(self):
         return self.__str__()
@@ -584,3 +809,156 @@ if __name__ == '__main__':
     assert (mat_numeric1 - mat_numeric2 == mat_numeric1 - mat_numeric1)
     assert (mat_numeric1 * mat_numeric2 == mat_numeric1 * mat_numeric1)
     assert (mat_numeric1 * 2 == mat_numeric1 + mat_numeric1)
+
+    # derived results are cached per version and dropped by every mutator
+    mat = PyMatrix([[1, 2], [2, 4]])
+    assert mat._rref() is mat._rref() and mat.rank() == 1
+    assert mat.free_var_cols() == [1]
+    mat.row_add(2, 1)
+    assert mat._rref() is mat._rref() and mat.rank() == 1
+    mat[1, 1] = 5
+    assert mat.rank() == 2 and mat.free_var_cols() == []
+    # cached results are handed out as copies
+    B = PyMatrix([[1, 2, 3], [2, 4, 7]])
+    B.pivots().pop()
+    B.free_var_cols().append(0)
+    B.RREF()[0].data[0][0] = 99
+    B.null_space()[0][0] = 99
+    assert len(B.pivots()) == 2 and B.free_var_cols() == [1]
+    assert B.RREF()[0].data[0][0] == 1 and B.null_space() == [[-2, 1, 0]]
+    version = mat.version
+    mat.REF()
+    assert mat.version == version and mat.data == [[1, 2], [3, 5]]
+
+    # one pass analysis, the null space really solves A·x = 0
+    report = PyMatrix([[1, 2, 3], [2, 4, 6], [1, 0, 1]]).analyze()
+    assert (report.rank, report.nullity, report.free_cols) == (2, 1, (2,))
+    assert report.null_space == ((-1, -1, 1),)
+    assert report.row_space == ((1, 0, 1), (0, 1, 1))
+    dense = PyMatrix([[0.5, 1.5, 2.5, 1.5], [1.5, 0.5, 0.5, 2.5]])
+    for vector in dense.analyze().null_space:
+        assert all(abs(sum(a * x for a, x in zip(row, vector))) < 1e-9 for row in dense.data)
+
+    # exact null space, also for Frac entries, and its parametric view
+    half = PyMatrix([[Frac(1, 2), 1, 0], [1, 2, 0]], convert=False)
+    assert half.null_space() == [[-2, 1, 0], [0, 0, 1]]
+    assert half.non_trivial_solutions() == "x1=-2t,x2=t,x3=s"
+    # the null space is read off the RREF the other queries already cached
+    from memo import clear_results
+    calls = []
+    compute_rref, exact_rref = PyMatrix._compute_rref, rref_exact
+
+    def counted(self, tol, exact):
+        calls.append('compute_rref')
+        return compute_rref(self, tol, exact)
+
+    def counted_exact(rows):
+        calls.append('rref_exact')
+        return exact_rref(rows)
+    PyMatrix._compute_rref, rref_exact = counted, counted_exact
+    for rows in ([[1, 2, 3], [2, 4, 7]], [[0.5, 1.5, 2.5], [1.5, 0.5, 0.75]]):
+        clear_results()
+        shared = PyMatrix(rows)
+        shared.RREF(), shared.analyze(), shared.null_space()
+        if isinstance(rows[0][0], float):
+            shared.null_space(exact=False)
+        assert shared.non_trivial_solutions() and len(calls) == len(set(calls)), calls
+        del calls[:]
+    # summary() prints everything from a single elimination
+    import builtins
+    import io
+    from contextlib import redirect_stdout
+    prompt, builtins.input = builtins.input, lambda *args: ''
+    for rows in ([[1, 2, 3], [2, 4, 6]], [[0.5, 1.5, 2.5], [1.0, 3.0, 5.0]]):
+        clear_results()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            PyMatrix(rows).summary()
+        assert calls.count('compute_rref') == 1 and len(calls) == len(set(calls)), calls
+        assert "x2=t,x3=s" in output.getvalue()
+        del calls[:]
+    builtins.input = prompt
+    PyMatrix._compute_rref, rref_exact = compute_rref, exact_rref
+    try:
+        PyMatrix([[0.5, 1.0]]).null_space(exact=True)
+        assert False
+    except ValueError:
+        pass
+    wide = PyMatrix([[1] * 200])
+    assert len(wide.null_space()) == 199 and "x200=t199" in wide.non_trivial_solutions()
+
+    # structure probe, cached and dropped with the other derived results
+    tri = PyMatrix([[2, 1, 0], [1, 2, 1], [0, 1, 2]])
+    assert tri.solver() is tri.solver() and tri.solver().method == 'tridiagonal'
+    assert all(abs(x - y) < 1e-12 for x, y in zip(tri.solve([1, 0, 1]), [1, -1, 1]))
+    assert tri.determinant() == 4
+    assert [round(x, 12) for x in PyMatrix([[1e-20, 1], [1, 1]]).solve([1, 2])] == [1, 1]
+    upper = PyMatrix([[2.5, 1.0, 3.0], [0.0, 0.5, 1.0], [0.0, 0.0, 4.0]])
+    assert upper.solver().method == 'upper' and upper.determinant() == 5
+    upper[2, 0] = 1.0
+    assert upper.solver().method == 'lu'
+
+    # least squares fit of y = c0 + c1·x, one QR for both right-hand sides
+    fit = PyMatrix([[1, 1], [1, 2], [1, 3], [1, 4]])
+    assert all(abs(c - e) < 1e-12 for c, e in zip(fit.lstsq([6, 5, 7, 10]), [3.5, 1.4]))
+    assert fit.qr() is fit.qr() and abs(fit.qr().residual_norm([1, 2, 3, 4])) < 1e-12
+
+    values, vectors = PyMatrix([[2, 1], [1, 2]]).eig()
+    assert [round(v, 9) for v in values] == [3, 1]
+
+    # exact rational paths, rows of ints over one denominator each
+    thirds = PyMatrix([[Frac(1, 3), 1, 2], [Frac(1, 2), Frac(2, 3), 1], [1, 0, Frac(1, 4)]],
+                      convert=False)
+    rref, pivots = thirds.RREF()
+    assert rref.data == [[1, 0, 0], [0, 1, 0], [0, 0, 1]] and len(pivots) == 3
+    det = thirds.determinant()
+    assert det == Frac(-29, 72) and isinstance(det, Frac)
+    inverse = thirds.inverse(exact=True)
+    assert all(sum(thirds.data[i][k] * inverse[k][j] for k in range(3)) == (i == j)
+               for i in range(3) for j in range(3))
+    assert PyMatrix([[2, 1], [1, 1]]).inverse(exact=True) == [[1, -1], [-1, 2]]
+    assert PyMatrix([[0.5, 1.0], [1.5, 2.0]]).determinant(exact=True) == Frac(-1, 2)
+    assert PyMatrix([[0.5, 1.0], [1.0, 2.0]]).RREF(exact=True)[0].data == [[1, 2], [0, 0]]
+
+    # powers hand out new matrices, editing one leaves the cache intact
+    square = PyMatrix([[2, 1], [1, 1]])
+    assert square ** 1 is not square and (square ** 1).data == square.data
+    first = square ** -1
+    first[0, 0] = 99
+    assert (square ** -1).data == [[1, -1], [-1, 2]]
+    assert (square ** -2).data == [[2, -3], [-3, 5]]
+
+    # equal matrices share results through the content-addressed cache
+    from memo import result_cache
+    first = PyMatrix([[4, 7], [2, 6]]).inverse(exact=True)
+    first[0][0] = 'mutated'
+    hits = result_cache().hit
+    again = PyMatrix([[4, 7], [2, 6]])
+    assert again.inverse(exact=True) == [[Frac(3, 5), Frac(-7, 10)], [Frac(-1, 5), Frac(2, 5)]]
+    assert result_cache().hit == hits + 1
+    assert again.RREF()[0] is not PyMatrix([[4, 7], [2, 6]]).RREF()[0]
+    again[0, 0] = 5
+    assert again.determinant() == 16 and result_cache().hit == hits + 2
+
+    # flat storage: one buffer until a row-list kernel reads .data
+    rows = [[float(i * 3 + j) for j in range(3)] for i in range(3)]
+    flat = PyMatrix(FlatMatrix.from_rows(rows))
+    assert flat.is_flat and flat.dims == (3, 3) and flat[1, 2] == 5.0 and flat == rows
+    copy = flat.clone()
+    copy[0, 0] = 9.0
+    assert copy.is_flat and copy[0, 0] == 9.0 and flat[0, 0] == 0.0
+    flat.row_view(2)[0] = 60.0
+    assert flat[2, 0] == 60.0 and flat.is_flat
+    doubled = [[2 * x for x in row] for row in flat._peek_rows()]
+    assert (flat + flat).is_flat and (flat + flat) == doubled and (flat * 2) == doubled
+    assert (flat - flat).is_flat and (flat * 2).is_flat and flat._copy().is_flat
+    if flat.backend is not None:
+        assert (flat * flat) == PyMatrix(flat.clone_data()) * PyMatrix(flat.clone_data())
+        assert flat.is_flat
+    flat[0, 0] = Frac(1, 2)
+    assert not flat.is_flat and flat[0, 0] == Frac(1, 2)
+    ints = PyMatrix([[1, 2], [3, 4]]).compact()
+    assert ints.is_flat and ints + ints == [[2, 4], [6, 8]] and str(ints) == str(PyMatrix([[1, 2], [3, 4]]))
+    assert ints.rank() == 2 and not ints.is_flat
+    big = PyMatrix([[2 ** 62, 1]]).compact()
+    assert (big + big)[0, 0] == 2 ** 63 and not (big + big).is_flat
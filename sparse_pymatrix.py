@@ -0,0 +1,308 @@
+import sys
+
+if sys.platform == 'win32':
+    sys.path.extend(['../lib/', './lib/', '../', '.'])
+
+from listlike2d import Dimensions
+from pymatrix import PyMatrix, Pivot, index_adjuster, invalidates_cache
+from step_recorder import StepRecorder, records_step
+
+
+class SparsePyMatrix:
+    """
+        Dictionary-of-keys matrix for systems that are mostly zeros.
+        Each row is a {col: value} dict holding only the nonzeros, and
+        the row operations and elimination only ever touch those.
+
+        The row operation API matches PyMatrix (1-based rows unless
+        zero_based=True), so code written against PyMatrix runs as is.
+
+        Usage:
+            A = SparsePyMatrix.from_dense([[2, 0, 0], [0, 0, 3], [1, 0, 0]])
+            rref, pivots = A.RREF()
+            A.rank(), A.nullity()
+    """
+
+    def __init__(self, rows: int, cols: int, entries=None, zero_based=False, recorder=None):
+        self.rows = [{} for _ in range(rows)]
+        if entries:
+            for (i, j), value in entries.items():
+                if value != 0:
+                    self.rows[i][j] = value
+        self._dims = Dimensions(rows, cols)
+        self._zero_based = zero_based
+        self._pivots = None
+        self._rref = None
+        self.recorder = recorder if recorder is not None else StepRecorder()
+
+    @classmethod
+    def from_dense(cls, data, zero_based=False, recorder=None) -> 'SparsePyMatrix':
+        if hasattr(data, 'data'):
+            data = data.data
+        matrix = cls(len(data), len(data[0]), zero_based=zero_based, recorder=recorder)
+        for row, dense in zip(matrix.rows, data):
+            for j, value in enumerate(dense):
+                if value != 0:
+                    row[j] = value
+        return matrix
+
+    def to_dense(self) -> list:
+        cols = self._dims.cols
+        dense = []
+        for row in self.rows:
+            values = [0] * cols
+            for j, value in row.items():
+                values[j] = value
+            dense.append(values)
+        return dense
+
+    def to_pymatrix(self) -> PyMatrix:
+        return PyMatrix(self.to_dense(), convert=False, zero_based=self._zero_based)
+
+    def clone(self) -> 'SparsePyMatrix':
+        matrix = SparsePyMatrix(*self._dims, zero_based=self._zero_based)
+        matrix.rows = [dict(row) for row in self.rows]
+        return matrix
+
+    def _invalidate(self):
+        self._pivots = None
+        self._rref = None
+
+    @property
+    def dims(self) -> Dimensions:
+        return self._dims
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored nonzeros."""
+        return sum(len(row) for row in self.rows)
+
+    @property
+    def density(self) -> float:
+        return self.nnz / float(self._dims.rows * self._dims.cols)
+
+    def __getitem__(self, indices):
+        if isinstance(indices, tuple):
+            return self.rows[indices[0]].get(indices[1], 0)
+        return [self.rows[indices].get(j, 0) for j in range(self._dims.cols)]
+
+    @invalidates_cache
+    def __setitem__(self, indices, value):
+        i, j = indices
+        if value == 0:
+            self.rows[i].pop(j, None)
+        else:
+            self.rows[i][j] = value
+
+    def __eq__(self, other):
+        if isinstance(other, SparsePyMatrix):
+            return self._dims == other._dims and self.rows == other.rows
+        if hasattr(other, 'data'):
+            other = other.data
+        return self.to_dense() == other
+
+    def __str__(self):
+        return str(self.to_pymatrix())
+
+    def __repr__(self):
+        return "<SparsePyMatrix {}x{} nnz={}>".format(self._dims.rows, self._dims.cols, self.nnz)
+
+    # region Row Operations
+
+    @invalidates_cache
+    @index_adjuster
+    @records_step("swap")
+    def row_swap(self, i: int, j: int) -> 'SparsePyMatrix':
+        self.rows[i], self.rows[j] = self.rows[j], self.rows[i]
+        return self
+
+    @invalidates_cache
+    @index_adjuster
+    @records_step("multiply")
+    def row_mul(self, i: int, val) -> 'SparsePyMatrix':
+        """ multiply row i by val """
+        if val == 0:
+            self.rows[i] = {}
+        else:
+            row = self.rows[i]
+            for j in row:
+                row[j] *= val
+        return self
+
+    @invalidates_cache
+    @index_adjuster
+    @records_step("div")
+    def row_div(self, i: int, val) -> 'SparsePyMatrix':
+        """ divide row i by val """
+        row = self.rows[i]
+        for j in row:
+            row[j] /= val
+        return self
+
+    @invalidates_cache
+    @index_adjuster
+    @records_step("add")
+    def row_add(self, i: int, j: int, factor=1) -> 'SparsePyMatrix':
+        """ add row j to row i with factor """
+        _axpy(self.rows[i], self.rows[j], factor)
+        return self
+
+    @invalidates_cache
+    @index_adjuster
+    @records_step("sub")
+    def row_sub(self, i: int, j: int, factor=1) -> 'SparsePyMatrix':
+        """ subtract row j from row i with factor """
+        _axpy(self.rows[i], self.rows[j], -factor)
+        return self
+
+    # endregion Row Operations
+
+    def RREF(self, tol=1e-10):
+        """
+            Reduced row echelon form and pivot positions, with the same
+            partial pivoting as PyMatrix.RREF. A column -> rows index
+            finds the rows to clear without scanning every row, and rows
+            above the pivots are cleared bottom-up after the forward pass.
+        """
+        recorder = self.recorder
+        record = recorder.enabled
+        rows = [dict(row) for row in self.rows]
+        m, n = self._dims
+
+        # column -> set of rows holding a nonzero in it
+        where = {}
+        for i, row in enumerate(rows):
+            for j in row:
+                where.setdefault(j, set()).add(i)
+
+        def swap(a, b):
+            for j in rows[a]:
+                where[j].discard(a)
+            for j in rows[b]:
+                where[j].discard(b)
+            rows[a], rows[b] = rows[b], rows[a]
+            for j in rows[a]:
+                where[j].add(a)
+            for j in rows[b]:
+                where[j].add(b)
+
+        def eliminate(r, c, targets):
+            """Subtract pivot row r from every target row to clear column c."""
+            pivot_row = rows[r]
+            for i in sorted(targets):
+                row = rows[i]
+                factor = row[c]
+                if record:
+                    recorder.record("sub", i, r, factor)
+                for j, value in pivot_row.items():
+                    new = row.get(j, 0) - factor * value
+                    if abs(new) < tol:
+                        if j in row:
+                            del row[j]
+                            where[j].discard(i)
+                    else:
+                        if j not in row:
+                            where.setdefault(j, set()).add(i)
+                        row[j] = new
+
+        pivots = []
+        r = 0
+        for c in range(n):
+            if r >= m:
+                break
+            candidates = [i for i in where.get(c, ()) if i >= r]
+            if not candidates:
+                continue
+            p = max(candidates, key=lambda i: (abs(rows[i][c]), -i))
+            if abs(rows[p][c]) < tol:
+                continue
+            if p != r:
+                if record:
+                    recorder.record("swap", r, p)
+                swap(r, p)
+
+            pivot_row = rows[r]
+            pivot_val = pivot_row[c]
+            if pivot_val != 1:
+                if record:
+                    recorder.record("div", r, pivot_val)
+                for j in pivot_row:
+                    pivot_row[j] /= pivot_val
+            pivots.append(Pivot(r, c))
+            eliminate(r, c, [i for i in where[c] if i > r])
+            r += 1
+
+        # clear above the pivots from the last one up, each pivot row is
+        # already reduced by then so no fill-in spreads upwards
+        for r, c in reversed(pivots):
+            eliminate(r, c, [i for i in where[c] if i < r])
+
+        rref = SparsePyMatrix(m, n, zero_based=self._zero_based)
+        rref.rows = rows
+        self._pivots = pivots
+        self._rref = rref
+        return self._rref, self._pivots
+
+    def pivots(self) -> list:
+        if self._pivots is None:
+            self.RREF()
+        return list(self._pivots)
+
+    def rank(self) -> int:
+        return len(self.pivots())
+
+    def nullity(self, message=False) -> int:
+        if message:
+            print("nullity = columns - rank")
+        return self._dims.cols - self.rank()
+
+    def pivot_cols(self) -> list:
+        return [pivot.col for pivot in self.pivots()]
+
+    def free_var_cols(self) -> list:
+        pivot_cols = set(self.pivot_cols())
+        return [col for col in range(self._dims.cols) if col not in pivot_cols]
+
+
+def _axpy(target: dict, source: dict, factor) -> None:
+    """target += factor * source, touching only the nonzeros of source."""
+    if factor == 0:
+        return
+    for j, value in source.items():
+        new = target.get(j, 0) + factor * value
+        if new == 0:
+            target.pop(j, None)
+        else:
+            target[j] = new
+
+
+if __name__ == '__main__':
+    import random
+
+    dense = [[2, 0, 0, 1], [0, 0, 3, 0], [1, 0, 0, 0]]
+    A = SparsePyMatrix.from_dense(dense)
+    assert A.nnz == 4 and A.to_dense() == dense
+    assert A[1, 2] == 3 and A[1] == [0, 0, 3, 0]
+
+    A.row_swap(1, 3)
+    assert A.to_dense() == [[1, 0, 0, 0], [0, 0, 3, 0], [2, 0, 0, 1]]
+    A.row_sub(3, 1, 2)
+    assert A.rows[2] == {3: 1}
+    A.row_add(3, 1)
+    assert A.rows[2] == {0: 1, 3: 1}
+
+    # same pivots, rank and RREF as the dense PyMatrix
+    random.seed(3)
+    for _ in range(100):
+        m, n = random.randint(1, 7), random.randint(1, 7)
+        rows = [[random.choice([0, 0, 0, random.uniform(-4, 4)]) for _ in range(n)]
+                for _ in range(m)]
+        if m > 1 and random.random() < 0.3:
+            rows[-1] = [2 * x for x in rows[0]]
+        sparse = SparsePyMatrix.from_dense(rows)
+        reduced, pivots = sparse.RREF()
+        expected, expected_pivots = PyMatrix([r[:] for r in rows], backend='python').RREF(exact=False)
+        assert pivots == expected_pivots
+        assert all(abs(x - y) < 1e-8 for r1, r2 in zip(reduced.to_dense(), expected.data)
+                   for x, y in zip(r1, r2))
+        assert sparse.nullity() == n - len(expected_pivots)
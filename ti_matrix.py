@@ -12,6 +12,8 @@ from wrappers import extends_method_names
 from polyfill import is_numeric
 from ti_interop import tiexec
 from matrix_tools import is_matrix, is_column_vector, is_row_vector, get_matrix_dimensions, get_symbolic_indices
+from eigen import eig as local_eig
+from memo import content_cached
 
 if sys.platform == 'TI-Nspire':
     from wrappers import ensure_single_or_paired_type
@@ -72,6 +74,10 @@ class TiMatrix(TiCollections):
             print(
                 "TypeError: unsupported operand type(s) for *: '{}' and '{}'".format(type(self), type(other)))
 
+    def _memo_copy(self) -> 'TiMatrix':
+        # cached results are handed out as copies, see lib/memo.py
+        return TiMatrix(self.ti_matrix)
+
     def __PyMatrix__(self):
         return self.py_matrix
 
@@ -226,6 +232,7 @@ class TiMatrix(TiCollections):
         """
         return TiMatrix(tiexec("comDenom", self.ti_matrix))
 
+    @content_cached
     def eig_vc(self) -> 'TiMatrix':
         """
             eigVc(squareMatrix) ⇒ matrix
@@ -240,8 +247,28 @@ class TiMatrix(TiCollections):
             then x_1^2 + x_2^2 + … + x_n^2 = 1
         """
         # return TiMatrix(call_func("abs", self.ti_matrix))
+        local = self._local_eig()
+        if local is not None:
+            values, vectors = local
+            return TiMatrix([[vector[i] for vector in vectors] for i in range(self.rows)])
         return TiMatrix(tiexec("eigVc", self.ti_matrix))
 
+    def _local_eig(self):
+        """
+            (eigenvalues, eigenvectors) from the pure python solver for a
+            real numeric matrix, None when the CAS has to answer
+            (symbolic entries, complex eigenvalues, no convergence).
+        """
+        if not self.square or not self.is_numeric:
+            return None
+        try:
+            values, vectors = local_eig([[float(x) for x in row] for row in self.data])
+        except (ValueError, ArithmeticError, ZeroDivisionError):
+            return None
+        if any(isinstance(v, complex) for v in values):
+            return None
+        return values, vectors
+
     def min(self, matrix: ('TiMatrix', list) = None) -> 'TiMatrix':
         """
             With no parameters, returns a row vector containing
@@ -296,6 +323,7 @@ class TiMatrix(TiCollections):
 
     # check
 
+    @content_cached
     def eig_vl(self) -> 'TiMatrix':
         """
             eigVc(squareMatrix) ⇒ matrix
@@ -309,11 +337,15 @@ class TiMatrix(TiCollections):
             if V = [x_1, x_2, … , x_n]
             then x_1^2 + x_2^2 + … + x_n^2 = 1
         """
+        local = self._local_eig()
+        if local is not None:
+            return TiMatrix([local[0]])
         return TiMatrix(tiexec("eigVl", self.ti_matrix))
 
     def floor(self) -> 'TiMatrix':
         return TiMatrix(tiexec("floor", self.ti_matrix))
 
+    @content_cached
     def det(self, tol=None) -> TiExpression:
         if tol is not None:
             return TiExpression(tiexec("det", self.ti_matrix + "," + str(tol)))
@@ -438,6 +470,7 @@ class TiMatrix(TiCollections):
     def ref(self):
         return TiMatrix(tiexec("ref", self.ti_matrix))
 
+    @content_cached
     def rref(self, tol=None) -> 'TiMatrix':
         if tol is not None:
             return TiMatrix(tiexec("rref", self.ti_matrix + "," + str(tol)))
@@ -469,6 +502,7 @@ class TiMatrix(TiCollections):
     def transpose(self) -> 'TiMatrix':
         return TiMatrix(tiexec("{}@t".format(self.ti_matrix)))
 
+    @content_cached
     def inverse(self) -> 'TiMatrix':
         return TiMatrix(tiexec("({}^-1)".format(self.ti_matrix)))
 
@@ -509,11 +543,8 @@ class TiMatrix(TiCollections):
     def nullity(self) -> int:
         return self.cols - self.rank()
 
-    def is_numeric(self):
-        return all(isinstance(col, (int, float)) for row in self.data for col in row)
-
     def is_symbolic(self):
-        return not self.is_numeric()
+        return not self.is_numeric
 
     def __repr__(self):
         return mat_repr(self.data)
@@ -529,7 +560,7 @@ class TiMatrix(TiCollections):
         py_mat = [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
         py_mat2 = [[1, 0, 0], [0, 1, 0], [0, 0, 0]]
         ti_mat = TiMatrix(py_mat)
-        assert ti_mat.is_numeric
+        assert ti_mat.is_numeric and not ti_mat.is_symbolic()
         assert ti_mat.cols == 3
         assert ti_mat.rows == 3
         assert ti_mat.square == True
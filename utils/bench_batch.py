@@ -0,0 +1,54 @@
+"""
+Many tiny systems: one PyMatrix per problem against the batch kernels
+in lib/batch.py, which never build a matrix object.
+"""
+import random
+
+import bench_tools
+from bench_tools import best_of, report
+from pymatrix import PyMatrix
+
+
+def per_object(batch, vectors):
+    dets, inverses, solutions = [], [], []
+    for rows, v in zip(batch, vectors):
+        m = PyMatrix([row[:] for row in rows], backend='python')
+        dets.append(m.determinant())
+        inverses.append(m.inverse(pretty=False))
+        solutions.append(m.lu().solve(v))
+    return dets, inverses, solutions
+
+
+def batched(batch, vectors):
+    return (PyMatrix.batch_det(batch), PyMatrix.batch_inverse(batch),
+            PyMatrix.batch_solve(batch, vectors))
+
+
+def main():
+    random.seed(0)
+    results = []
+    count = 20000
+    for n in (2, 3, 4):
+        batch = []
+        while len(batch) < count:
+            rows = [[random.randint(-9, 9) for _ in range(n)] for _ in range(n)]
+            if PyMatrix.batch_det([rows])[0]:
+                batch.append(rows)
+        vectors = [[random.randint(-9, 9) for _ in range(n)] for _ in batch]
+        t_objects = best_of(per_object, batch, vectors, repeat=1)
+        t_batch = best_of(batched, batch, vectors, repeat=3)
+        results.append(("{}x{}".format(n, n), count, t_objects, t_batch,
+                        "{:.1f}x".format(t_objects / t_batch)))
+
+        dets, _, solutions = per_object(batch[:100], vectors[:100])
+        b_dets, _, b_solutions = batched(batch[:100], vectors[:100])
+        assert dets == b_dets
+        assert all(abs(x - y) < 1e-9 for s1, s2 in zip(solutions, b_solutions)
+                   for x, y in zip(s1, s2))
+
+    report("det + inverse + solve per batch (seconds)",
+           ("shape", "count", "PyMatrix", "batch", "speedup"), results)
+
+
+if __name__ == '__main__':
+    main()
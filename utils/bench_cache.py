@@ -0,0 +1,74 @@
+"""
+One million cache operations (a lookup, and an insert on every miss) over
+skewed keys: the previous list ordered Cache, whose evictions pop(0), against
+the OrderedDict LRU/LFU Cache, with the hit ratio each policy reaches.
+"""
+import random
+
+import bench_tools
+from bench_tools import best_of, report
+from cachable import Cache, LFU, LRU
+
+
+class PreviousCache:
+    """The old storage: a dict plus an insertion order list."""
+
+    def __init__(self, max_size):
+        self.max = max_size
+        self.cache = {}
+        self.order = []
+
+    def add(self, key, value):
+        if key in self.cache:
+            return
+        if len(self.cache) >= self.max:
+            del self.cache[self.order.pop(0)]
+        self.cache[key] = value
+        self.order.append(key)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+
+def run(cache, keys):
+    get, add = cache.get, cache.add
+    for key in keys:
+        if get(key) is None:
+            add(key, key)
+    return cache
+
+
+def main():
+    random.seed(0)
+    operations = 10 ** 6
+    # a hot set that mostly fits, and a long tail that does not
+    keys = [int(random.paretovariate(1.1)) if random.random() < 0.8
+            else random.randrange(10 ** 6) for _ in range(operations)]
+
+    results = []
+    for size in (1000, 20000, 100000):
+        for label, make in (("previous", lambda: PreviousCache(size)),
+                            ("lru", lambda: Cache(size, policy=LRU)),
+                            ("lfu", lambda: Cache(size, policy=LFU))):
+            seconds = best_of(lambda: run(make(), keys), repeat=1)
+            cache = run(make(), keys)
+            ratio = "{:.3f}".format(cache.ratio) if isinstance(cache, Cache) else "-"
+            results.append((size, label, seconds, ratio))
+    report("{} lookups, insert on miss (seconds)".format(operations),
+           ("max size", "cache", "seconds", "hit ratio"), results)
+
+    now = [0.0]
+    ttl = Cache(20000, ttl=1.0, max_bytes=2 * 10 ** 6, clock=lambda: now[0])
+
+    def expiring():
+        for i, key in enumerate(keys):
+            now[0] = i * 1e-5
+            if ttl.get(key) is None:
+                ttl.add(key, key)
+
+    report("LRU with ttl and a byte budget (seconds)", ("seconds", "evictions", "expired"),
+           [(best_of(expiring, repeat=1), ttl.evictions, ttl.expired)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Determinant scaling for Matrix.determinant, n = 3..200.
+
+The old cofactor expansion is O(n!) so it is only timed up to n = 8.
+"""
+import random
+
+import bench_tools
+from bench_tools import best_of, report
+from matrix import Matrix
+
+
+def cofactor_det(rows):
+    """The previous Matrix.determinant: recursive cofactor expansion."""
+    n = len(rows)
+    if n == 1:
+        return rows[0][0]
+    if n == 2:
+        return rows[0][0] * rows[1][1] - rows[0][1] * rows[1][0]
+    det = 0
+    for j in range(n):
+        sub = [row[:j] + row[j + 1:] for row in rows[1:]]
+        det += ((-1) ** j) * rows[0][j] * cofactor_det(sub)
+    return det
+
+
+def random_rows(n, floats=False):
+    if floats:
+        return [[random.uniform(-10, 10) for _ in range(n)] for _ in range(n)]
+    return [[random.randint(-9, 9) for _ in range(n)] for _ in range(n)]
+
+
+def main():
+    random.seed(0)
+    results = []
+    for n in (3, 5, 8, 10, 25, 50, 100, 200):
+        ints = random_rows(n)
+        floats = random_rows(n, floats=True)
+        repeat = 3 if n <= 50 else 1
+        t_int = best_of(Matrix(ints).determinant, repeat=repeat)
+        t_float = best_of(Matrix(floats).determinant, repeat=repeat)
+        t_old = best_of(cofactor_det, ints, repeat=1) if n <= 8 else '-'
+        if n <= 8:
+            assert cofactor_det(ints) == Matrix(ints).determinant()
+        results.append((n, t_int, t_float, t_old))
+    report("Matrix.determinant (seconds)",
+           ("n", "bareiss int", "pivoted float", "cofactor"), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Memory and copy cost of a list-of-lists ListLike2D against the
+array-backed FlatMatrix for large float matrices, and PyMatrix clone and
++ in list storage against flat storage.
+"""
+import random
+import tracemalloc
+
+import bench_tools
+from bench_tools import best_of, report
+from flat_matrix import FlatMatrix
+from listlike2d import ListLike2D
+from pymatrix import PyMatrix
+
+
+def allocated(build):
+    """Bytes still allocated after build() returns, the object kept alive."""
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main():
+    random.seed(0)
+    results = []
+    for n in (100, 300, 500):
+        rows = [[random.random() for _ in range(n)] for _ in range(n)]
+        listlike = ListLike2D([row[:] for row in rows], convert=False)
+        flat = FlatMatrix.from_rows(rows)
+
+        mem_list = allocated(lambda: ListLike2D(
+            [[random.random() for _ in range(n)] for _ in range(n)], convert=False))
+        mem_flat = allocated(lambda: FlatMatrix.from_rows(rows))
+        t_list = best_of(listlike.clone_data)
+        t_flat = best_of(flat.clone)
+        results.append((n, mem_list // 1024, mem_flat // 1024, t_list, t_flat))
+
+        assert flat.clone().to_rows() == listlike.clone_data()
+
+    report("Dense storage: KiB held and clone seconds",
+           ("n", "list KiB", "flat KiB", "list clone", "flat clone"), results)
+
+    results = []
+    for n in (100, 300, 500):
+        rows = [[random.random() for _ in range(n)] for _ in range(n)]
+        listed = PyMatrix([row[:] for row in rows], convert=False)
+        flat = PyMatrix(FlatMatrix.from_rows(rows))
+        assert (flat + flat) == (listed + listed) and flat.is_flat
+        results.append((n, best_of(listed.clone), best_of(flat.clone),
+                        best_of(lambda: listed + listed), best_of(lambda: flat + flat)))
+    report("PyMatrix storage: clone and + seconds",
+           ("n", "list clone", "flat clone", "list +", "flat +"), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Frac arithmetic: the integer core against fractions.Fraction and the
+previous float round trip implementation (every operation divided to a
+float and recovered the ratio through the Stern-Brocot search), then
+float -> fraction conversion: Stern-Brocot against continued fractions
+and the memo.
+"""
+import random
+from fractions import Fraction
+
+import bench_tools
+from bench_tools import best_of, report
+import frac
+from frac import Frac
+from ti_formatting import mat_repr
+
+
+def stern_brocot(x, error=1e-6):
+    """The previous dec_to_frac, one mediant per iteration."""
+    n = int(x // 1)
+    x -= n
+    if x < error:
+        return (n, 1)
+    elif 1 - error < x:
+        return (n + 1, 1)
+    lower_n, lower_d, upper_n, upper_d = 0, 1, 1, 1
+    while True:
+        middle_n = lower_n + upper_n
+        middle_d = lower_d + upper_d
+        if middle_d * (x + error) < middle_n:
+            upper_n, upper_d = middle_n, middle_d
+        elif middle_n < (x - error) * middle_d:
+            lower_n, lower_d = middle_n, middle_d
+        else:
+            return (int(n * middle_d + middle_n), middle_d)
+
+
+class PreviousFrac:
+    """The old per-operation cost model: float divide, then dec_to_frac."""
+
+    def __init__(self, number=0, denom=1, error=1e-6):
+        self._error = error
+        if denom != 1:
+            number = number / denom
+        self._num, self._den = stern_brocot(number, error)
+
+    def __getattribute__(self, name):
+        return super().__getattribute__(name)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+
+    @property
+    def n(self):
+        return self._num
+
+    @property
+    def d(self):
+        return self._den
+
+    def _other(self, other):
+        return other if isinstance(other, PreviousFrac) else PreviousFrac(other)
+
+    def __add__(self, other):
+        other = self._other(other)
+        return PreviousFrac((self.n * other.d + other.n * self.d) / (self.d * other.d))
+
+    def __sub__(self, other):
+        other = self._other(other)
+        return PreviousFrac((self.n * other.d - other.n * self.d) / (self.d * other.d))
+
+    def __mul__(self, other):
+        other = self._other(other)
+        return PreviousFrac((self.n * other.n) / (self.d * other.d))
+
+    def __truediv__(self, other):
+        other = self._other(other)
+        return PreviousFrac((self.n * other.d) / (self.d * other.n))
+
+
+def workload(cls, pairs):
+    """A row update in the style of exact elimination: row_i -= f * row_k."""
+    values = [cls(n, d) for n, d in pairs]
+    acc = cls(0)
+    for a, b in zip(values, values[1:]):
+        acc = acc + a * b - a / b
+    return acc
+
+
+def main():
+    random.seed(0)
+    pairs = [(random.randint(-20, 20), random.randint(1, 20)) for _ in range(5000)]
+    # keep the divisors nonzero
+    pairs = [(n or 1, d) for n, d in pairs]
+
+    timings = [(cls.__name__, best_of(workload, cls, pairs))
+               for cls in (PreviousFrac, Fraction, Frac)]
+    base = timings[-1][1]
+    report("5000 mixed Frac operations (seconds)", ("type", "seconds", "vs Frac"),
+           [(name, t, "{:.1f}x".format(t / base)) for name, t in timings])
+
+    exact = workload(Frac, pairs)
+    assert Fraction(exact.numerator, exact.denominator) == workload(Fraction, pairs)
+    big = [(10 ** 18 + k, 3 * k + 1) for k in range(1, 50)]
+    assert Fraction(*workload(Frac, big)) == workload(Fraction, big)
+    print("exact on 10**18 numerators: Frac matches Fraction, the float round trip gives",
+          workload(PreviousFrac, big).n, "/", workload(PreviousFrac, big).d)
+    print()
+
+    def convert_all(values, convert):
+        for value in values:
+            convert(value)
+
+    def continued(value):
+        frac.clear_memo()
+        return Frac.dec_to_frac(value)
+
+    rows = []
+    for label, values in (("0.0001", [0.0001] * 100), ("0.99999", [0.99999] * 100),
+                          ("random", [random.uniform(-5, 5) for _ in range(100)])):
+        t_old = best_of(convert_all, values, stern_brocot)
+        t_cf = best_of(convert_all, values, continued)
+        t_memo = best_of(convert_all, values, Frac.dec_to_frac)
+        rows.append((label, t_old, t_cf, t_memo, "{:.0f}x".format(t_old / t_memo)))
+    report("100 float -> fraction conversions (seconds)",
+           ("values", "Stern-Brocot", "cont. frac", "memo hit", "gain"), rows)
+
+    matrix = [[random.randint(-9, 9) / random.randint(1, 12) for _ in range(20)] for _ in range(20)]
+    frac.clear_memo()
+    t_first = best_of(mat_repr, matrix, repeat=1)
+    t_again = best_of(mat_repr, matrix)
+    report("mat_repr of a 20x20 float matrix (seconds)", ("first", "repeated"),
+           [(t_first, t_again)])
+
+
+if __name__ == '__main__':
+    main()
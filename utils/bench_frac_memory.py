@@ -0,0 +1,78 @@
+"""
+Memory of an exact 200x200 RREF with Frac entries, with and without the
+interned small values, against fractions.Fraction. The matrix has rank 20
+so the reduced form is mostly zeros and ones.
+"""
+import random
+import time
+import tracemalloc
+from fractions import Fraction
+
+import bench_tools
+from bench_tools import report
+import frac
+from frac import Frac
+
+
+def rref(a):
+    """Plain Gauss-Jordan, exact for any rational type."""
+    rows, cols = len(a), len(a[0])
+    r = 0
+    for c in range(cols):
+        p = next((i for i in range(r, rows) if a[i][c] != 0), None)
+        if p is None:
+            continue
+        a[r], a[p] = a[p], a[r]
+        pivot = a[r][c]
+        a[r] = [x / pivot for x in a[r]]
+        for i in range(rows):
+            if i != r and a[i][c] != 0:
+                factor = a[i][c]
+                a[i] = [x - factor * y for x, y in zip(a[i], a[r])]
+        r += 1
+        if r == rows:
+            break
+    return a
+
+
+def measure(kind, rows):
+    a = [[kind(x, 2) for x in row] for row in rows]
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = rref(a)
+    seconds = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    objects = len({id(x) for row in result for x in row})
+    return result, seconds, retained / 1e6, peak / 1e6, objects
+
+
+def main():
+    random.seed(0)
+    n, rank = 200, 20
+    left = [[random.randint(-2, 2) for _ in range(rank)] for _ in range(n)]
+    right = [[random.randint(-2, 2) for _ in range(n)] for _ in range(rank)]
+    rows = [[sum(l * r for l, r in zip(row, col)) for col in zip(*right)] for row in left]
+
+    results = []
+    interned, *timing = measure(Frac, rows)
+    results.append(("Frac interned",) + tuple(timing))
+
+    limit, denominator = frac.INTERN_LIMIT, frac.INTERN_DENOMINATOR
+    frac.INTERN_LIMIT, frac.INTERN_DENOMINATOR = -1, 0
+    try:
+        plain, *timing = measure(Frac, rows)
+    finally:
+        frac.INTERN_LIMIT, frac.INTERN_DENOMINATOR = limit, denominator
+    results.append(("Frac fresh",) + tuple(timing))
+
+    reference, *timing = measure(Fraction, rows)
+    results.append(("Fraction",) + tuple(timing))
+    assert interned == plain == reference
+
+    report("Exact RREF of a {0}x{0} rank {1} matrix".format(n, rank),
+           ("type", "seconds", "retained MB", "peak MB", "objects"), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+PyMatrix inverse: the three previous Gauss-Jordan variants against the
+single in-place engine, with and without the Frac prettification.
+"""
+import random
+
+import bench_tools
+from bench_tools import best_of, report
+from elimination import gauss_jordan_inverse
+from matrix_tools import apply_percise_numbers
+
+
+def augment(rows):
+    n = len(rows)
+    return [row[:] + [0] * i + [1] + [0] * (n - i - 1) for i, row in enumerate(rows)]
+
+
+def previous_inverse(rows):
+    """The old PyMatrix.inverse: rebuilds every row for every pivot."""
+    n = len(rows)
+    matrix = augment(rows)
+    for i in range(n):
+        max_row = max(range(i, n), key=lambda r: abs(matrix[r][i]))
+        matrix[i], matrix[max_row] = matrix[max_row], matrix[i]
+        div = matrix[i][i]
+        matrix[i] = [x / div for x in matrix[i]]
+        for j in range(n):
+            if j != i:
+                ratio = matrix[j][i] / matrix[i][i]
+                matrix[j] = [x - ratio * y for x, y in zip(matrix[j], matrix[i])]
+        inverse_matrix = [row[n:] for row in matrix]
+    return apply_percise_numbers(inverse_matrix)
+
+
+def previous_inverse_back(rows):
+    """The old PyMatrix.inverse_back: forward pass, then back substitution."""
+    n = len(rows)
+    matrix = augment(rows)
+    for i in range(n):
+        max_row = max(range(i, n), key=lambda r: abs(matrix[r][i]))
+        matrix[i], matrix[max_row] = matrix[max_row], matrix[i]
+        for j in range(i + 1, n):
+            ratio = matrix[j][i] / matrix[i][i]
+            for k in range(2 * n):
+                matrix[j][k] -= ratio * matrix[i][k]
+    for i in range(n - 1, -1, -1):
+        for j in range(i - 1, -1, -1):
+            ratio = matrix[j][i] / matrix[i][i]
+            for k in range(2 * n):
+                matrix[j][k] -= ratio * matrix[i][k]
+        div = matrix[i][i]
+        for k in range(2 * n):
+            matrix[i][k] /= div
+    return apply_percise_numbers([row[n:] for row in matrix])
+
+
+def previous_inverse2(rows):
+    """The old PyMatrix.inverse2: forward and full elimination per pivot."""
+    n = len(rows)
+    matrix = augment(rows)
+    for i in range(n):
+        max_row = max(range(i, n), key=lambda r: abs(matrix[r][i]))
+        matrix[i], matrix[max_row] = matrix[max_row], matrix[i]
+        for j in range(i + 1, n):
+            ratio = matrix[j][i] / matrix[i][i]
+            for k in range(i, 2 * n):
+                matrix[j][k] -= ratio * matrix[i][k]
+        for j in range(n):
+            if j != i:
+                ratio = matrix[j][i] / matrix[i][i]
+                for k in range(2 * n):
+                    matrix[j][k] -= ratio * matrix[i][k]
+        div = matrix[i][i]
+        for k in range(2 * n):
+            matrix[i][k] /= div
+    return apply_percise_numbers([row[n:] for row in matrix])
+
+
+def main():
+    random.seed(0)
+    results = []
+    for n in (10, 50, 150):
+        rows = [[random.uniform(-1, 1) for _ in range(n)] for _ in range(n)]
+        repeat = 3 if n < 150 else 1
+        timings = [best_of(func, rows, repeat=repeat) for func in (
+            previous_inverse, previous_inverse_back, previous_inverse2)]
+        t_pretty = best_of(lambda: apply_percise_numbers(gauss_jordan_inverse(rows)), repeat=repeat)
+        t_raw = best_of(gauss_jordan_inverse, rows, repeat=repeat)
+        results.append(tuple([n] + timings + [t_pretty, t_raw]))
+
+        expected = previous_inverse(rows)
+        assert all(abs(float(x) - y) < 1e-6 for r1, r2 in zip(expected, gauss_jordan_inverse(rows))
+                   for x, y in zip(r1, r2))
+
+    report("PyMatrix inverse (seconds)",
+           ("n", "inverse", "inverse_back", "inverse2", "new pretty", "new raw"), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Least squares on a tall 10000 x 20 system: Householder QR against the
+normal equations (A^T·A built in python, then LU), plus the accuracy of
+both on an ill-conditioned polynomial fit.
+"""
+import random
+from operator import mul
+
+import bench_tools
+from bench_tools import best_of, report
+from factorizations import LUFactorization, QRFactorization
+
+
+def normal_equations(rows, b):
+    cols = list(zip(*rows))
+    ata = [[sum(map(mul, ci, cj)) for cj in cols] for ci in cols]
+    atb = [sum(map(mul, ci, b)) for ci in cols]
+    return LUFactorization(ata).solve(atb)
+
+
+def vandermonde(m, degree):
+    xs = [i / (m - 1) for i in range(m)]
+    return [[x ** k for k in range(degree + 1)] for x in xs]
+
+
+def main():
+    random.seed(0)
+    m, n = 10000, 20
+    rows = [[random.uniform(-1, 1) for _ in range(n)] for _ in range(m)]
+    b = [random.uniform(-1, 1) for _ in range(m)]
+
+    t_normal = best_of(normal_equations, rows, b, repeat=1)
+    t_qr = best_of(lambda: QRFactorization(rows).solve(b), repeat=1)
+    qr = QRFactorization(rows)
+    t_reuse = best_of(qr.solve, b)
+    assert max(abs(x - y) for x, y in zip(qr.solve(b), normal_equations(rows, b))) < 1e-9
+
+    timings = [("normal eq.", t_normal), ("QR", t_qr), ("QR reused", t_reuse)]
+    try:
+        import numpy
+        a, v = numpy.array(rows), numpy.array(b)
+        timings.append(("numpy lstsq", best_of(numpy.linalg.lstsq, a, v, rcond=None)))
+    except ImportError:
+        pass
+    report("Least squares {}x{} (seconds)".format(m, n), ("method", "seconds"), timings)
+
+    # fit a known degree 10 polynomial, the normal equations lose digits
+    accuracy = []
+    for degree in (6, 8, 10):
+        a = vandermonde(200, degree)
+        coeffs = [1.0] * (degree + 1)
+        y = [sum(map(mul, row, coeffs)) for row in a]
+        err_qr = max(abs(c - 1) for c in QRFactorization(a).solve(y))
+        err_ne = max(abs(c - 1) for c in normal_equations(a, y))
+        accuracy.append((degree, err_qr, err_ne))
+    report("Polynomial fit, max coefficient error", ("degree", "QR", "normal eq."), accuracy)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+PyMatrix multiplication: the previous clone + column-walking kernel
+against the transposed-B kernel and its blocked variant.
+"""
+import random
+
+import bench_tools
+from bench_tools import best_of, report
+from matrix_tools import mat_mul, mat_mul_blocked
+from pymatrix import PyMatrix
+
+
+def previous_mul(A, B):
+    """The old PyMatrix.__mul_matrix: copies both operands, walks B by column."""
+    A = [row[:] for row in A.data]
+    B = [row[:] for row in B.data]
+    rows, inner, cols = len(A), len(B), len(B[0])
+    return PyMatrix([[sum(A[i][k] * B[k][j] for k in range(inner))
+                      for j in range(cols)] for i in range(rows)])
+
+
+def main():
+    random.seed(0)
+    results = []
+    for n in (50, 100, 300):
+        rows_a = [[random.random() for _ in range(n)] for _ in range(n)]
+        rows_b = [[random.random() for _ in range(n)] for _ in range(n)]
+        A, B = PyMatrix(rows_a), PyMatrix(rows_b)
+        repeat = 3 if n < 300 else 1
+
+        t_old = best_of(previous_mul, A, B, repeat=repeat)
+        t_new = best_of(lambda: A * B, repeat=repeat)
+        t_kernel = best_of(mat_mul, rows_a, rows_b, repeat=repeat)
+        t_blocked = best_of(mat_mul_blocked, rows_a, rows_b, repeat=repeat)
+        results.append((n, t_old, t_new, t_kernel, t_blocked))
+
+        expected = previous_mul(A, B).data
+        assert all(abs(x - y) < 1e-9 for r1, r2 in zip(expected, (A * B).data)
+                   for x, y in zip(r1, r2))
+
+    report("PyMatrix multiply (seconds)",
+           ("n", "previous", "A * B", "mat_mul", "blocked"), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Markov-chain style matrix powers, p up to 10^6.
+
+The previous recursive __pow__ did p - 1 multiplications and hit the
+recursion limit near p = 1000, it is emulated here with a plain loop
+and only timed for small p.
+"""
+import random
+
+import bench_tools
+from bench_tools import best_of, report
+from matrix import Matrix
+from pymatrix import PyMatrix
+from step_recorder import StepRecorder
+
+
+def stochastic_rows(n):
+    rows = []
+    for _ in range(n):
+        row = [random.random() for _ in range(n)]
+        total = sum(row)
+        rows.append([x / total for x in row])
+    return rows
+
+
+def linear_power(matrix, power):
+    """p - 1 multiplications, the cost of the old recursive version."""
+    result = matrix
+    for _ in range(power - 1):
+        result = result * matrix
+    return result
+
+
+def main():
+    random.seed(0)
+    results = []
+    for n in (3, 5, 10):
+        rows = stochastic_rows(n)
+        mat = Matrix(rows, recorder=StepRecorder())
+        py_mat = PyMatrix([row[:] for row in rows])
+        for power in (10, 1000, 10 ** 6):
+            t_mat = best_of(lambda: mat ** power)
+            t_py = best_of(lambda: py_mat ** power)
+            t_old = best_of(linear_power, mat, power, repeat=1) if power <= 1000 else '-'
+            results.append((n, power, t_mat, t_py, t_old))
+
+        # rows of a stochastic matrix power still sum to one
+        steady = mat ** (10 ** 6)
+        assert all(abs(sum(row) - 1) < 1e-9 for row in steady.matrix)
+
+    report("Matrix power (seconds)",
+           ("n", "power", "Matrix", "PyMatrix", "linear"), results)
+
+
+if __name__ == '__main__':
+    main()
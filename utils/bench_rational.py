@@ -0,0 +1,82 @@
+"""
+Exact elimination of Frac matrices: Gauss-Jordan with one Frac per cell
+against RationalMatrix (integer rows over one denominator each, Bareiss
+on the numerators), for RREF, inverse and determinant.
+"""
+import random
+
+import bench_tools
+from bench_tools import best_of, report
+from frac import Frac
+from rational_matrix import RationalMatrix
+
+
+def frac_rref(rows):
+    """Plain Gauss-Jordan, every cell a Frac."""
+    a = [row[:] for row in rows]
+    m, n = len(a), len(a[0])
+    r = 0
+    for c in range(n):
+        p = next((i for i in range(r, m) if a[i][c] != 0), None)
+        if p is None:
+            continue
+        a[r], a[p] = a[p], a[r]
+        pivot = a[r][c]
+        a[r] = [x / pivot for x in a[r]]
+        for i in range(m):
+            if i != r and a[i][c] != 0:
+                factor = a[i][c]
+                a[i] = [x - factor * y for x, y in zip(a[i], a[r])]
+        r += 1
+        if r == m:
+            break
+    return a
+
+
+def frac_inverse(rows):
+    n = len(rows)
+    augmented = [row + [Frac(int(i == j)) for j in range(n)] for i, row in enumerate(rows)]
+    return [row[n:] for row in frac_rref(augmented)]
+
+
+def frac_det(rows):
+    a = [row[:] for row in rows]
+    n = len(a)
+    det = Frac(1)
+    for c in range(n):
+        p = next((i for i in range(c, n) if a[i][c] != 0), None)
+        if p is None:
+            return Frac(0)
+        if p != c:
+            a[c], a[p] = a[p], a[c]
+            det = -det
+        det = det * a[c][c]
+        for i in range(c + 1, n):
+            factor = a[i][c] / a[c][c]
+            a[i] = [x - factor * y for x, y in zip(a[i], a[c])]
+    return det
+
+
+def main():
+    random.seed(0)
+    results = []
+    for n in (10, 20, 40):
+        rows = [[Frac(random.randint(-9, 9), random.randint(1, 12)) for _ in range(n)]
+                for _ in range(n)]
+        assert RationalMatrix.from_rows(rows).rref()[0].to_rows() == frac_rref(rows)
+        assert RationalMatrix.from_rows(rows).inverse().to_rows() == frac_inverse(rows)
+        assert RationalMatrix.from_rows(rows).det() == frac_det(rows)
+        for label, slow, fast in (
+                ("rref", frac_rref, lambda: RationalMatrix.from_rows(rows).rref()[0].to_rows()),
+                ("inverse", frac_inverse, lambda: RationalMatrix.from_rows(rows).inverse().to_rows()),
+                ("det", frac_det, lambda: RationalMatrix.from_rows(rows).det())):
+            t_frac = best_of(slow, rows, repeat=1)
+            t_rational = best_of(fast, repeat=1)
+            results.append(("{0}x{0}".format(n), label, t_frac, t_rational,
+                            "{:.1f}x".format(t_frac / t_rational)))
+    report("Exact elimination of random Frac matrices (seconds)",
+           ("size", "op", "Frac cells", "int rows", "gain"), results)
+
+
+if __name__ == '__main__':
+    main()
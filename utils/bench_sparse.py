@@ -0,0 +1,44 @@
+"""
+RREF of banded sparse systems: dense PyMatrix against SparsePyMatrix,
+which only stores and eliminates the nonzeros. The dense matrix is
+only timed where it finishes in reasonable time.
+"""
+import random
+
+import bench_tools
+from bench_tools import best_of, report
+from pymatrix import PyMatrix
+from sparse_pymatrix import SparsePyMatrix
+
+
+def banded(n, width=2):
+    """Diagonally dominant band, as from a 1D discretization."""
+    rows = [[0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(max(0, i - width), min(n, i + width + 1)):
+            rows[i][j] = random.uniform(-1, 1)
+        rows[i][i] += 2 * width + 1
+    return rows
+
+
+def main():
+    random.seed(0)
+    results = []
+    for n in (100, 300, 2000):
+        rows = banded(n)
+        sparse = SparsePyMatrix.from_dense(rows)
+        t_sparse = best_of(sparse.RREF, repeat=1)
+        if n <= 300:
+            dense = PyMatrix([r[:] for r in rows], convert=False, backend='python')
+            t_dense = best_of(dense.RREF, exact=False, repeat=1)
+            assert sparse.RREF()[1] == dense.RREF(exact=False)[1]
+        else:
+            t_dense = "-"
+        results.append((n, "{:.2%}".format(sparse.density), t_dense, t_sparse))
+
+    report("RREF of banded systems (seconds)",
+           ("n", "density", "dense", "sparse"), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Structured det/solve/inverse against the general dense kernels, one row
+per structure. The probe time is included in every structured timing.
+"""
+import random
+
+import bench_tools
+from bench_tools import best_of, report
+from elimination import det_pivoted, gauss_jordan_inverse
+from factorizations import LUFactorization
+from structure import StructuredSolver
+
+
+def make(kind, n):
+    def entry(i, j):
+        if i == j:
+            return n + random.uniform(0, 1)
+        return random.uniform(-1, 1)
+
+    inside = {
+        'diagonal': lambda i, j: i == j,
+        'upper': lambda i, j: j >= i,
+        'lower': lambda i, j: j <= i,
+        'tridiagonal': lambda i, j: abs(i - j) <= 1,
+        'banded': lambda i, j: abs(i - j) <= 3,
+        'cholesky': lambda i, j: True,
+    }[kind]
+    rows = [[entry(i, j) if inside(i, j) else 0.0 for j in range(n)] for i in range(n)]
+    if kind == 'cholesky':
+        for i in range(n):
+            for j in range(i):
+                rows[i][j] = rows[j][i]
+    return rows
+
+
+def main():
+    random.seed(0)
+    n = 200
+    results = []
+    for kind in ('diagonal', 'upper', 'lower', 'tridiagonal', 'banded', 'cholesky'):
+        rows = make(kind, n)
+        b = [random.uniform(-1, 1) for _ in range(n)]
+        assert StructuredSolver(rows).method == kind
+
+        t_det = best_of(det_pivoted, rows)
+        t_det_s = best_of(lambda: StructuredSolver(rows).det())
+        t_solve = best_of(lambda: LUFactorization(rows).solve(b))
+        t_solve_s = best_of(lambda: StructuredSolver(rows).solve(b))
+        if kind in ('diagonal', 'upper', 'lower', 'cholesky'):
+            t_inv = best_of(gauss_jordan_inverse, rows, repeat=1)
+            t_inv_s = best_of(lambda: StructuredSolver(rows).inverse(), repeat=1)
+            inv_speedup = "{:.1f}x".format(t_inv / t_inv_s)
+        else:
+            inv_speedup = "-"
+        results.append((kind, t_det, t_det_s, "{:.1f}x".format(t_det / t_det_s),
+                        t_solve, t_solve_s, "{:.1f}x".format(t_solve / t_solve_s), inv_speedup))
+
+    report("Structured kernels, n = {} (seconds)".format(n),
+           ("structure", "det dense", "det struct", "det gain",
+            "solve LU", "solve struct", "solve gain", "inv gain"), results)
+
+
+if __name__ == '__main__':
+    main()
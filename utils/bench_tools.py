@@ -0,0 +1,41 @@
+"""
+Shared helpers for the benchmark scripts in this folder.
+
+Importing this module puts the project root and ``lib`` on sys.path so the
+scripts can be run directly, e.g. ``python utils/bench_determinant.py``.
+"""
+import os
+import sys
+import time
+
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _path in (_root, os.path.join(_root, 'lib')):
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+
+def best_of(func, *args, repeat=3, **kwargs):
+    """Return the fastest wall time in seconds over `repeat` calls."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def report(title, header, rows):
+    """Print a simple fixed width table."""
+    print(title)
+    print("".join("{:>14}".format(h) for h in header))
+    for row in rows:
+        cells = []
+        for cell in row:
+            if isinstance(cell, float):
+                cells.append("{:>14.6f}".format(cell))
+            else:
+                cells.append("{:>14}".format(str(cell)))
+        print("".join(cells))
+    print()